@@ -1,3 +1,8 @@
 from . import c
 from . import io
+from . import lut
+from . import parallel
+from . import graph
 from . import agxc
+from . import batch
+from . import benchmark
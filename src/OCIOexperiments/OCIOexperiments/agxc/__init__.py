@@ -1 +1,2 @@
 from . import transforms
+from . import precision
@@ -6,3 +6,5 @@ from OCIOexperiments import c
 ABR = c.ABR + ".agxc"
 
 CONFIG_PATH = c.DATA_DIR / "configs" / "AgXc-v0.1.4" / "config.ocio"
+
+PRECISIONS = c.PRECISIONS
@@ -0,0 +1,126 @@
+"""
+Measure the error introduced by reduced-precision processing against float32.
+"""
+import functools
+import logging
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy
+
+from . import c
+from . import transforms as agx_transforms
+from .. import transforms
+
+__all__ = [
+    "PrecisionError",
+    "PrecisionReport",
+    "get_precision_report",
+]
+
+logger = logging.getLogger(f"{c.ABR}.precision")
+
+
+@dataclass
+class PrecisionError:
+    name: str
+    max_error: float
+    mean_error: float
+
+    @property
+    def max_code_error(self) -> float:
+        """
+        Maximum error expressed in 8-bit code values.
+        """
+        return self.max_error * 255
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name:>20}: max={self.max_error:.6f} "
+            f"({self.max_code_error:.3f} 8-bit codes) mean={self.mean_error:.6f}"
+        )
+
+
+@dataclass
+class PrecisionReport:
+    precision: str
+    stages: List[PrecisionError] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        lines = [f"[PrecisionReport] {self.precision} against float32:"]
+        lines += [f"    {stage}" for stage in self.stages]
+        return "\n".join(lines)
+
+    @property
+    def max_code_error(self) -> float:
+        return max(stage.max_code_error for stage in self.stages)
+
+
+def _get_error(
+    name: str,
+    reference: numpy.ndarray,
+    result: numpy.ndarray,
+) -> PrecisionError:
+    error = numpy.abs(result.astype(numpy.float32) - reference)
+    return PrecisionError(
+        name=name,
+        max_error=float(error.max()),
+        mean_error=float(error.mean()),
+    )
+
+
+def get_precision_report(
+    array: numpy.ndarray,
+    precision: agx_transforms.Precision = "float16",
+) -> PrecisionReport:
+    """
+    Compare the log and LUT stages and the full AgX transforms processed in the
+    given precision against float32.
+
+    Args:
+        array: float array, R-G-B format, sRGB Display encoding
+        precision: reduced precision to check
+
+    Returns:
+        error of each stage, in the [0-1] output range
+    """
+    report = PrecisionReport(precision=precision)
+
+    # open-domain data like the one the log stage receives in the native path
+    scene_array = agx_transforms.look1(numpy.power(array, 2.2, dtype=numpy.float32))
+    log_function = functools.partial(
+        transforms.open_domain_to_normalized_log2,
+        minimum_ev=-10.0,
+        maximum_ev=6.5,
+    )
+    report.stages.append(
+        _get_error(
+            "log2 allocation",
+            log_function(scene_array),
+            log_function(scene_array.astype(precision)),
+        )
+    )
+
+    lut = agx_transforms.get_agx_dense_lut()
+    report.stages.append(
+        _get_error(
+            "AgX base LUT",
+            lut.apply(array.astype(numpy.float32)),
+            lut.apply(array.astype(precision)),
+        )
+    )
+
+    for name, function in (
+        ("native look 1", agx_transforms.transform_native_inout_look_1),
+        ("ocio look 1", agx_transforms.transform_inout_look_1),
+    ):
+        report.stages.append(
+            _get_error(
+                name,
+                function(array, precision="float32"),
+                function(array, precision=precision),
+            )
+        )
+
+    logger.debug(str(report))
+    return report
@@ -0,0 +1,62 @@
+"""
+Compare speed and output of the OCIO and native AgX implementations.
+
+Run this file directly to print the results table.
+
+The native implementation is not expected to match OCIO yet: the config applies the
+Punchy look after the AgX base, in display space, and uses a different log range.
+Its delta E against OCIO is only reported, while optimized native variants must stay
+equivalent to the native implementation.
+"""
+import sys
+
+import OCIOexperiments as ocex
+
+TRANSFORMS = {
+    "ocio": ocex.agxc.transforms.transform_inout_look_1,
+    "native": ocex.agxc.transforms.transform_native_inout_look_1,
+    "graph native": ocex.agxc.transforms.transform_graph_inout_look_1,
+}
+
+REFERENCE = "native"
+
+EQUIVALENTS = ["graph native"]
+"""
+Transforms that must give the same image as the reference.
+"""
+
+DELTA_E_TOLERANCE = 0.1
+"""
+Maximum delta E allowed between the reference and its equivalents.
+"""
+
+
+def get_images():
+
+    input_path = ocex.c.DATA_DIR / "webcam" / "webcam-c922-A.0001.tif"
+
+    images = {"webcam-c922-A.0001": ocex.io.array_read(input_path, method="cv2")}
+    for name, (width, height) in ocex.benchmark.RESOLUTIONS.items():
+        images[f"ramp {name}"] = ocex.benchmark.get_ramp(width, height)
+    return images
+
+
+def test_benchmark(repeat: int = 5):
+
+    results = ocex.benchmark.run_benchmark(
+        TRANSFORMS,
+        get_images(),
+        reference=REFERENCE,
+        repeat=repeat,
+    )
+    print(ocex.benchmark.format_results(results))
+
+    for result in results:
+        if result.transform in EQUIVALENTS:
+            assert result.delta_e_max < DELTA_E_TOLERANCE, result
+    return
+
+
+if __name__ == "__main__":
+
+    test_benchmark(repeat=int(sys.argv[1]) if len(sys.argv) > 1 else 5)
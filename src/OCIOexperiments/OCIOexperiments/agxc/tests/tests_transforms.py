@@ -4,6 +4,7 @@
 from pathlib import Path
 
 import colour
+import numpy
 
 import OCIOexperiments as ocex
 
@@ -22,6 +23,43 @@ def test_native_inout_look_1():
     return
 
 
+def test_precision_report():
+
+    input_path = ocex.c.DATA_DIR / "webcam" / "webcam-c922-A.0001.tif"
+
+    img = ocex.io.array_read(input_path, method="cv2", precision="float16")
+
+    report = ocex.agxc.precision.get_precision_report(img, precision="float16")
+    print(report)
+    assert report.max_code_error < 1.0, report
+    return
+
+
+def test_look_1_punchy_matrix():
+
+    agx_transforms = ocex.agxc.transforms
+    rng = numpy.random.default_rng(seed=0)
+    array = rng.uniform(0.0, 1.0, size=(64, 64, 3))
+
+    expected = agx_transforms.look_punchy(agx_transforms.look1(array.copy()))
+    result = ocex.transforms.apply_matrix(
+        array**agx_transforms.punchy_gamma,
+        agx_transforms.get_look_1_punchy_matrix(),
+    )
+    assert numpy.allclose(result, expected, rtol=1e-6), abs(result - expected).max()
+
+    expected = agx_transforms.look_punchy(
+        agx_transforms.look1(array.copy()), punchy_gamma=1.5, punchy_saturation=0.8
+    )
+    result = ocex.transforms.apply_matrix(
+        array**1.5, agx_transforms.get_look_1_punchy_matrix(1.5, 0.8)
+    )
+    assert numpy.allclose(result, expected, rtol=1e-6), abs(result - expected).max()
+    return
+
+
 if __name__ == "__main__":
 
     test_native_inout_look_1()
+    test_look_1_punchy_matrix()
+    test_precision_report()
@@ -3,22 +3,28 @@
 """
 from functools import cache
 import logging
-from typing import List
+from typing import List, Literal, Optional
 
 import PyOpenColorIO as ocio
 import colour
 import numpy
 
 from . import c
+from .. import graph
+from .. import lut
+from .. import parallel
 from .. import transforms
 
 __all__ = [
     "transform_inout_look_1",
     "transform_native_inout_look_1",
+    "transform_graph_inout_look_1",
 ]
 
 logger = logging.getLogger(f"{c.ABR}.transforms")
 
+Precision = Literal["float32", "float16"]
+
 CONFIG: ocio.Config = ocio.Config().CreateFromFile(str(c.CONFIG_PATH))
 
 
@@ -33,6 +39,23 @@ agx_compressed_matrix = numpy.asarray(
 From https://github.com/sobotka/AgX-S2O3/blob/main/generate_config.py
 """
 
+punchy_luma_weights = (0.2, 0.2, 0.2)
+"""
+R-G-B coefficients of the luma used by the punchy look saturation.
+"""
+
+punchy_gamma = 1.3
+punchy_saturation = 1.2
+"""
+Default parameters of ``look_punchy``.
+"""
+
+look_1_gain = 15
+look_1_decrunch = 1.15
+"""
+Parameters of ``look1``, the image is divided by the decrunch after the gain.
+"""
+
 
 @cache
 def input_srgb_proc() -> ocio.CPUProcessor:
@@ -48,7 +71,11 @@ def input_srgb_proc() -> ocio.CPUProcessor:
 
 
 @cache
-def output_srgb_punchy_proc() -> ocio.CPUProcessor:
+def output_srgb_punchy_proc(precision: Precision = "float32") -> ocio.CPUProcessor:
+    """
+    Args:
+        precision: float type of the arrays the processor will be applied on.
+    """
 
     ocio_display = CONFIG.getDefaultDisplay()
     proc: ocio.Processor = CONFIG.getProcessor(
@@ -57,6 +84,12 @@ def output_srgb_punchy_proc() -> ocio.CPUProcessor:
         CONFIG.getDefaultView(ocio_display),
         ocio.TRANSFORM_DIR_FORWARD,
     )
+    if precision == "float16":
+        return proc.getOptimizedCPUProcessor(
+            ocio.BIT_DEPTH_F16,
+            ocio.BIT_DEPTH_F16,
+            ocio.OPTIMIZATION_DEFAULT,
+        )
     return proc.getDefaultCPUProcessor()
 
 
@@ -69,34 +102,73 @@ def get_agx_lut() -> colour.LUT1D:
     return lut
 
 
+@cache
+def get_agx_dense_lut() -> lut.DenseLUT1D:
+    """
+    AgX base curve resampled for fast application, see ``lut.DenseLUT1D``.
+    """
+    return lut.DenseLUT1D.from_colour(get_agx_lut())
+
+
 def look_punchy(
     array: numpy.ndarray,
-    punchy_gamma: float = 1.3,
-    punchy_saturation: float = 1.2,
+    punchy_gamma: float = punchy_gamma,
+    punchy_saturation: float = punchy_saturation,
 ) -> numpy.ndarray:
 
     # gamma
     array = array**punchy_gamma
     # saturation based on CDL formula
     # see https://video.stackexchange.com/q/9866
-    luma = array * 0.2
-    luma = numpy.sum(luma, axis=2)
-    luma = numpy.stack((luma,) * 3, axis=-1)
-    array -= luma
-    array *= punchy_saturation
-    array += luma
+    array = transforms.apply_matrix(
+        array,
+        transforms.saturation_matrix(punchy_saturation, punchy_luma_weights),
+    )
 
     return array
 
 
+@cache
+def get_look_1_punchy_matrix(
+    gamma: float = punchy_gamma,
+    saturation: float = punchy_saturation,
+) -> numpy.ndarray:
+    """
+    ``look1`` gain and ``look_punchy`` saturation composed as a single matrix, to
+    apply on ``x ** gamma``.
+
+    The gain is applied before the punchy gamma but commutes with it:
+    ``(gain * x) ** gamma == gain ** gamma * x ** gamma``
+
+    Args:
+        gamma: see ``look_punchy``
+        saturation: see ``look_punchy``
+    """
+    gain = look_1_gain / look_1_decrunch
+    return transforms.compose_matrices(
+        numpy.identity(3) * gain**gamma,
+        transforms.saturation_matrix(saturation, punchy_luma_weights),
+    )
+
+
 def look1(array: numpy.ndarray) -> numpy.ndarray:
 
-    array *= 15  # gain 15
-    array = array**1 / 1.15  # gamma 1.15
+    array *= look_1_gain  # gain 15
+    array = array**1 / look_1_decrunch  # gamma 1.15
     return array
 
 
-def transform_inout_look_1(array: numpy.ndarray) -> numpy.ndarray:
+def _get_dtype(precision: Precision) -> numpy.dtype:
+    if precision not in c.PRECISIONS:
+        raise ValueError(f"Precision <{precision}> passed is not supported.")
+    return numpy.dtype(precision)
+
+
+def transform_inout_look_1(
+    array: numpy.ndarray,
+    workers: Optional[int] = 1,
+    precision: Precision = "float32",
+) -> numpy.ndarray:
     """
     Using OCIO library.
 
@@ -105,23 +177,34 @@ def transform_inout_look_1(array: numpy.ndarray) -> numpy.ndarray:
     - apply the AgX punchy view-transform
 
     Args:
-        array: float32 array, R-G-B format, sRGB Display encoding
+        array: float array, R-G-B format, sRGB Display encoding
+        workers: number of threads the OCIO processor is applied with.
+            None to use all cores.
+        precision: float type used for every intermediate and the result.
+            float16 is about twice slower, see ``c.PRECISIONS``.
 
     """
 
     # 1. apply inverse EOTF to linearize
-    array: numpy.ndarray = array**2.2
+    array: numpy.ndarray = numpy.power(array, 2.2, dtype=_get_dtype(precision))
 
     # grading
     array = look1(array=array)
 
     # apply view transform
-    output_srgb_punchy_proc().applyRGB(array)
+    parallel.apply_processor_parallel(
+        output_srgb_punchy_proc(precision),
+        array,
+        workers=workers,
+    )
 
     return array
 
 
-def transform_native_inout_look_1(array: numpy.ndarray) -> numpy.ndarray:
+def transform_native_inout_look_1(
+    array: numpy.ndarray,
+    precision: Precision = "float32",
+) -> numpy.ndarray:
     """
     Using native python function and numpy.
 
@@ -130,33 +213,85 @@ def transform_native_inout_look_1(array: numpy.ndarray) -> numpy.ndarray:
     - apply the AgX punchy view-transform
 
     Args:
-        array: float32 array, R-G-B format, sRGB Display encoding
+        array: float array, R-G-B format, sRGB Display encoding
+        precision: float type used for intermediates and the result.
+            The LUT index is always computed in float32.
+            float16 is about 10 times slower, see ``c.PRECISIONS``.
 
     """
+    dtype = _get_dtype(precision)
 
-    # 1. apply inverse EOTF to linearize
-    array: numpy.ndarray = array**2.2
-
-    # 2. Apply Grading
-    array = look1(array)
+    # 1. apply inverse EOTF to linearize, merged with the punchy look gamma
+    # (the look1 gain in-between is carried in the next matrix)
+    array: numpy.ndarray = numpy.power(array, 2.2 * punchy_gamma, dtype=dtype)
+    buffer = numpy.empty_like(array)
 
-    # 3. Apply Punchy Look
-    array = look_punchy(array=array)
+    # 2. 3. Apply Grading and Punchy Look saturation
+    transforms.apply_matrix(array, get_look_1_punchy_matrix(), out=buffer)
 
     # 4. Apply AgX Log encoding
-    array = array.clip(min=0)
-    array = colour.algebra.vector_dot(
-        agx_compressed_matrix,
-        array,
-    )
+    # the clip prevent composing the inset matrix with the previous one
+    numpy.maximum(buffer, 0.0, out=buffer)
+    transforms.apply_matrix(buffer, agx_compressed_matrix, out=array)
     logarray = transforms.open_domain_to_normalized_log2(
         array,
         minimum_ev=-10.0,
         maximum_ev=6.5,
+        out=array,
     )
-    logarray = logarray.clip(0.0, 1.0)
     # 5. Apply AgX Base
-    array = get_agx_lut().apply(logarray)
+    array = get_agx_dense_lut().apply(logarray, out=logarray)
 
     # EOTF is already applied
     return array
+
+
+def get_inout_look_1_ops(method: Literal["ocio", "native"]) -> List[graph.Op]:
+    """
+    Operations of ``transform_inout_look_1`` (ocio) and
+    ``transform_native_inout_look_1`` (native), see ``graph``.
+    """
+    ops = [
+        # inverse EOTF
+        graph.Power(2.2),
+        # look1
+        graph.Gain(look_1_gain),
+        graph.Gain(1 / look_1_decrunch),
+    ]
+    if method == "ocio":
+        ops += [graph.OCIOProcessor(output_srgb_punchy_proc())]
+        return ops
+
+    ops += [
+        # look punchy
+        graph.Power(punchy_gamma),
+        graph.Saturation(punchy_saturation, weights=punchy_luma_weights),
+        # AgX
+        graph.Clip(minimum=0),
+        graph.Matrix(agx_compressed_matrix),
+        graph.LogAllocation(minimum_ev=-10.0, maximum_ev=6.5),
+        graph.LUT1D(get_agx_dense_lut()),
+    ]
+    return ops
+
+
+@cache
+def get_inout_look_1_plan(method: Literal["ocio", "native"]) -> graph.Plan:
+    # display encoded inputs are in [0-1], like transform_native_inout_look_1 the
+    # inverse EOTF and the punchy gamma are merged in a single power.
+    return graph.plan(get_inout_look_1_ops(method), non_negative=True)
+
+
+def transform_graph_inout_look_1(
+    array: numpy.ndarray,
+    method: Literal["ocio", "native"] = "native",
+) -> numpy.ndarray:
+    """
+    Same as ``transform_native_inout_look_1`` (or ``transform_inout_look_1``) but
+    executed from an optimized ``graph.Plan``.
+
+    Args:
+        array: float array, R-G-B format, sRGB Display encoding
+        method: which implementation of the view transform to use
+    """
+    return get_inout_look_1_plan(method).apply(array)
@@ -0,0 +1,269 @@
+"""
+Apply a colour transform on a whole image sequence, distributed over a process pool.
+"""
+import glob
+import importlib
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Literal, Optional, Sequence, Tuple, Union
+
+import numpy
+
+from . import c
+from . import io
+
+__all__ = [
+    "TRANSFORMS",
+    "BatchResult",
+    "get_transform",
+    "get_sequence",
+    "get_output_path",
+    "process_sequence",
+]
+
+logger = logging.getLogger(f"{c.ABR}.batch")
+
+TRANSFORMS: Dict[str, Tuple[str, str]] = {
+    "agxc.look_1": (
+        "OCIOexperiments.agxc.transforms",
+        "transform_inout_look_1",
+    ),
+    "agxc.native_look_1": (
+        "OCIOexperiments.agxc.transforms",
+        "transform_native_inout_look_1",
+    ),
+}
+"""
+Transforms that can be requested by name, as (module, function name).
+Functions must accept and return a float32 R-G-B array.
+"""
+
+FRAME_TOKEN = "$FRAME"
+"""
+Token in output patterns replaced by the frame number of the input.
+"""
+
+_WORKER_TRANSFORM: Optional[Callable[[numpy.ndarray], numpy.ndarray]] = None
+"""
+Transform resolved once per worker process by ``_worker_initialize``.
+"""
+
+
+@dataclass
+class BatchResult:
+    total: int
+    processed: List[Path] = field(default_factory=list)
+    skipped: List[Path] = field(default_factory=list)
+    failed: List[Path] = field(default_factory=list)
+    duration: float = 0.0
+    """
+    wall time in seconds spent processing the sequence
+    """
+
+    @property
+    def fps(self) -> float:
+        """
+        Number of frames processed per second (skipped frames are excluded).
+        """
+        if not self.duration:
+            return 0.0
+        return len(self.processed) / self.duration
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.processed)}/{self.total} frames processed in "
+            f"{self.duration:.2f}s ({self.fps:.2f} fps), "
+            f"{len(self.skipped)} skipped, {len(self.failed)} failed"
+        )
+
+
+def get_transform(name: str) -> Callable[[numpy.ndarray], numpy.ndarray]:
+    """
+    Args:
+        name: key in ``TRANSFORMS``
+
+    Returns:
+        colour transform function registered under the given name
+    """
+    if name not in TRANSFORMS:
+        raise ValueError(
+            f"Transform <{name}> is not supported, choose from {list(TRANSFORMS)}."
+        )
+    module_name, function_name = TRANSFORMS[name]
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def get_sequence(input_sequence: Union[str, Path, Sequence[Path]]) -> List[Path]:
+    """
+    Args:
+        input_sequence: glob pattern like ``dir/webcam.*.tif``, directory (all files
+            in it), or list of paths.
+
+    Returns:
+        sorted list of input file paths
+    """
+    if isinstance(input_sequence, (str, Path)):
+        input_sequence = Path(input_sequence)
+        if input_sequence.is_dir():
+            paths = [path for path in input_sequence.iterdir() if path.is_file()]
+        else:
+            paths = [Path(path) for path in glob.glob(str(input_sequence))]
+    else:
+        paths = [Path(path) for path in input_sequence]
+
+    return sorted(paths)
+
+
+def get_output_path(input_path: Path, output_pattern: str, index: int) -> Path:
+    """
+    Args:
+        input_path: path of the input frame
+        output_pattern: path with a ``$FRAME`` token, replaced by the last group of
+            digits in the input file name, or by the index when there is none.
+        index: position of the input in its sequence
+
+    Returns:
+        output path for the given input
+    """
+    match = re.search(r"(\d+)(?!.*\d)", input_path.stem)
+    frame = match.group(1) if match else str(index).zfill(4)
+    return Path(str(output_pattern).replace(FRAME_TOKEN, frame))
+
+
+def _is_up_to_date(input_path: Path, output_path: Path) -> bool:
+    return (
+        output_path.exists()
+        and output_path.stat().st_mtime >= input_path.stat().st_mtime
+    )
+
+
+def _worker_initialize(transform_name: str):
+    """
+    Resolve the transform and build its processors once for this worker process.
+    """
+    global _WORKER_TRANSFORM
+
+    _WORKER_TRANSFORM = get_transform(transform_name)
+    # processors are cached, calling the transform once build them.
+    _WORKER_TRANSFORM(numpy.zeros((1, 1, 3), dtype=numpy.float32))
+    logger.debug(
+        f"[_worker_initialize] pid={os.getpid()} ready with <{transform_name}>."
+    )
+    return
+
+
+def _worker_process(
+    input_path: Path,
+    output_path: Path,
+    read_method: str,
+    write_method: str,
+    bitdepth: Union[numpy.float32, numpy.uint16, numpy.uint8],
+) -> Path:
+
+    array = io.array_read(input_path, method=read_method)
+    array = _WORKER_TRANSFORM(array)
+    array = array.astype(numpy.float32, copy=False)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    io.array_write(array, output_path, bitdepth=bitdepth, method=write_method)
+    return output_path
+
+
+def process_sequence(
+    input_sequence: Union[str, Path, Sequence[Path]],
+    transform_name: str,
+    output_pattern: Union[str, Path],
+    workers: Optional[int] = None,
+    resume: bool = True,
+    read_method: Literal["oiio", "cv2", "pillow"] = "oiio",
+    write_method: Literal["oiio", "cv2", "pillow"] = "oiio",
+    bitdepth: Union[numpy.float32, numpy.uint16, numpy.uint8] = numpy.float32,
+    progress_callback: Optional[Callable[[int, int, Path], None]] = None,
+) -> BatchResult:
+    """
+    Read, transform and write every frame of the sequence using a pool of processes.
+
+    Args:
+        input_sequence: see ``get_sequence``
+        transform_name: key in ``TRANSFORMS``
+        output_pattern: output path with a ``$FRAME`` token, see ``get_output_path``
+        workers: number of processes, default to the number of cores.
+            1 process frames in the current process.
+        resume: if True, skip frames whose output is newer than their input
+        read_method: see ``io.array_read``
+        write_method: see ``io.array_write``
+        bitdepth: see ``io.array_write``
+        progress_callback: called after each frame with (frames done, total, path)
+
+    Returns:
+        summary of the processing
+    """
+    # check the name early, before spawning processes
+    get_transform(transform_name)
+
+    input_paths = get_sequence(input_sequence)
+    result = BatchResult(total=len(input_paths))
+    workers = workers or os.cpu_count() or 1
+
+    jobs: List[Tuple[Path, Path]] = []
+    for index, input_path in enumerate(input_paths):
+        output_path = get_output_path(input_path, str(output_pattern), index)
+        if resume and _is_up_to_date(input_path, output_path):
+            result.skipped.append(input_path)
+            continue
+        jobs.append((input_path, output_path))
+
+    logger.info(
+        f"[process_sequence] Started <{transform_name}> on {len(jobs)} frames "
+        f"({len(result.skipped)} up to date) with {workers} workers."
+    )
+
+    def _on_done(input_path: Path, error: Optional[BaseException]):
+        if error:
+            logger.error(f"[process_sequence] Failed on <{input_path}>: {error}")
+            result.failed.append(input_path)
+        else:
+            result.processed.append(input_path)
+
+        done = len(result.processed) + len(result.failed) + len(result.skipped)
+        logger.info(f"[process_sequence] {done}/{result.total} <{input_path.name}>")
+        if progress_callback:
+            progress_callback(done, result.total, input_path)
+        return
+
+    _stime = time.perf_counter()
+    args = (read_method, write_method, bitdepth)
+
+    if jobs and workers == 1:
+        _worker_initialize(transform_name)
+        for input_path, output_path in jobs:
+            try:
+                _worker_process(input_path, output_path, *args)
+            except Exception as error:
+                _on_done(input_path, error)
+            else:
+                _on_done(input_path, None)
+
+    elif jobs:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_worker_initialize,
+            initargs=(transform_name,),
+        ) as executor:
+            futures = {
+                executor.submit(_worker_process, input_path, output_path, *args): (
+                    input_path
+                )
+                for input_path, output_path in jobs
+            }
+            for future in as_completed(futures):
+                _on_done(futures[future], future.exception())
+
+    result.duration = time.perf_counter() - _stime
+    logger.info(f"[process_sequence] Finished: {result}")
+    return result
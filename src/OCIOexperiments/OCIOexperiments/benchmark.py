@@ -0,0 +1,202 @@
+"""
+Speed and numerical-equivalence harness for colour transforms.
+
+Every transform is run on the same images, timed, its peak memory measured and
+its output compared to a reference transform using CIE 2000 delta E.
+"""
+import logging
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+import colour
+import numpy
+
+from . import c
+
+__all__ = [
+    "BenchmarkResult",
+    "get_ramp",
+    "get_delta_e",
+    "measure_time",
+    "measure_peak_memory",
+    "run_benchmark",
+    "format_results",
+]
+
+logger = logging.getLogger(f"{c.ABR}.benchmark")
+
+Transform = Callable[[numpy.ndarray], numpy.ndarray]
+
+RESOLUTIONS: Dict[str, Tuple[int, int]] = {
+    "360p": (640, 360),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+}
+"""
+(width, height) of the synthetic images used by default.
+"""
+
+
+@dataclass
+class BenchmarkResult:
+    transform: str
+    image: str
+    shape: Tuple[int, ...]
+    time: float
+    """
+    mean duration in seconds to process one frame
+    """
+    peak_memory: int
+    """
+    in bytes, allocated on top of the input while processing one frame
+    """
+    delta_e_max: float
+    delta_e_mean: float
+
+    def __str__(self) -> str:
+        return (
+            f"{self.transform:>20} | {self.image:>20} | {self.time * 1000:>9.2f}ms | "
+            f"{self.peak_memory / 2**20:>8.1f}MiB | "
+            f"ΔE max={self.delta_e_max:.4f} mean={self.delta_e_mean:.4f}"
+        )
+
+
+def get_ramp(width: int, height: int) -> numpy.ndarray:
+    """
+    Synthetic sRGB display-encoded image made of horizontal bands: a grey ramp,
+    red, green and blue ramps, and a full saturation hue sweep.
+
+    Returns:
+        float32 array, R-G-B format, values in [0-1]
+    """
+    ramp = numpy.linspace(0.0, 1.0, width, dtype=numpy.float32)
+    zeros = numpy.zeros_like(ramp)
+
+    hue = numpy.linspace(0.0, 6.0, width, dtype=numpy.float32)
+    hue_sweep = numpy.clip(
+        numpy.abs(((hue[:, numpy.newaxis] + [0.0, 4.0, 2.0]) % 6.0) - 3.0) - 1.0,
+        0.0,
+        1.0,
+    )
+
+    bands = [
+        numpy.stack((ramp,) * 3, axis=-1),
+        numpy.stack((ramp, zeros, zeros), axis=-1),
+        numpy.stack((zeros, ramp, zeros), axis=-1),
+        numpy.stack((zeros, zeros, ramp), axis=-1),
+        hue_sweep,
+    ]
+    rows = numpy.array_split(numpy.arange(height), len(bands))
+    array = numpy.empty((height, width, 3), dtype=numpy.float32)
+    for band, band_rows in zip(bands, rows):
+        array[band_rows] = band
+    return array
+
+
+def get_delta_e(
+    array: numpy.ndarray,
+    reference: numpy.ndarray,
+) -> Tuple[float, float]:
+    """
+    Args:
+        array: R-G-B format, sRGB Display encoding
+        reference: R-G-B format, sRGB Display encoding
+
+    Returns:
+        (max, mean) CIE 2000 delta E between both arrays
+    """
+
+    def _to_lab(_array):
+        _array = numpy.asarray(_array, dtype=numpy.float64)
+        return colour.XYZ_to_Lab(colour.sRGB_to_XYZ(_array))
+
+    delta_e = colour.delta_E(_to_lab(array), _to_lab(reference), method="CIE 2000")
+    return float(numpy.max(delta_e)), float(numpy.mean(delta_e))
+
+
+def measure_time(transform: Transform, array: numpy.ndarray, repeat: int) -> float:
+    """
+    Returns:
+        mean duration in seconds of a call to the transform, excluding a warm-up call.
+    """
+    transform(array.copy())
+
+    duration = 0.0
+    for _ in range(repeat):
+        # transforms are allowed to modify their input
+        source = array.copy()
+        _stime = time.perf_counter()
+        transform(source)
+        duration += time.perf_counter() - _stime
+
+    return duration / repeat
+
+
+def measure_peak_memory(transform: Transform, array: numpy.ndarray) -> int:
+    """
+    Returns:
+        peak memory in bytes allocated by a call to the transform.
+    """
+    source = array.copy()
+    tracemalloc.start()
+    try:
+        transform(source)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_benchmark(
+    transforms: Dict[str, Transform],
+    images: Dict[str, numpy.ndarray],
+    reference: str,
+    repeat: int = 10,
+) -> List[BenchmarkResult]:
+    """
+    Args:
+        transforms: transforms to compare, by name
+        images: float32 R-G-B arrays, sRGB Display encoding, by name
+        reference: name of the transform other transforms are compared to
+        repeat: number of time each transform is timed on each image
+
+    Returns:
+        one result per transform and image
+    """
+    if reference not in transforms:
+        raise ValueError(f"Reference <{reference}> is not in {list(transforms)}.")
+
+    results = []
+    for image_name, image in images.items():
+
+        expected = transforms[reference](image.copy())
+
+        for transform_name, transform in transforms.items():
+            delta_e = get_delta_e(transform(image.copy()), expected)
+            result = BenchmarkResult(
+                transform=transform_name,
+                image=image_name,
+                shape=image.shape,
+                time=measure_time(transform, image, repeat),
+                peak_memory=measure_peak_memory(transform, image),
+                delta_e_max=delta_e[0],
+                delta_e_mean=delta_e[1],
+            )
+            logger.info(f"[run_benchmark] {result}")
+            results.append(result)
+
+    return results
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    """
+    Returns:
+        results as a table, one line per result
+    """
+    header = (
+        f"{'transform':>20} | {'image':>20} | {'time/frame':>11} | "
+        f"{'peak mem':>11} | delta E against reference"
+    )
+    return "\n".join([header] + [str(result) for result in results])
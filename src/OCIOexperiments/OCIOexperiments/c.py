@@ -21,3 +21,13 @@ DATA_DIR: Path = DEV_DIR / "data"
 """
 Directory where you can find inputs for processing.
 """
+
+PRECISIONS = ("float32", "float16")
+"""
+Floating-point precisions images can be processed in.
+float16 halve the memory of the arrays and is enough for 8-bit display-referred
+sources, but it's slower to compute with: numpy has no fast float16 kernels and
+OCIO converts from and to it. On the bundled 720p frame, the OCIO path takes about
+twice as long and the native path about 10 times as long as in float32, so keep
+float32 for the live loops.
+"""
@@ -0,0 +1,549 @@
+"""
+Declarative colour transforms.
+
+A transform is a list of typed operations (``Power``, ``Gain``, ``Matrix``, ...).
+``plan()`` fold adjacent operations together and pick the cheapest way to execute
+each of them, returning a ``Plan`` that can be applied on arrays and profiled.
+
+Example::
+
+    plan = graph.plan([graph.Power(2.2), graph.Gain(2.0), graph.Saturation(1.2)])
+    array = plan.apply(array)
+    print(plan.profile(array))
+"""
+import collections
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy
+import PyOpenColorIO as ocio
+
+from . import c
+from . import lut
+from . import parallel
+from . import transforms
+
+__all__ = [
+    "Op",
+    "Power",
+    "Gain",
+    "Matrix",
+    "Saturation",
+    "Clip",
+    "LogAllocation",
+    "LUT1D",
+    "OCIOProcessor",
+    "Plan",
+    "PlanProfile",
+    "plan",
+]
+
+logger = logging.getLogger(f"{c.ABR}.graph")
+
+RGBValue = Union[float, Tuple[float, float, float]]
+
+
+# ---------------------------------------------------------------------------------
+# Operations
+
+
+class Op:
+    """
+    Base class for all operations of a transform.
+    """
+
+    def to_matrix(self) -> Optional[numpy.ndarray]:
+        """
+        Returns:
+            3x3 matrix equivalent to this operation if it is linear, else None.
+        """
+        return None
+
+
+@dataclass(frozen=True)
+class Power(Op):
+    exponent: float
+
+
+@dataclass(frozen=True)
+class Gain(Op):
+    gain: RGBValue
+    """
+    single multiplier or per-channel R-G-B multipliers
+    """
+
+    def to_matrix(self) -> numpy.ndarray:
+        return numpy.diag(numpy.broadcast_to(self.gain, (3,))).astype(numpy.float64)
+
+
+@dataclass(frozen=True, eq=False)
+class Matrix(Op):
+    matrix: numpy.ndarray
+    """
+    3x3 matrix applied on R-G-B column vectors
+    """
+
+    def to_matrix(self) -> numpy.ndarray:
+        return numpy.asarray(self.matrix, dtype=numpy.float64)
+
+
+@dataclass(frozen=True)
+class Saturation(Op):
+    """
+    Saturation based on the CDL formula ``luma + saturation * (rgb - luma)``.
+    """
+
+    saturation: float
+    weights: Tuple[float, float, float] = (0.2126, 0.7152, 0.0722)
+    """
+    coefficients used to compute the luma
+    """
+
+    def to_matrix(self) -> numpy.ndarray:
+        return transforms.saturation_matrix(self.saturation, self.weights)
+
+
+@dataclass(frozen=True)
+class Clip(Op):
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class LogAllocation(Op):
+    """
+    See ``transforms.open_domain_to_normalized_log2``
+    """
+
+    midgrey: float = 0.18
+    minimum_ev: float = -10.0
+    maximum_ev: float = +6.5
+
+
+@dataclass(frozen=True, eq=False)
+class LUT1D(Op):
+    lut: lut.DenseLUT1D
+
+
+@dataclass(frozen=True, eq=False)
+class OCIOProcessor(Op):
+    processor: ocio.CPUProcessor
+    workers: Optional[int] = 1
+    """
+    see ``parallel.apply_processor_parallel``
+    """
+
+
+# ---------------------------------------------------------------------------------
+# Executors
+
+
+class Step:
+    """
+    Executable form of one or more operations.
+
+    ``apply`` must support being called with <array> being <out>.
+    """
+
+    name: str = "step"
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name}>"
+
+    def apply(self, array: numpy.ndarray, out: numpy.ndarray) -> numpy.ndarray:
+        raise NotImplementedError()
+
+
+@dataclass(repr=False)
+class PowerStep(Step):
+    exponent: float
+
+    @property
+    def name(self) -> str:
+        return f"power({self.exponent:g})"
+
+    def apply(self, array: numpy.ndarray, out: numpy.ndarray) -> numpy.ndarray:
+        if self.exponent == 2:
+            return numpy.square(array, out=out)
+        if self.exponent == 0.5:
+            return numpy.sqrt(array, out=out)
+        return numpy.power(array, self.exponent, out=out)
+
+
+@dataclass(repr=False)
+class ScaleStep(Step):
+    """
+    Diagonal matrix, applied as a broadcast multiply.
+    """
+
+    gain: numpy.ndarray
+
+    @property
+    def name(self) -> str:
+        return f"scale({numpy.array2string(self.gain, precision=4)})"
+
+    def apply(self, array: numpy.ndarray, out: numpy.ndarray) -> numpy.ndarray:
+        gain = self.gain[0] if numpy.all(self.gain == self.gain[0]) else self.gain
+        return numpy.multiply(array, gain.astype(out.dtype), out=out)
+
+
+@dataclass(repr=False)
+class MatrixStep(Step):
+    matrix: numpy.ndarray
+    _local: threading.local = field(
+        default_factory=threading.local, init=False, compare=False
+    )
+    """
+    scratch buffers, per thread as plans are cached and shared by every caller
+    """
+
+    name = "matrix"
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def _get_scratch(self, out: numpy.ndarray) -> numpy.ndarray:
+        buffers = getattr(self._local, "scratch", None)
+        if buffers is None:
+            buffers = self._local.scratch = collections.OrderedDict()
+
+        key = (out.shape, out.dtype)
+        scratch = buffers.get(key)
+        if scratch is None:
+            scratch = buffers[key] = numpy.empty_like(out)
+            if len(buffers) > lut.SCRATCH_SHAPES:
+                buffers.popitem(last=False)
+        else:
+            buffers.move_to_end(key)
+        return scratch
+
+    def apply(self, array: numpy.ndarray, out: numpy.ndarray) -> numpy.ndarray:
+        if array is not out:
+            return transforms.apply_matrix(array, self.matrix, out=out)
+
+        # matmul can't write in its input, use a reusable buffer instead of a copy
+        scratch = self._get_scratch(out)
+        transforms.apply_matrix(array, self.matrix, out=scratch)
+        numpy.copyto(out, scratch)
+        return out
+
+
+@dataclass(repr=False)
+class ClipStep(Step):
+    minimum: Optional[float]
+    maximum: Optional[float]
+
+    @property
+    def name(self) -> str:
+        return f"clip({self.minimum}, {self.maximum})"
+
+    def apply(self, array: numpy.ndarray, out: numpy.ndarray) -> numpy.ndarray:
+        return numpy.clip(array, self.minimum, self.maximum, out=out)
+
+
+@dataclass(repr=False)
+class LogAllocationStep(Step):
+    op: LogAllocation
+
+    name = "log allocation"
+
+    def apply(self, array: numpy.ndarray, out: numpy.ndarray) -> numpy.ndarray:
+        return transforms.open_domain_to_normalized_log2(
+            array,
+            in_midgrey=self.op.midgrey,
+            minimum_ev=self.op.minimum_ev,
+            maximum_ev=self.op.maximum_ev,
+            out=out,
+        )
+
+
+@dataclass(repr=False)
+class LUT1DStep(Step):
+    lut: lut.DenseLUT1D
+
+    @property
+    def name(self) -> str:
+        return f"lut1d({self.lut.name})"
+
+    def apply(self, array: numpy.ndarray, out: numpy.ndarray) -> numpy.ndarray:
+        return self.lut.apply(array, out=out)
+
+
+@dataclass(repr=False)
+class OCIOProcessorStep(Step):
+    processor: ocio.CPUProcessor
+    workers: Optional[int]
+
+    name = "ocio processor"
+
+    def apply(self, array: numpy.ndarray, out: numpy.ndarray) -> numpy.ndarray:
+        if array is not out:
+            numpy.copyto(out, array)
+        return parallel.apply_processor_parallel(
+            self.processor,
+            out,
+            workers=self.workers,
+        )
+
+
+# ---------------------------------------------------------------------------------
+# Planning
+
+
+def _fold(ops: Sequence[Op], non_negative: bool = False) -> List[Op]:
+    """
+    Merge adjacent operations that can be expressed as a single one.
+
+    - consecutive linear operations (gain, saturation, matrix) become one matrix
+    - a diagonal matrix with positive gains before a power is moved after it
+      (``(g*x)^p = g^p * x^p``) so it can be merged with the linear operations
+      that follow
+    - consecutive powers are multiplied if both exponents are integers or their
+      input is known to be >= 0: ``(x^2)^0.5`` is ``|x|``, not ``x``.
+    - consecutive clips are intersected
+
+    Args:
+        ops: operations of the transform, in order.
+        non_negative: if True the input of the first operation is known to be >= 0.
+            Else only the operations after a clip to a positive minimum are.
+    """
+    folded: List[Op] = []
+    inputs: List[bool] = []
+    """
+    for each folded operation, if its input is known to be >= 0
+    """
+
+    def _push(op: Op):
+        previous = folded[-1] if folded else None
+        matrix = op.to_matrix()
+
+        if matrix is not None and previous is not None:
+            previous_matrix = previous.to_matrix()
+            if previous_matrix is not None:
+                folded[-1] = Matrix(
+                    transforms.compose_matrices(previous_matrix, matrix)
+                )
+                return
+
+        elif isinstance(op, Power) and previous is not None:
+
+            if isinstance(previous, Power) and (
+                inputs[-1]
+                or (_is_integer(previous.exponent) and _is_integer(op.exponent))
+            ):
+                folded[-1] = Power(previous.exponent * op.exponent)
+                return
+
+            previous_matrix = previous.to_matrix()
+            if previous_matrix is not None and _is_diagonal(previous_matrix):
+                gain = numpy.diag(previous_matrix)
+                if numpy.all(gain > 0):
+                    folded.pop()
+                    inputs.pop()
+                    # fold again in case the new previous is a power
+                    _push(op)
+                    _push(Gain(tuple(gain**op.exponent)))
+                    return
+
+        elif isinstance(op, Clip) and isinstance(previous, Clip):
+            folded[-1] = Clip(
+                _combine(previous.minimum, op.minimum, max),
+                _combine(previous.maximum, op.maximum, min),
+            )
+            return
+
+        inputs.append(
+            _keeps_non_negative(folded[-1], inputs[-1]) if folded else non_negative
+        )
+        folded.append(op)
+
+    for op in ops:
+        _push(op)
+
+    return folded
+
+
+def _keeps_non_negative(op: Op, non_negative: bool) -> bool:
+    """
+    Args:
+        op: operation to check the output of
+        non_negative: if the input of the operation is known to be >= 0
+
+    Returns:
+        True if the output of the operation is known to be >= 0 (or NaN).
+    """
+    if isinstance(op, Clip):
+        return non_negative or (op.minimum is not None and op.minimum >= 0)
+    if isinstance(op, LogAllocation):
+        return True
+    if isinstance(op, Power):
+        return non_negative
+    matrix = op.to_matrix()
+    if matrix is not None:
+        return non_negative and bool(numpy.all(matrix >= 0))
+    return False
+
+
+def _is_integer(value: float) -> bool:
+    return float(value).is_integer()
+
+
+def _combine(a: Optional[float], b: Optional[float], function) -> Optional[float]:
+    if a is None or b is None:
+        return b if a is None else a
+    return function(a, b)
+
+
+def _is_diagonal(matrix: numpy.ndarray) -> bool:
+    return numpy.count_nonzero(matrix - numpy.diag(numpy.diag(matrix))) == 0
+
+
+def _get_step(op: Op) -> Optional[Step]:
+    """
+    Returns:
+        the cheapest executor for the given operation, None if it does nothing.
+    """
+    matrix = op.to_matrix()
+    if matrix is not None:
+        if numpy.allclose(matrix, numpy.identity(3)):
+            return None
+        if _is_diagonal(matrix):
+            return ScaleStep(numpy.diag(matrix).copy())
+        return MatrixStep(matrix)
+
+    if isinstance(op, Power):
+        return None if op.exponent == 1 else PowerStep(op.exponent)
+    if isinstance(op, Clip):
+        if op.minimum is None and op.maximum is None:
+            return None
+        return ClipStep(op.minimum, op.maximum)
+    if isinstance(op, LogAllocation):
+        return LogAllocationStep(op)
+    if isinstance(op, LUT1D):
+        return LUT1DStep(op.lut)
+    if isinstance(op, OCIOProcessor):
+        return OCIOProcessorStep(op.processor, op.workers)
+
+    raise TypeError(f"Unsupported operation {op}.")
+
+
+@dataclass
+class PlanProfile:
+    timings: List[Tuple[str, float]]
+    """
+    (step name, mean duration in seconds) for each step
+    """
+    shape: Tuple[int, ...]
+
+    @property
+    def total(self) -> float:
+        return sum(timing for _, timing in self.timings)
+
+    def __str__(self) -> str:
+        lines = [f"[PlanProfile] {self.shape} total={self.total * 1000:.2f}ms"]
+        lines += [
+            f"    {timing * 1000:>8.2f}ms {name}" for name, timing in self.timings
+        ]
+        return "\n".join(lines)
+
+
+class Plan:
+    """
+    Ordered executors resulting from the planning of a list of operations.
+    """
+
+    def __init__(self, ops: Sequence[Op], steps: List[Step]):
+        self.ops = list(ops)
+        self.steps = steps
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {len(self.ops)} ops -> "
+            f"{' > '.join(step.name for step in self.steps)}>"
+        )
+
+    def apply(
+        self,
+        array: numpy.ndarray,
+        out: Optional[numpy.ndarray] = None,
+    ) -> numpy.ndarray:
+        """
+        Args:
+            array: float array, R-G-B format, not modified unless it is <out>.
+            out: array to write the result in, a new one of the same type as
+                <array> is created if None.
+
+        Returns:
+            the transformed array
+        """
+        if out is None:
+            out = numpy.empty_like(array)
+
+        if not self.steps:
+            numpy.copyto(out, array)
+            return out
+
+        source = array
+        for step in self.steps:
+            source = step.apply(source, out)
+        return out
+
+    __call__ = apply
+
+    def profile(self, array: numpy.ndarray, repeat: int = 10) -> PlanProfile:
+        """
+        Measure the mean duration of each step on the given array.
+
+        Args:
+            array: float array, R-G-B format, not modified.
+            repeat: number of time the plan is applied
+        """
+        timings = [0.0] * len(self.steps)
+        out = numpy.empty_like(array)
+
+        for _ in range(repeat):
+            source = array
+            for index, step in enumerate(self.steps):
+                _stime = time.perf_counter()
+                source = step.apply(source, out)
+                timings[index] += time.perf_counter() - _stime
+
+        return PlanProfile(
+            timings=[
+                (step.name, timing / repeat)
+                for step, timing in zip(self.steps, timings)
+            ],
+            shape=array.shape,
+        )
+
+
+def plan(
+    ops: Sequence[Op],
+    optimize: bool = True,
+    non_negative: bool = False,
+) -> Plan:
+    """
+    Args:
+        ops: operations of the transform, in order.
+        optimize: if False each operation is executed as is, useful to compare
+            with the optimized plan.
+        non_negative: if True the arrays the plan is applied on must be >= 0, which
+            allows folding consecutive powers with fractional exponents.
+            The result on negative values is undefined then.
+
+    Returns:
+        plan ready to be applied on arrays
+    """
+    folded = _fold(ops, non_negative=non_negative) if optimize else list(ops)
+    steps = [step for step in map(_get_step, folded) if step is not None]
+    logger.debug(f"[plan] {len(ops)} ops planned in {len(steps)} steps.")
+    return Plan(ops, steps)
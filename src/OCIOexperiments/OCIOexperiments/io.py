@@ -18,6 +18,7 @@ logger = logging.getLogger(f"{c.ABR}.io")
 def array_read(
     input_path: Path,
     method: Literal["oiio", "cv2", "pillow"],
+    precision: Literal["float32", "float16"] = "float32",
     **kwargs,
 ) -> numpy.ndarray:
     """
@@ -25,13 +26,18 @@ def array_read(
     Args:
         input_path: full path with extension for input reading
         method: which librairy to choose for export
+        precision: floating-point type of the returned array, see ``c.PRECISIONS``
         **kwargs: kwargs passed to the writing method for each librairy
 
     Returns:
-        32-bit float numpy array of the image
+        32-bit (or 16-bit depending on precision) float numpy array of the image
     """
     array: numpy.ndarray
 
+    if precision not in c.PRECISIONS:
+        raise ValueError(f"Precision <{precision}> passed is not supported.")
+    dtype = numpy.dtype(precision)
+
     if method == "cv2":
 
         array: numpy.ndarray = cv2.imread(str(input_path), **kwargs)
@@ -39,21 +45,27 @@ def array_read(
             array,
             cv2.COLOR_BGR2RGB,
         )
-        if array.dtype != numpy.float32:
-            array = array.astype(numpy.float32)
-            array /= 255
-            logger.debug("[array_read]<cv2> converted to float32")
+        if numpy.issubdtype(array.dtype, numpy.integer):
+            maximum = numpy.iinfo(array.dtype).max
+            array = array.astype(dtype)
+            array /= maximum
+            logger.debug(f"[array_read]<cv2> normalized to {precision}")
+        elif array.dtype != dtype:
+            array = array.astype(dtype)
+            logger.debug(f"[array_read]<cv2> converted to {precision}")
 
     elif method == "pillow":
 
         array: PIL.Image.Image = PIL.Image.open(input_path)
-        array: numpy.ndarray = array.__array__(dtype=numpy.float32)
+        array: numpy.ndarray = array.__array__(dtype=dtype)
 
     elif method == "oiio":
 
         array: oiio.ImageInput = oiio.ImageInput.open(str(input_path))
         assert array, f"OIIO: ImageInput for {input_path} not created."
-        array: numpy.ndarray = array.read_image(oiio.FLOAT)
+        array: numpy.ndarray = array.read_image(
+            oiio.HALF if precision == "float16" else oiio.FLOAT
+        )
 
     else:
         raise ValueError(f"Method <{method}> passed is not supported.")
@@ -0,0 +1,284 @@
+"""
+Lightweight 1D LUT application, faster than ``colour.LUT1D.apply``.
+
+The LUT is resampled once on a dense uniform domain so applying it is only an
+index computation followed by a linear interpolation, written in preallocated
+buffers.
+"""
+import collections
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import colour
+import numpy
+
+from . import c
+
+__all__ = ["DenseLUT1D"]
+
+logger = logging.getLogger(f"{c.ABR}.lut")
+
+SCRATCH_SHAPES = 4
+"""
+Maximum number of array shapes scratch buffers are kept for, per thread.
+"""
+
+
+class DenseLUT1D:
+    """
+    1D LUT with a uniform domain, applied with a vectorised index-and-lerp.
+
+    The table can have 1 component, applied on every channel, or 3 components,
+    applied per channel.
+
+    Values outside the domain are clamped to the table ends (like OCIO does).
+
+    Instances keep scratch buffers per thread and per array shape to avoid
+    allocations, so a single instance can be shared by multiple threads.
+    """
+
+    def __init__(
+        self,
+        table: numpy.ndarray,
+        domain: Tuple[float, float] = (0.0, 1.0),
+        name: str = "",
+    ):
+        """
+        Args:
+            table: (size,) or (size, 3) array of output values for uniformly
+                spaced inputs over the domain.
+            domain: input value of the first and last entry of the table
+            name: for debugging
+        """
+        if table.ndim not in (1, 2) or (table.ndim == 2 and table.shape[1] != 3):
+            raise ValueError(
+                f"Unsupported table shape {table.shape}, expected (size,) or (size, 3)."
+            )
+        if table.shape[0] < 2:
+            raise ValueError(f"Table must have at least 2 entries, got {table.shape}.")
+
+        self.name = name
+        self.table: numpy.ndarray = numpy.ascontiguousarray(table, dtype=numpy.float32)
+        self.domain: Tuple[float, float] = (float(domain[0]), float(domain[1]))
+
+        self._tables: Dict[numpy.dtype, Tuple[numpy.ndarray, numpy.ndarray]] = {}
+
+        self._scale = (self.size - 1) / (self.domain[1] - self.domain[0])
+        self._bias = -self.domain[0] * self._scale
+
+        self._local = threading.local()
+        self._quantised_tables: Dict[int, numpy.ndarray] = {}
+        return
+
+    def __getstate__(self) -> dict:
+        # scratch buffers are per thread, never pickled
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {self.name!r} size={self.size} "
+            f"components={self.components} domain={self.domain}>"
+        )
+
+    @classmethod
+    def from_colour(
+        cls,
+        lut: Union[colour.LUT1D, colour.LUT3x1D],
+        size: Optional[int] = None,
+    ) -> "DenseLUT1D":
+        """
+        Resample the given colour-science LUT on a uniform domain.
+
+        Args:
+            lut: 1D or 3x1D LUT
+            size: number of entries of the dense table, default to
+                ``max(lut.size, 4096)``
+
+        """
+        size = size or max(lut.size, 4096)
+        domain = (float(numpy.min(lut.domain)), float(numpy.max(lut.domain)))
+
+        samples = numpy.linspace(domain[0], domain[1], size)
+        if isinstance(lut, colour.LUT3x1D):
+            samples = numpy.tile(samples[:, numpy.newaxis], (1, 3))
+
+        table = lut.apply(samples)
+        logger.debug(
+            f"[{cls.__name__}][from_colour] {lut.name} resampled from "
+            f"{lut.size} to {size} entries."
+        )
+        return cls(table, domain=domain, name=lut.name)
+
+    @classmethod
+    def from_spi1d(cls, path: Path, size: Optional[int] = None) -> "DenseLUT1D":
+        """
+        Args:
+            path: path to a Sony .spi1d file
+            size: see ``from_colour``
+        """
+        return cls.from_colour(colour.io.read_LUT_SonySPI1D(str(path)), size=size)
+
+    @property
+    def size(self) -> int:
+        return self.table.shape[0]
+
+    @property
+    def components(self) -> int:
+        return 1 if self.table.ndim == 1 else 3
+
+    def _get_scratch(
+        self, shape: Tuple[int, ...]
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Returns:
+            (float32 position buffer, integer index buffer) of the given shape,
+            owned by the calling thread.
+        """
+        buffers = getattr(self._local, "scratch", None)
+        if buffers is None:
+            buffers = self._local.scratch = collections.OrderedDict()
+
+        scratch = buffers.get(shape)
+        if scratch is None:
+            scratch = (
+                numpy.empty(shape, dtype=numpy.float32),
+                numpy.empty(shape, dtype=numpy.intp),
+            )
+            buffers[shape] = scratch
+            # only keep the buffers of the most recently used shapes
+            if len(buffers) > SCRATCH_SHAPES:
+                buffers.popitem(last=False)
+        else:
+            buffers.move_to_end(shape)
+        return scratch
+
+    def _get_tables(self, dtype: numpy.dtype) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Returns:
+            (values, deltas to the next value) flattened tables of the given dtype,
+            so per-channel lookups are a single take() on offset indexes.
+        """
+        dtype = numpy.dtype(dtype)
+        tables = self._tables.get(dtype)
+        if tables is None:
+            deltas = numpy.diff(self.table, axis=0, append=self.table[-1:])
+            tables = (
+                self.table.astype(dtype).ravel(),
+                deltas.astype(dtype).ravel(),
+            )
+            self._tables[dtype] = tables
+        return tables
+
+    def _check_channels(self, array: numpy.ndarray):
+        if self.components == 3 and array.shape[-1] != 3:
+            raise ValueError(
+                f"{self} expects R-G-B arrays, got array of shape {array.shape}."
+            )
+
+    def apply(
+        self,
+        array: numpy.ndarray,
+        out: Optional[numpy.ndarray] = None,
+    ) -> numpy.ndarray:
+        """
+        Linearly interpolate the table at every value of the array.
+
+        Args:
+            array: float array of any shape, last axis must be 3 for 3-components LUTs.
+            out: array of the same shape to write the result in, can be <array>
+                itself to apply the LUT in place. A new array of the same dtype is
+                created if None.
+
+        Returns:
+            the interpolated values
+        """
+        self._check_channels(array)
+        if out is None:
+            out = numpy.empty_like(array)
+
+        # position and index are always computed in float32, float16 can't index
+        # large tables precisely.
+        position, index = self._get_scratch(array.shape)
+        numpy.multiply(array, self._scale, out=position)
+        position += self._bias
+        numpy.clip(position, 0, self.size - 1, out=position)
+        # positions are positive so truncating is flooring
+        numpy.copyto(index, position, casting="unsafe")
+        # position become the fractional part used for the interpolation
+        position -= index
+
+        if self.components == 3:
+            index *= 3
+            index += numpy.arange(3)
+
+        _, deltas = self._get_tables(out.dtype)
+        values, _ = self._get_tables(position.dtype)
+        numpy.take(deltas, index, out=out, mode="clip")
+        out *= position
+        # the fractional part is consumed, reuse its buffer for the table values
+        numpy.take(values, index, out=position, mode="clip")
+        out += position
+        return out
+
+    def get_quantised_table(self, bits: int) -> numpy.ndarray:
+        """
+        Args:
+            bits: bit-depth of the integer code values the table is for.
+
+        Returns:
+            flat table with one entry per code value (times components), for
+            code values mapped to the [0-1] range.
+        """
+        table = self._quantised_tables.get(bits)
+        if table is None:
+            levels = numpy.arange(2**bits, dtype=numpy.float32) / (2**bits - 1)
+            if self.components == 3:
+                levels = numpy.tile(levels[:, numpy.newaxis], (1, 3))
+            table = self.apply(levels).ravel()
+            self._quantised_tables[bits] = table
+        return table
+
+    def apply_quantised(
+        self,
+        array: numpy.ndarray,
+        out: Optional[numpy.ndarray] = None,
+    ) -> numpy.ndarray:
+        """
+        Apply the LUT on integer code values using a single ``numpy.take``.
+
+        Code values are considered normalized on their full range, so 0 map to
+        0.0 and 255 to 1.0 for uint8.
+
+        Args:
+            array: unsigned integer array (uint8 or uint16)
+            out: float array of the same shape to write the result in, a new
+                float32 array is created if None.
+
+        Returns:
+            the looked-up values
+        """
+        if array.dtype not in (numpy.uint8, numpy.uint16):
+            raise TypeError(f"Expected an uint8 or uint16 array, got {array.dtype}.")
+
+        self._check_channels(array)
+        if out is None:
+            out = numpy.empty(array.shape, dtype=numpy.float32)
+
+        table = self.get_quantised_table(array.dtype.itemsize * 8)
+        if self.components == 3:
+            _, index = self._get_scratch(array.shape)
+            numpy.copyto(index, array)
+            index *= 3
+            index += numpy.arange(3)
+            array = index
+
+        numpy.take(table, array, out=out, mode="clip")
+        return out
@@ -0,0 +1,117 @@
+"""
+Multi-threaded helpers to apply OCIO CPU processors on large arrays.
+
+OCIO release the GIL while applying a processor, so splitting a frame in horizontal
+stripes and dispatching them over a thread pool scale with the number of cores.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from typing import List, Optional
+
+import numpy
+import PyOpenColorIO as ocio
+
+from . import c
+
+__all__ = [
+    "get_default_workers",
+    "get_thread_pool",
+    "get_stripes",
+    "apply_processor_parallel",
+]
+
+logger = logging.getLogger(f"{c.ABR}.parallel")
+
+
+def get_default_workers() -> int:
+    """
+    Returns:
+        number of workers to use when none is specified: the number of cores.
+    """
+    return os.cpu_count() or 1
+
+
+@cache
+def get_thread_pool(workers: int) -> ThreadPoolExecutor:
+    """
+    Thread pools are cached per worker count so they are not rebuilt on every frame.
+
+    Args:
+        workers: maximum number of threads in the pool
+    """
+    logger.debug(f"[get_thread_pool] Creating pool with {workers} workers.")
+    return ThreadPoolExecutor(
+        max_workers=workers,
+        thread_name_prefix=f"{c.ABR}.parallel",
+    )
+
+
+def get_stripes(height: int, stripes: int) -> List[slice]:
+    """
+    Split the given number of rows in <stripes> contiguous slices of similar size.
+
+    Args:
+        height: number of rows to split
+        stripes: number of slices to return, clamped to [1, height]
+
+    Returns:
+        list of row slices covering the full height
+    """
+    stripes = max(1, min(stripes, height))
+    bounds = numpy.linspace(0, height, stripes + 1, dtype=int)
+    return [slice(bounds[i], bounds[i + 1]) for i in range(stripes)]
+
+
+def apply_processor_parallel(
+    processor: ocio.CPUProcessor,
+    array: numpy.ndarray,
+    workers: Optional[int] = None,
+    stripes: Optional[int] = None,
+) -> numpy.ndarray:
+    """
+    Apply the given processor in place on horizontal stripes of the array,
+    over a thread pool.
+
+    Args:
+        processor: OCIO CPU processor to apply, expecting R-G-B data.
+        array: float32 array of shape (height, width, 3), modified in place. Must be
+            C-contiguous to be split in stripes, else it's processed as a
+            contiguous copy with a single worker.
+        workers: number of threads to use, default to the number of cores.
+            1 apply the processor directly from the calling thread.
+        stripes: number of stripes to split the array in, default to <workers>.
+
+    Returns:
+        the same array, for convenience
+    """
+    workers = workers or get_default_workers()
+    stripes = stripes or workers
+
+    if workers == 1 and stripes == 1:
+        if array.flags.c_contiguous:
+            processor.applyRGB(array)
+        else:
+            # OCIO only applies on C-contiguous buffers
+            contiguous = numpy.ascontiguousarray(array)
+            processor.applyRGB(contiguous)
+            array[...] = contiguous
+        return array
+
+    if not array.flags.c_contiguous:
+        raise ValueError(
+            f"[apply_processor_parallel] Given array {array.shape} is not C-contiguous."
+        )
+
+    # stripes of a C-contiguous array are contiguous views, OCIO write in them directly
+    pool = get_thread_pool(workers)
+    futures = [
+        pool.submit(processor.applyRGB, array[stripe])
+        for stripe in get_stripes(array.shape[0], stripes)
+    ]
+    for future in futures:
+        # propagate exceptions raised in workers
+        future.result()
+
+    return array
@@ -2,6 +2,8 @@
 
 """
 import logging
+import math
+from typing import Optional, Tuple
 
 import numpy
 
@@ -15,22 +17,104 @@ def open_domain_to_normalized_log2(
     in_midgrey: float = 0.18,
     minimum_ev: float = -10.0,
     maximum_ev: float = +6.5,
+    out: Optional[numpy.ndarray] = None,
 ) -> numpy.ndarray:
     """
     Similar to lg2 AllocationTransform.
     Source: https://github.com/sobotka/AgX-S2O3/blob/main/AgX.py
 
+    The input is not modified and no temporary array is created: the mid-grey
+    division is folded in the log offset and every step write in <out>.
+
     Args:
-        in_od: numpy array
+        in_od: float numpy array
         in_midgrey:
         minimum_ev:
         maximum_ev:
+        out: array of the same shape to write the result in, can be <in_od> itself.
+            A new array of the same dtype is created if None.
 
+    Returns:
+        normalized log2 values in the [0-1] range
     """
+    if out is None:
+        out = numpy.empty_like(in_od)
+
+    total_exposure = maximum_ev - minimum_ev
+    scale = 1.0 / total_exposure
+    offset = -(math.log2(in_midgrey) + minimum_ev) * scale
+    # anything under this value is clipped to 0 anyway, using it instead of
+    # the dtype epsilon avoid -inf and stay representable in float16.
+    floor = in_midgrey * 2.0**minimum_ev
 
-    in_od[in_od <= 0.0] = numpy.finfo(float).eps
+    numpy.maximum(in_od, floor, out=out)
+    numpy.log2(out, out=out)
+    out *= scale
+    out += offset
+    numpy.clip(out, 0.0, 1.0, out=out)
+    return out
 
-    output_log = numpy.clip(numpy.log2(in_od / in_midgrey), minimum_ev, maximum_ev)
 
-    total_exposure = maximum_ev - minimum_ev
-    return (output_log - minimum_ev) / total_exposure
+def saturation_matrix(
+    saturation: float,
+    weights: Tuple[float, float, float] = (0.2126, 0.7152, 0.0722),
+) -> numpy.ndarray:
+    """
+    Saturation based on the CDL formula ``luma + saturation * (rgb - luma)``,
+    expressed as a 3x3 matrix.
+
+    Args:
+        saturation:
+        weights: R-G-B coefficients used to compute the luma
+
+    Returns:
+        3x3 float64 matrix applied on R-G-B column vectors
+    """
+    luma = numpy.tile(numpy.asarray(weights, dtype=numpy.float64), (3, 1))
+    return saturation * numpy.identity(3) + (1 - saturation) * luma
+
+
+def compose_matrices(*matrices: numpy.ndarray) -> numpy.ndarray:
+    """
+    Args:
+        matrices: 3x3 matrices in the order they would be applied
+
+    Returns:
+        single 3x3 float64 matrix equivalent to applying all the given ones
+    """
+    composed = numpy.identity(3)
+    for matrix in matrices:
+        composed = numpy.asarray(matrix, dtype=numpy.float64) @ composed
+    return composed
+
+
+def apply_matrix(
+    array: numpy.ndarray,
+    matrix: numpy.ndarray,
+    out: Optional[numpy.ndarray] = None,
+) -> numpy.ndarray:
+    """
+    Apply a 3x3 matrix on every R-G-B pixel with a single matmul on a (N, 3) view.
+
+    Args:
+        array: float array of shape (..., 3)
+        matrix: 3x3 matrix applied on R-G-B column vectors
+        out: array of the same shape to write the result in, faster if
+            C-contiguous. A new array of the same dtype is created if None.
+            If it is <array> itself, a temporary copy of the input is made.
+
+    Returns:
+        the transformed array
+    """
+    if out is None:
+        out = numpy.empty_like(array, order="C")
+    elif numpy.shares_memory(array, out):
+        array = array.copy()
+
+    matrix = matrix.T.astype(out.dtype)
+    if out.flags.c_contiguous:
+        numpy.matmul(array.reshape(-1, 3), matrix, out=out.reshape(-1, 3))
+    else:
+        # reshape would return a copy the result is lost in
+        numpy.matmul(array, matrix, out=out)
+    return out
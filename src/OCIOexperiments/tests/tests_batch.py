@@ -0,0 +1,79 @@
+"""
+
+"""
+import logging
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy
+
+import OCIOexperiments as ocex
+
+logger = logging.getLogger(f"{ocex.c.ABR}.tests_batch")
+
+
+def setup_logging(level):
+
+    logger = logging.getLogger(ocex.c.ABR)
+    logger.setLevel(level)
+
+    if not logger.handlers:
+        # create a file handler
+        handler = logging.StreamHandler(stream=sys.stdout)
+        handler.setLevel(logging.DEBUG)
+        # create a logging format
+        formatter = logging.Formatter(
+            "%(asctime)s - [%(levelname)7s] %(name)30s // %(message)s",
+            datefmt="%H:%M:%S",
+        )
+        handler.setFormatter(formatter)
+        # add the file handler to the logger
+        logger.addHandler(handler)
+
+    return logger
+
+
+def test_process_sequence():
+
+    input_sequence = ocex.c.DATA_DIR / "webcam" / "webcam-c922-A.*.tif"
+    kwargs = dict(
+        transform_name="agxc.look_1",
+        read_method="cv2",
+        write_method="pillow",
+        bitdepth=numpy.uint8,
+    )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_pattern = Path(tmpdir) / "webcam-c922-A.look_1.$FRAME.tif"
+
+        result = ocex.batch.process_sequence(
+            input_sequence, output_pattern=output_pattern, **kwargs
+        )
+        assert result.total > 0, result
+        assert not result.failed, result.failed
+        assert len(result.processed) == result.total, result
+
+        input_path = result.processed[0]
+        output_path = ocex.batch.get_output_path(input_path, str(output_pattern), 0)
+        written = ocex.io.array_read(output_path, method="cv2")
+        # same conversion as array_write for an uint8 bitdepth
+        expected = ocex.batch.get_transform("agxc.look_1")(
+            ocex.io.array_read(input_path, method="cv2")
+        )
+        expected = (expected * 255).astype(numpy.uint8)
+        difference = numpy.abs(written * 255 - expected).max()
+        assert difference < 1.5, difference
+
+        # everything is up-to-date now
+        result = ocex.batch.process_sequence(
+            input_sequence, output_pattern=output_pattern, **kwargs
+        )
+        assert len(result.skipped) == result.total, result
+    return
+
+if __name__ == "__main__":
+
+    setup_logging(logging.DEBUG)
+    test_process_sequence()
+    logger.info("Finished.")
@@ -0,0 +1,129 @@
+"""
+Check ``graph`` planning gives the same result as the unoptimized operations.
+
+Run this file directly to print the profiles of both plans.
+"""
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+
+import OCIOexperiments as ocex
+from OCIOexperiments import graph
+
+
+def _get_test_array(width: int = 256, height: int = 128) -> numpy.ndarray:
+    rng = numpy.random.default_rng(seed=0)
+    return rng.uniform(0.0, 1.0, size=(height, width, 3)).astype(numpy.float32)
+
+
+def test_fold():
+
+    ops = [
+        graph.Power(2.2),
+        graph.Gain(2.0),
+        graph.Power(1.3),
+        graph.Saturation(1.2),
+        graph.Matrix(numpy.identity(3) * 0.5),
+        graph.Clip(minimum=0.0),
+        graph.Clip(maximum=1.0),
+        graph.Power(1.0),
+    ]
+    plan = graph.plan(ops, non_negative=True)
+    names = [step.name for step in plan.steps]
+    assert names == ["power(2.86)", "matrix", "clip(0.0, 1.0)"], names
+    # the powers can't be merged if the input may be negative
+    names = [step.name for step in graph.plan(ops).steps]
+    assert names == ["power(2.2)", "power(1.3)", "matrix", "clip(0.0, 1.0)"], names
+
+    array = _get_test_array()
+    expected = graph.plan(ops, optimize=False).apply(array)
+    result = plan.apply(array)
+    assert numpy.allclose(result, expected, atol=1e-5), abs(result - expected).max()
+
+    plan.apply(array, out=array)
+    assert numpy.allclose(array, expected, atol=1e-5), "in place apply failed"
+    return
+
+
+def test_fold_negative():
+    """
+    Folding must not change the result on negative values.
+    """
+
+    array = _get_test_array() * 2 - 1
+    for ops, steps in (
+        ([graph.Power(2), graph.Power(0.5)], 2),
+        ([graph.Power(2), graph.Power(3)], 1),
+        ([graph.Clip(minimum=0.0), graph.Power(2), graph.Power(0.5)], 1),
+        ([graph.Gain(-2.0), graph.Power(0.5)], 2),
+        ([graph.Gain(2.0), graph.Power(3), graph.Saturation(1.2)], 2),
+    ):
+        plan = graph.plan(ops)
+        assert len(plan.steps) == steps, (ops, plan.steps)
+        expected = graph.plan(ops, optimize=False).apply(array)
+        result = plan.apply(array)
+        assert numpy.allclose(result, expected, atol=1e-5, equal_nan=True), ops
+    return
+
+
+def test_graph_inout_look_1():
+
+    array = _get_test_array()
+    expected = ocex.agxc.transforms.transform_native_inout_look_1(array)
+    result = ocex.agxc.transforms.transform_graph_inout_look_1(array)
+    assert numpy.allclose(result, expected, atol=1e-5), abs(result - expected).max()
+    return
+
+
+def test_plan_threads():
+    """
+    A cached plan is shared by every thread, in place matrices must not share their
+    scratch buffer.
+    """
+    plan = graph.plan(
+        [graph.Saturation(1.2), graph.Clip(minimum=0.0), graph.Power(1.5)]
+    )
+    assert any(isinstance(step, graph.MatrixStep) for step in plan.steps), plan
+    rng = numpy.random.default_rng(seed=1)
+    arrays = [
+        rng.uniform(0.0, 1.0, size=(360, 640, 3)).astype(numpy.float32)
+        for _ in range(8)
+    ]
+    expected = [plan.apply(array) for array in arrays]
+
+    def apply_in_place(array):
+        array = array.copy()
+        return plan.apply(array, out=array)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for _ in range(5):
+            results = list(executor.map(apply_in_place, arrays))
+            for result, reference in zip(results, expected):
+                assert numpy.array_equal(result, reference)
+
+    copy = pickle.loads(pickle.dumps(plan))
+    assert numpy.array_equal(apply_in_place(arrays[0]), expected[0])
+    assert numpy.array_equal(copy.apply(arrays[0]), expected[0])
+    return
+
+
+def profile_inout_look_1():
+
+    array = _get_test_array(1280, 720)
+    ops = ocex.agxc.transforms.get_inout_look_1_ops("native")
+
+    for optimize in (False, True):
+        plan = graph.plan(ops, optimize=optimize)
+        print(f"[profile_inout_look_1] optimize={optimize} {plan}")
+        print(plan.profile(array))
+    return
+
+
+if __name__ == "__main__":
+
+    test_fold()
+    test_fold_negative()
+    test_graph_inout_look_1()
+    test_plan_threads()
+    profile_inout_look_1()
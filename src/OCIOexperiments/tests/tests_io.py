@@ -0,0 +1,40 @@
+"""
+Check the normalisation of the arrays read from disk.
+"""
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy
+
+import OCIOexperiments as ocex
+
+
+def test_array_read_cv2():
+
+    rng = numpy.random.default_rng(seed=0)
+    source = rng.uniform(0.0, 4.0, size=(16, 24, 3)).astype(numpy.float32)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # float images are already normalised
+        path = Path(tmpdir) / "float.tif"
+        assert cv2.imwrite(str(path), source[..., ::-1])
+        for precision in ocex.c.PRECISIONS:
+            array = ocex.io.array_read(
+                path, method="cv2", precision=precision, flags=cv2.IMREAD_UNCHANGED
+            )
+            assert array.dtype == numpy.dtype(precision), array.dtype
+            assert numpy.allclose(array, source, rtol=1e-3), precision
+
+        # integer images are divided by their maximum code value
+        path = Path(tmpdir) / "uint16.png"
+        codes = (source / 4 * 65535).astype(numpy.uint16)
+        assert cv2.imwrite(str(path), codes[..., ::-1])
+        array = ocex.io.array_read(path, method="cv2", flags=cv2.IMREAD_UNCHANGED)
+        assert numpy.allclose(array, codes / 65535, atol=1e-6)
+    return
+
+
+if __name__ == "__main__":
+
+    test_array_read_cv2()
@@ -0,0 +1,100 @@
+"""
+Check ``lut.DenseLUT1D`` against colour-science and benchmark both.
+
+Run this file directly to print timings.
+"""
+import pickle
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+
+import OCIOexperiments as ocex
+
+
+def _get_test_array(width: int = 1920, height: int = 1080) -> numpy.ndarray:
+    rng = numpy.random.default_rng(seed=0)
+    return rng.uniform(0.0, 1.0, size=(height, width, 3)).astype(numpy.float32)
+
+
+def test_dense_lut_apply():
+
+    lut = ocex.agxc.transforms.get_agx_lut()
+    dense_lut = ocex.agxc.transforms.get_agx_dense_lut()
+    array = _get_test_array(256, 128)
+
+    expected = lut.apply(array)
+    result = dense_lut.apply(array)
+    assert numpy.allclose(result, expected, atol=1e-6), abs(result - expected).max()
+
+    dense_lut.apply(array, out=array)
+    assert numpy.allclose(array, expected, atol=1e-6), "in place apply failed"
+    return
+
+
+def test_dense_lut_apply_quantised():
+
+    lut = ocex.agxc.transforms.get_agx_lut()
+    dense_lut = ocex.agxc.transforms.get_agx_dense_lut()
+    array = numpy.arange(256, dtype=numpy.uint8).reshape((16, 16))
+
+    expected = lut.apply(array / 255)
+    result = dense_lut.apply_quantised(array)
+    assert numpy.allclose(result, expected, atol=1e-6), abs(result - expected).max()
+    return
+
+
+def test_dense_lut_threads():
+    """
+    The cached instance is shared by every thread, they must not corrupt each other.
+    """
+    dense_lut = ocex.agxc.transforms.get_agx_dense_lut()
+    rng = numpy.random.default_rng(seed=1)
+    arrays = [
+        rng.uniform(0.0, 1.0, size=(360, 640, 3)).astype(numpy.float32)
+        for _ in range(8)
+    ]
+    expected = [dense_lut.apply(array) for array in arrays]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for _ in range(5):
+            results = list(executor.map(dense_lut.apply, arrays))
+            for result, reference in zip(results, expected):
+                assert numpy.array_equal(result, reference)
+
+    # scratch buffers are only kept for the last shapes
+    for width in range(1, 10):
+        dense_lut.apply(arrays[0][:, :width])
+    assert len(dense_lut._local.scratch) == ocex.lut.SCRATCH_SHAPES
+
+    copy = pickle.loads(pickle.dumps(dense_lut))
+    assert numpy.array_equal(copy.apply(arrays[0]), expected[0])
+    return
+
+
+def benchmark_dense_lut(number: int = 10):
+
+    lut = ocex.agxc.transforms.get_agx_lut()
+    dense_lut = ocex.agxc.transforms.get_agx_dense_lut()
+    array = _get_test_array()
+    array_uint8 = (array * 255).astype(numpy.uint8)
+    out = numpy.empty_like(array)
+
+    timings = {
+        "colour": lambda: lut.apply(array),
+        "dense": lambda: dense_lut.apply(array, out=out),
+        "dense uint8": lambda: dense_lut.apply_quantised(array_uint8, out=out),
+    }
+    print(f"[benchmark_dense_lut] {array.shape} {array.dtype}")
+    for name, function in timings.items():
+        duration = min(timeit.repeat(function, number=number, repeat=3)) / number
+        print(f"    {name:>12}: {duration * 1000:.2f}ms")
+    return
+
+
+if __name__ == "__main__":
+
+    test_dense_lut_apply()
+    test_dense_lut_apply_quantised()
+    test_dense_lut_threads()
+    benchmark_dense_lut()
@@ -0,0 +1,67 @@
+"""
+Check the stripe split and the parallel apply of the OCIO processors.
+"""
+import numpy
+
+import OCIOexperiments as ocex
+
+
+def test_get_stripes():
+
+    for height, stripes in (
+        (1080, 4),
+        (1080, 7),
+        (5, 3),
+        (3, 8),
+        (1, 4),
+        (10, 0),
+    ):
+        slices = ocex.parallel.get_stripes(height, stripes)
+        assert len(slices) == max(1, min(stripes, height)), (height, stripes)
+        # every row exactly once, in order
+        rows = [row for stripe in slices for row in range(height)[stripe]]
+        assert rows == list(range(height)), (height, stripes, slices)
+        assert all(stripe.stop > stripe.start for stripe in slices), slices
+        # similar sizes
+        sizes = [stripe.stop - stripe.start for stripe in slices]
+        assert max(sizes) - min(sizes) <= 1, (height, stripes, sizes)
+    return
+
+
+def test_apply_processor_parallel():
+
+    processor = ocex.agxc.transforms.output_srgb_punchy_proc()
+    rng = numpy.random.default_rng(seed=0)
+    source = rng.uniform(0.0, 4.0, size=(131, 97, 3)).astype(numpy.float32)
+
+    expected = source.copy()
+    processor.applyRGB(expected)
+
+    for workers, stripes in ((1, 1), (2, None), (4, 7), (3, 200)):
+        array = source.copy()
+        result = ocex.parallel.apply_processor_parallel(
+            processor, array, workers=workers, stripes=stripes
+        )
+        assert result is array
+        assert numpy.array_equal(result, expected), (workers, stripes)
+
+    # non C-contiguous arrays are processed without stripes only
+    array = source.copy()
+    result = ocex.parallel.apply_processor_parallel(processor, array[:, ::2], workers=1)
+    assert numpy.array_equal(result, expected[:, ::2])
+    assert numpy.array_equal(array[:, 1::2], source[:, 1::2]), "other pixels changed"
+    try:
+        ocex.parallel.apply_processor_parallel(processor, source[:, ::2], workers=2)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("non C-contiguous array was accepted")
+
+    assert "get_default_workers" in ocex.parallel.__all__
+    return
+
+
+if __name__ == "__main__":
+
+    test_get_stripes()
+    test_apply_processor_parallel()
@@ -0,0 +1,146 @@
+"""
+Micro-benchmark of the generic transforms.
+
+Run this file directly to log timings.
+"""
+import logging
+import sys
+import timeit
+from typing import Dict
+
+import numpy
+
+import OCIOexperiments as ocex
+
+logger = logging.getLogger(f"{ocex.c.ABR}.tests_transforms_native")
+
+
+def setup_logging(level):
+
+    logger = logging.getLogger(ocex.c.ABR)
+    logger.setLevel(level)
+
+    if not logger.handlers:
+        handler = logging.StreamHandler(stream=sys.stdout)
+        handler.setLevel(logging.DEBUG)
+        formatter = logging.Formatter(
+            "%(asctime)s - [%(levelname)7s] %(name)30s // %(message)s",
+            datefmt="%H:%M:%S",
+        )
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+
+    return logger
+
+
+def _reference_open_domain_to_normalized_log2(
+    in_od: numpy.ndarray,
+    in_midgrey: float = 0.18,
+    minimum_ev: float = -10.0,
+    maximum_ev: float = +6.5,
+) -> numpy.ndarray:
+    """
+    Original implementation, kept to check the optimized one against.
+    """
+    in_od = in_od.copy()
+    in_od[in_od <= 0.0] = numpy.finfo(float).eps
+    output_log = numpy.clip(numpy.log2(in_od / in_midgrey), minimum_ev, maximum_ev)
+    total_exposure = maximum_ev - minimum_ev
+    return (output_log - minimum_ev) / total_exposure
+
+
+def _get_test_array(width: int = 1920, height: int = 1080) -> numpy.ndarray:
+    """
+    Open-domain array with negatives, zeros and values above the maximum ev.
+    """
+    rng = numpy.random.default_rng(seed=0)
+    array = rng.uniform(-0.5, 20.0, size=(height, width, 3)).astype(numpy.float32)
+    array[0, :16] = 0.0
+    return array
+
+
+def test_open_domain_to_normalized_log2():
+
+    array = _get_test_array(256, 128)
+    source = array.copy()
+
+    expected = _reference_open_domain_to_normalized_log2(array)
+    result = ocex.transforms.open_domain_to_normalized_log2(array)
+
+    assert numpy.array_equal(array, source), "input was modified"
+    assert result.dtype == array.dtype, result.dtype
+    assert numpy.allclose(result, expected, atol=1e-5), abs(result - expected).max()
+
+    out = numpy.empty_like(array)
+    result = ocex.transforms.open_domain_to_normalized_log2(array, out=out)
+    assert result is out
+    return
+
+
+def test_apply_matrix():
+
+    array = _get_test_array(64, 32)
+    matrix = ocex.transforms.saturation_matrix(1.2)
+    expected = numpy.einsum("ij,hwj->hwi", matrix, array)
+
+    result = ocex.transforms.apply_matrix(array, matrix)
+    assert numpy.allclose(result, expected, rtol=1e-5, atol=1e-5)
+
+    # non C-contiguous output and input
+    for out in (
+        numpy.empty((64, 32, 3), dtype=numpy.float32).transpose(1, 0, 2),
+        numpy.empty((32, 128, 3), dtype=numpy.float32)[:, ::2],
+    ):
+        result = ocex.transforms.apply_matrix(array, matrix, out=out)
+        assert result is out
+        assert numpy.allclose(out, expected, rtol=1e-5, atol=1e-5)
+
+    transposed = array.transpose(1, 0, 2)
+    result = ocex.transforms.apply_matrix(transposed, matrix)
+    assert numpy.allclose(result, expected.transpose(1, 0, 2), rtol=1e-5, atol=1e-5)
+
+    # in place
+    copy = array.copy()
+    ocex.transforms.apply_matrix(copy, matrix, out=copy)
+    assert numpy.allclose(copy, expected, rtol=1e-5, atol=1e-5)
+    return
+
+
+def benchmark_open_domain_to_normalized_log2(number: int = 20) -> Dict[str, float]:
+    """
+    Returns:
+        best duration of each implementation, in seconds
+    """
+
+    array = _get_test_array()
+    out = numpy.empty_like(array)
+
+    timings = {
+        "reference": lambda: _reference_open_domain_to_normalized_log2(array),
+        "new": lambda: ocex.transforms.open_domain_to_normalized_log2(array),
+        "new out=": lambda: ocex.transforms.open_domain_to_normalized_log2(
+            array, out=out
+        ),
+    }
+    durations = {
+        name: min(timeit.repeat(function, number=number, repeat=3)) / number
+        for name, function in timings.items()
+    }
+    assert all(duration > 0 for duration in durations.values()), durations
+    logger.info(
+        f"[benchmark_open_domain_to_normalized_log2] {array.shape} {array.dtype}\n"
+        + "\n".join(
+            f"    {name:>12}: {duration * 1000:.2f}ms"
+            for name, duration in durations.items()
+        )
+    )
+    return durations
+
+
+if __name__ == "__main__":
+
+    setup_logging(logging.DEBUG)
+    test_open_domain_to_normalized_log2()
+    test_apply_matrix()
+    benchmark_open_domain_to_normalized_log2()
+    logger.info("Finished.")
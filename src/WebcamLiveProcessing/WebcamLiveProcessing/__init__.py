@@ -1,4 +1,16 @@
 from . import c
+from . import capabilities
 from . import sources
+from . import sinks
+from . import processors
+from . import metrics
+from . import raw
+from . import pipeline
+from . import scheduler
+from . import workers
+from . import tiles
+from . import aio
+from . import multi
+from . import cli
 
-from .sources import Webcam, WebcamConfiguration
+from .sources import Webcam, WebcamConfiguration, FrameSource
@@ -0,0 +1,425 @@
+"""
+asyncio API: frame sources as async iterators and a pipeline runner as a coroutine.
+
+The blocking capture, processing and output calls run in an executor, so several
+cameras and control endpoints can share one event loop instead of each running
+their own ``while True`` loop.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from . import c
+from .metrics import MetricsRecorder
+from .pipeline import DropPolicy, Frame, FrameWriter, StageStats
+from .processors import FrameProcessor
+from .sources import FrameSource, GrabbedFrame
+
+__all__ = [
+    "run_blocking",
+    "AsyncFrameSource",
+    "AsyncPipelineRunner",
+]
+
+logger = logging.getLogger(f"{c.ABR}.aio")
+
+
+async def run_blocking(
+    executor: Optional[Executor],
+    function: Callable,
+    *args,
+) -> Any:
+    """
+    Run the blocking function in the executor and return its result.
+
+    A running thread can't be interrupted: when cancelled, wait for the call to
+    finish before propagating the cancellation, so the caller never releases a
+    resource still in use by the executor.
+
+    Args:
+        executor: None for the event loop default executor
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor, function, *args)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        if not future.done():
+            await asyncio.wait([future])
+        raise
+
+
+class AsyncFrameSource:
+    """
+    Async iterator over the frames of a ``FrameSource``, each ``read`` run in the
+    executor.
+
+    Example::
+
+        async with AsyncFrameSource(Webcam(config)) as source:
+            async for frame in source:
+                ...
+    """
+
+    def __init__(
+        self,
+        source: FrameSource,
+        executor: Optional[Executor] = None,
+        release: bool = True,
+    ):
+        """
+        Args:
+            source: frames are read from it one at a time
+            executor: where the reads are run, None for the event loop default one.
+            release: if True ``aclose`` also release the source
+        """
+        self.source = source
+        self.executor = executor
+        self.release = release
+        self.sequence: int = 0
+        self._closed = False
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.source} sequence={self.sequence}>"
+
+    def __aiter__(self) -> "AsyncFrameSource":
+        return self
+
+    async def __anext__(self) -> GrabbedFrame:
+        frame = await self.read()
+        if frame is None:
+            raise StopAsyncIteration
+        return frame
+
+    async def __aenter__(self) -> "AsyncFrameSource":
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def width(self) -> int:
+        return self.source.width
+
+    @property
+    def height(self) -> int:
+        return self.source.height
+
+    @property
+    def fps(self) -> float:
+        return self.source.fps
+
+    async def read(self) -> Optional[GrabbedFrame]:
+        """
+        Returns:
+            next frame, or None once the source is exhausted or closed.
+        """
+        if self._closed:
+            return None
+
+        ret, image = await run_blocking(self.executor, self.source.read)
+        if not ret:
+            return None
+
+        frame = GrabbedFrame(
+            image=image,
+            timestamp=time.perf_counter(),
+            sequence=self.sequence,
+        )
+        self.sequence += 1
+        return frame
+
+    async def aclose(self):
+        """
+        Stop the iteration and release the source, once.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self.release:
+            await run_blocking(self.executor, self.source.release)
+        logger.debug(
+            f"[{self.__class__.__name__}][aclose] {self.sequence} frames read."
+        )
+
+
+class AsyncPipelineRunner:
+    """
+    Coroutine equivalent of ``pipeline.PipelineRunner``: capture, processing and
+    output are 3 tasks connected by bounded queues, their blocking calls are run in
+    the executor.
+
+    Example::
+
+        runners = [
+            AsyncPipelineRunner(Webcam(config), processor, VirtualCameraSink(...))
+            for config in configs
+        ]
+        await asyncio.gather(*(runner.run() for runner in runners))
+
+    Cancelling ``run`` wait for the calls in progress then release the source and
+    the sink.
+    """
+
+    stages = ("capture", "process", "output")
+
+    def __init__(
+        self,
+        source: Union[FrameSource, AsyncFrameSource],
+        processor: FrameProcessor,
+        writer: FrameWriter,
+        buffer_size: int = 2,
+        policy: DropPolicy = "drop-oldest",
+        max_frames: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        metrics: Optional[MetricsRecorder] = None,
+        release: bool = True,
+        name: str = "",
+    ):
+        """
+        Args:
+            source: frames source, wrapped in an ``AsyncFrameSource`` if needed.
+            processor: function applied on each frame, see ``processors``.
+            writer: destination of the processed frames, see ``sinks``.
+            buffer_size: number of frames each queue between stages can hold
+            policy: what to do when a queue is full, see ``pipeline.RingBuffer``
+            max_frames: stop capturing after this number of frames
+            executor: where the blocking calls are run, None for the event loop
+                default one.
+            metrics: if given, also record the stage durations, latency, dropped
+                frames and queue depths to it.
+            release: if True the source and the writer are released once ``run``
+                returns, including when cancelled.
+            name: to identify the runner in the logs
+        """
+        if buffer_size < 1:
+            raise ValueError(f"Buffer size must be at least 1, got {buffer_size}.")
+        if policy not in ("drop-oldest", "block"):
+            raise ValueError(f"Policy <{policy}> passed is not supported.")
+
+        if not isinstance(source, AsyncFrameSource):
+            source = AsyncFrameSource(source, executor=executor, release=release)
+
+        self.source = source
+        self.processor = processor
+        self.writer = writer
+        self.buffer_size = buffer_size
+        self.policy = policy
+        self.max_frames = max_frames
+        self.executor = executor
+        self.metrics = metrics
+        self.release = release
+        self.name = name or self.__class__.__name__
+
+        self.stats: Dict[str, StageStats] = {
+            stage: StageStats(stage) for stage in self.stages + ("latency",)
+        }
+        self.frames_sent: int = 0
+        self.dropped: int = 0
+
+        self._tasks: List[asyncio.Task] = []
+        self._errors: List[BaseException] = []
+        self._start_time: Optional[float] = None
+        self._end_time: Optional[float] = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name} sent={self.frames_sent}>"
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    @property
+    def fps(self) -> float:
+        """
+        Frames sent per second since the start.
+        """
+        if self._start_time is None:
+            return 0.0
+        duration = (self._end_time or time.perf_counter()) - self._start_time
+        return self.frames_sent / duration if duration else 0.0
+
+    def _add_stat(self, frame: Frame, stage: str, duration: float):
+        frame.durations[stage] = duration
+        self.stats[stage].add(duration)
+        if self.metrics is not None:
+            self.metrics.add(stage, duration)
+
+    async def _put(self, queue: asyncio.Queue, name: str, frame: Optional[Frame]):
+        """
+        Put the frame in the queue, None mark the end of the stream and is never
+        dropped.
+        """
+        if self.policy == "block":
+            await queue.put(frame)
+        else:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+                if self.metrics is not None:
+                    self.metrics.add_dropped()
+            queue.put_nowait(frame)
+
+        if self.metrics is not None:
+            self.metrics.set_queue_depth(name, queue.qsize())
+
+    def _put_end(self, queue: asyncio.Queue):
+        """
+        Mark the end of the stream without waiting, the next stage may be cancelled
+        too and never consume the queue again.
+        """
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(None)
+
+    async def _capture(self, output: asyncio.Queue):
+
+        try:
+            while self.max_frames is None or self.source.sequence < self.max_frames:
+                _stime = time.perf_counter()
+                grabbed = await self.source.read()
+                if grabbed is None:
+                    logger.info(f"[{self.name}][capture] end of stream.")
+                    break
+
+                frame = Frame(
+                    index=grabbed.sequence,
+                    image=grabbed.image,
+                    captured=grabbed.timestamp,
+                )
+                self._add_stat(frame, "capture", grabbed.timestamp - _stime)
+                await self._put(output, "capture", frame)
+            await self._put(output, "capture", None)
+        except asyncio.CancelledError:
+            # stopped: let the frames already captured go through
+            self._put_end(output)
+            raise
+
+    async def _process(self, input: asyncio.Queue, output: asyncio.Queue):
+
+        try:
+            while True:
+                frame: Optional[Frame] = await input.get()
+                if frame is None:
+                    break
+
+                _stime = time.perf_counter()
+                frame.image = await run_blocking(
+                    self.executor, self.processor, frame.image
+                )
+                self._add_stat(frame, "process", time.perf_counter() - _stime)
+                await self._put(output, "output", frame)
+            await self._put(output, "output", None)
+        except asyncio.CancelledError:
+            self._put_end(output)
+            raise
+
+    async def _output(self, input: asyncio.Queue):
+
+        while True:
+            frame: Optional[Frame] = await input.get()
+            if frame is None:
+                break
+
+            _stime = time.perf_counter()
+            await run_blocking(self.executor, self.writer.send, frame.image)
+            sent = time.perf_counter()
+            self._add_stat(frame, "output", sent - _stime)
+            self.stats["latency"].add(sent - frame.captured)
+            self.frames_sent += 1
+            if self.metrics is not None:
+                self.metrics.set_queue_depth("output", input.qsize())
+                self.metrics.frame_done(latency=sent - frame.captured)
+
+    async def _run_stage(self, coroutine):
+        try:
+            await coroutine
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            logger.exception(f"[{self.name}] stage failed: {error}")
+            self._errors.append(error)
+            # the other stages could wait forever on this one
+            for task in self._tasks:
+                if task is not asyncio.current_task():
+                    task.cancel()
+
+    def stop(self):
+        """
+        Stop capturing and let the frames already captured go through.
+        """
+        if self._tasks:
+            self._tasks[0].cancel()
+
+    async def run(self, duration: Optional[float] = None):
+        """
+        Run until the source is exhausted, the duration elapsed or ``stop`` is
+        called, then release the source and the writer.
+
+        Raises the first exception that happened in a stage.
+        """
+        if self.running:
+            raise RuntimeError(f"{self.name} is already running.")
+
+        capture_queue = asyncio.Queue(self.buffer_size)
+        output_queue = asyncio.Queue(self.buffer_size)
+
+        self._start_time = time.perf_counter()
+        self._errors = []
+        self._tasks = [
+            asyncio.ensure_future(self._run_stage(coroutine))
+            for coroutine in (
+                self._capture(capture_queue),
+                self._process(capture_queue, output_queue),
+                self._output(output_queue),
+            )
+        ]
+        logger.info(f"[{self.name}][run] Started.")
+
+        try:
+            await asyncio.wait(self._tasks, timeout=duration)
+            self.stop()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        except asyncio.CancelledError:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            logger.info(f"[{self.name}][run] Cancelled.")
+            raise
+        finally:
+            self._end_time = time.perf_counter()
+            if self.release:
+                await self.aclose()
+            logger.info(f"[{self.name}][run] {self.report()}")
+
+        if self._errors:
+            raise self._errors[0]
+        return
+
+    async def aclose(self):
+        """
+        Release the source and the writer.
+        """
+        await self.source.aclose()
+        close = getattr(self.writer, "close", None)
+        if close is not None:
+            await run_blocking(self.executor, close)
+
+    def report(self) -> str:
+        """
+        Returns:
+            human-readable per-stage latency summary
+        """
+        lines = [
+            f"{self.frames_sent} frames sent at {self.fps:.2f}fps, "
+            f"{self.dropped} dropped"
+        ]
+        lines += [f"    {stats}" for stats in self.stats.values()]
+        return "\n".join(lines)
@@ -1,6 +1,7 @@
 """
 Constants
 """
+import os
 from pathlib import Path
 
 NAME = "WebcamLiveProcessing"
@@ -21,3 +22,17 @@ DATA_DIR: Path = DEV_DIR / "data"
 """
 Directory where you can find inputs for processing.
 """
+
+CACHE_DIR: Path = Path(
+    os.environ.get(f"{ABR.upper()}_CACHE_DIR", Path.home() / ".cache" / NAME)
+)
+"""
+Directory where results worth keeping between runs are stored, like the cameras
+capabilities. Can be overridden with the WLP_CACHE_DIR environment variable.
+"""
+
+FFMPEG: str = os.environ.get(f"{ABR.upper()}_FFMPEG", "ffmpeg")
+"""
+Path to the ffmpeg executable used to encode recordings, default to the one found
+in the PATH. Can be overridden with the WLP_FFMPEG environment variable.
+"""
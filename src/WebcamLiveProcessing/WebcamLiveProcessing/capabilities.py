@@ -0,0 +1,302 @@
+"""
+Probe what capture modes a camera actually accepts and cache it on disk.
+
+Setting properties one by one on an opened ``cv2.VideoCapture`` makes some backends
+renegotiate the stream on every call, which is why opening a ``Webcam`` can take
+half a minute. Once a configuration is known to be accepted by a device, it is
+cached and the next starts pass it to the backend in one step when opening.
+"""
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import cv2
+
+from . import c
+
+__all__ = [
+    "CaptureMode",
+    "CameraCapabilities",
+    "CapabilityCache",
+    "get_device_key",
+    "fourcc_to_str",
+    "get_accepted_properties",
+    "probe_capture",
+    "probe_camera",
+]
+
+logger = logging.getLogger(f"{c.ABR}.capabilities")
+
+PROBE_RESOLUTIONS: List[Tuple[int, int]] = [
+    (640, 480),
+    (1280, 720),
+    (1920, 1080),
+    (3840, 2160),
+]
+PROBE_FPS: List[float] = [15, 24, 30, 60]
+PROBE_FOURCCS: List[str] = ["MJPG", "YUYV"]
+
+Properties = Dict[int, float]
+"""
+cv2.CAP_PROP_* identifier: value
+"""
+
+
+def get_device_key(camera: int, backend: int = cv2.CAP_ANY) -> str:
+    """
+    Returns:
+        identifier of the device in the cache
+    """
+    if backend == cv2.CAP_ANY:
+        backend_name = "ANY"
+    else:
+        backend_name = cv2.videoio_registry.getBackendName(backend)
+    return f"{backend_name}:{camera}"
+
+
+def fourcc_to_str(value: float) -> str:
+    """
+    Convert the value returned by ``capture.get(cv2.CAP_PROP_FOURCC)`` to its
+    4-character code.
+    """
+    value = int(value)
+    return "".join(chr((value >> 8 * index) & 0xFF) for index in range(4))
+
+
+@dataclass
+class CaptureMode:
+    width: int
+    height: int
+    fps: float
+    fourcc: str
+
+    @property
+    def properties(self) -> Properties:
+        return {
+            cv2.CAP_PROP_FOURCC: cv2.VideoWriter_fourcc(*self.fourcc),
+            cv2.CAP_PROP_FRAME_WIDTH: self.width,
+            cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+            cv2.CAP_PROP_FPS: self.fps,
+        }
+
+
+@dataclass
+class CameraCapabilities:
+    device: str
+    """
+    see ``get_device_key``
+    """
+    modes: List[CaptureMode] = field(default_factory=list)
+    """
+    capture modes the device accepted and delivered frames with
+    """
+    probed: float = 0.0
+    """
+    ``time.time()`` of the probe
+    """
+
+    def supports(
+        self,
+        width: int,
+        height: int,
+        fps: Optional[float] = None,
+        fourcc: Optional[str] = None,
+    ) -> bool:
+        return any(
+            mode.width == width
+            and mode.height == height
+            and (fps is None or abs(mode.fps - fps) < 1)
+            and (fourcc is None or mode.fourcc == fourcc)
+            for mode in self.modes
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CameraCapabilities":
+        modes = [CaptureMode(**mode) for mode in data.get("modes", [])]
+        return cls(device=data["device"], modes=modes, probed=data.get("probed", 0.0))
+
+
+class CapabilityCache:
+    """
+    JSON file storing, per device, the probed capabilities and the configurations
+    known to be accepted.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            path: json file, default to ``capabilities.json`` in ``c.CACHE_DIR``
+        """
+        self.path = Path(path) if path else c.CACHE_DIR / "capabilities.json"
+        self._data: Optional[dict] = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.path}>"
+
+    @property
+    def data(self) -> dict:
+        if self._data is None:
+            self._data = self.load()
+        return self._data
+
+    def load(self) -> dict:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as error:
+            logger.warning(
+                f"[{self.__class__.__name__}] ignoring unreadable cache "
+                f"<{self.path}>: {error}"
+            )
+            return {}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # write then rename so a crash never leaves a half-written cache
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.data, indent=4), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+    def _get_device(self, device: str) -> dict:
+        return self.data.setdefault(device, {"capabilities": None, "configurations": {}})
+
+    @staticmethod
+    def _get_configuration_key(properties: Properties) -> str:
+        return json.dumps(sorted((int(k), v) for k, v in properties.items()))
+
+    def get_capabilities(self, device: str) -> Optional[CameraCapabilities]:
+        data = self.data.get(device, {}).get("capabilities")
+        return CameraCapabilities.from_dict(data) if data else None
+
+    def set_capabilities(self, capabilities: CameraCapabilities):
+        self._get_device(capabilities.device)["capabilities"] = capabilities.to_dict()
+        self.save()
+
+    def get_configuration(
+        self,
+        device: str,
+        requested: Properties,
+    ) -> Optional[Properties]:
+        """
+        Returns:
+            properties the device ended up with last time the requested properties
+            were set, None if never cached.
+        """
+        configurations = self.data.get(device, {}).get("configurations", {})
+        accepted = configurations.get(self._get_configuration_key(requested))
+        if accepted is None:
+            return None
+        return {int(k): v for k, v in accepted.items()}
+
+    def set_configuration(
+        self,
+        device: str,
+        requested: Properties,
+        accepted: Properties,
+    ):
+        configurations = self._get_device(device)["configurations"]
+        configurations[self._get_configuration_key(requested)] = {
+            str(k): v for k, v in accepted.items()
+        }
+        self.save()
+
+    def remove_configuration(self, device: str, requested: Properties):
+        configurations = self.data.get(device, {}).get("configurations", {})
+        if configurations.pop(self._get_configuration_key(requested), None):
+            self.save()
+
+
+def get_accepted_properties(
+    capture: cv2.VideoCapture,
+    properties: Properties,
+) -> Properties:
+    """
+    Returns:
+        value the capture actually has for each of the given properties
+    """
+    return {key: capture.get(key) for key in properties}
+
+
+def probe_capture(
+    capture: cv2.VideoCapture,
+    resolutions: Sequence[Tuple[int, int]] = tuple(PROBE_RESOLUTIONS),
+    fps: Sequence[float] = tuple(PROBE_FPS),
+    fourccs: Sequence[str] = tuple(PROBE_FOURCCS),
+) -> List[CaptureMode]:
+    """
+    Try every combination of the given values on the opened capture.
+
+    A mode is accepted if the capture reports it back and deliver a frame of that
+    size. This is slow as each mode renegotiate the stream, it's meant to be run
+    once per device.
+
+    Returns:
+        accepted capture modes
+    """
+    modes = []
+    for fourcc in fourccs:
+        for width, height in resolutions:
+            for rate in fps:
+                mode = CaptureMode(width, height, rate, fourcc)
+                for key, value in mode.properties.items():
+                    capture.set(key, value)
+
+                accepted = get_accepted_properties(capture, mode.properties)
+                if (
+                    int(accepted[cv2.CAP_PROP_FRAME_WIDTH]) != width
+                    or int(accepted[cv2.CAP_PROP_FRAME_HEIGHT]) != height
+                    or abs(accepted[cv2.CAP_PROP_FPS] - rate) >= 1
+                    or fourcc_to_str(accepted[cv2.CAP_PROP_FOURCC]) != fourcc
+                ):
+                    continue
+
+                ret, frame = capture.read()
+                if not ret or frame is None or frame.shape[:2] != (height, width):
+                    continue
+
+                logger.debug(f"[probe_capture] accepted {mode}")
+                modes.append(mode)
+
+    return modes
+
+
+def probe_camera(
+    camera: int,
+    backend: int = cv2.CAP_ANY,
+    cache: Optional[CapabilityCache] = None,
+    **kwargs,
+) -> CameraCapabilities:
+    """
+    Open the camera, probe its capture modes and store them in the cache.
+
+    Args:
+        camera: index of the camera
+        backend: cv2.CAP_* api preference
+        cache: where to store the result, default to ``CapabilityCache()``
+        kwargs: passed to ``probe_capture``
+    """
+    cache = cache or CapabilityCache()
+    device = get_device_key(camera, backend)
+
+    _stime = time.time()
+    capture = cv2.VideoCapture(camera, backend)
+    try:
+        assert capture.isOpened(), f"Could not open camera <{device}>"
+        modes = probe_capture(capture, **kwargs)
+    finally:
+        capture.release()
+
+    capabilities = CameraCapabilities(device=device, modes=modes, probed=time.time())
+    cache.set_capabilities(capabilities)
+    logger.info(
+        f"[probe_camera] {device}: {len(modes)} modes accepted, probed in "
+        f"{time.time() - _stime:.1f}s."
+    )
+    return capabilities
@@ -0,0 +1,454 @@
+"""
+Command line interface to run the live processing without editing code.
+
+Example::
+
+    wlp --camera 0 --size 1920x1080 --fps 30 --transform agx-native \\
+        --output-size 1280x720 --sink vcam --metrics metrics.csv
+"""
+import argparse
+import functools
+import logging
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from . import c
+from . import metrics as metrics_module
+from . import pipeline
+from . import processors
+from . import sinks
+from . import sources
+
+__all__ = [
+    "TRANSFORMS",
+    "get_parser",
+    "get_source",
+    "get_colortransform",
+    "get_processor",
+    "get_sink",
+    "run",
+    "main",
+]
+
+logger = logging.getLogger(f"{c.ABR}.cli")
+
+TRANSFORMS = ("none", "exposure", "agx-ocio", "agx-native", "lut", "adaptive")
+
+UNSUPPORTED_OPTIONS: Dict[str, Tuple[str, ...]] = {
+    "none": ("--precision", "--workers", "--processes", "--incremental"),
+    "exposure": ("--precision", "--workers", "--incremental"),
+    "agx-ocio": (),
+    "agx-native": ("--workers",),
+    "lut": ("--precision", "--workers"),
+    "adaptive": ("--precision", "--workers", "--processes", "--incremental"),
+}
+"""
+Processing options each transform would silently ignore, they are rejected instead.
+"""
+
+SOURCES = ("webcam", "video", "images", "synthetic")
+
+SINKS = ("vcam", "video", "record", "images", "null")
+
+
+def _parse_size(value: str) -> Tuple[int, int]:
+    try:
+        width, height = value.lower().split("x")
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"<{value}> is not a WIDTHxHEIGHT size.")
+
+
+def _parse_roi(value: str) -> Tuple[int, int, int, int]:
+    try:
+        x, y, width, height = (int(part) for part in value.split(","))
+        return x, y, width, height
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"<{value}> is not a X,Y,WIDTH,HEIGHT roi.")
+
+
+def _parse_fourcc(value: str) -> str:
+    if len(value) != 4:
+        raise argparse.ArgumentTypeError(f"<{value}> is not a 4-character code.")
+    return value
+
+
+def get_parser() -> argparse.ArgumentParser:
+
+    parser = argparse.ArgumentParser(
+        prog=c.ABR,
+        description="Apply a colour transform on a live video stream.",
+    )
+
+    group = parser.add_argument_group("source")
+    group.add_argument("--source", choices=SOURCES, default="webcam")
+    group.add_argument(
+        "--camera", type=int, default=0, help="ID of webcam device (default: 0)"
+    )
+    group.add_argument(
+        "--input",
+        help="video file for --source video, image glob pattern for --source images",
+    )
+    group.add_argument(
+        "--size",
+        type=_parse_size,
+        default=(1280, 720),
+        help="capture WIDTHxHEIGHT (default: 1280x720)",
+    )
+    group.add_argument("--fps", type=float, default=30, help="capture framerate")
+    group.add_argument(
+        "--fourcc", type=_parse_fourcc, help="webcam 4-character code, like MJPG"
+    )
+    group.add_argument(
+        "--grabber",
+        choices=("none", "latest", "fifo"),
+        default="none",
+        help="read the source on a background thread, see sources.FrameGrabber",
+    )
+    group.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="don't use the cached camera configurations",
+    )
+
+    group = parser.add_argument_group("transform")
+    group.add_argument("--transform", choices=TRANSFORMS, default="agx-ocio")
+    group.add_argument(
+        "--exposure", type=float, default=1.0, help="gain for --transform exposure"
+    )
+    group.add_argument(
+        "--exposure-mode", choices=("scene", "display"), default="scene"
+    )
+    group.add_argument("--lut", help="baked .spi1d LUT for --transform lut")
+    group.add_argument(
+        "--precision",
+        choices=("float32", "float16"),
+        default="float32",
+        help="float type the AgX transforms are computed in. float16 use less "
+        "memory but is much slower, keep float32 for live processing",
+    )
+    group.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="threads the OCIO processor is applied with, 0 for all cores",
+    )
+    group.add_argument(
+        "--processes",
+        type=int,
+        default=0,
+        help="run the transform in N worker processes, see workers module",
+    )
+    group.add_argument(
+        "--processes-mode", choices=("frame", "stripe"), default="frame"
+    )
+    group.add_argument(
+        "--output-size",
+        type=_parse_size,
+        help="WIDTHxHEIGHT the frame is resized to before the transform",
+    )
+    group.add_argument(
+        "--roi", type=_parse_roi, help="X,Y,WIDTH,HEIGHT region of the frame to keep"
+    )
+    group.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only reprocess the tiles that changed, see tiles.TileCache",
+    )
+
+    group = parser.add_argument_group("sink")
+    group.add_argument("--sink", choices=SINKS, default="vcam")
+    group.add_argument(
+        "--output",
+        help="video file for --sink video and record, path with $FRAME for "
+        "--sink images",
+    )
+    group.add_argument(
+        "--recorder",
+        choices=("cv2", "ffmpeg"),
+        default="cv2",
+        help="encoder of --sink record, see sinks.RecorderSink",
+    )
+    group.add_argument(
+        "--segment-duration",
+        type=float,
+        help="start a new --sink record file every N seconds",
+    )
+    group.add_argument(
+        "--max-segments",
+        type=int,
+        help="only keep the last N --sink record files",
+    )
+
+    group = parser.add_argument_group("run")
+    group.add_argument("--buffer-size", type=int, default=2)
+    group.add_argument(
+        "--policy",
+        choices=("drop-oldest", "block"),
+        default="drop-oldest",
+        help="what to do when a stage can't keep up",
+    )
+    group.add_argument("--duration", type=float, help="stop after N seconds")
+    group.add_argument("--max-frames", type=int, help="stop after N frames")
+    group.add_argument("--metrics", help="json or csv file the metrics are dumped to")
+    group.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=5.0,
+        help="seconds between 2 metrics reports",
+    )
+    group.add_argument(
+        "--log-level",
+        choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+        default="INFO",
+    )
+    return parser
+
+
+def get_source(args: argparse.Namespace) -> sources.FrameSource:
+
+    width, height = args.size
+
+    if args.source == "webcam":
+        config = sources.WebcamConfiguration(
+            name=f"camera{args.camera}",
+            camera=args.camera,
+            target_width=width,
+            target_height=height,
+            target_fps=args.fps,
+            fourcc=args.fourcc,
+        )
+        source = sources.Webcam(config, cache=False if args.no_cache else None)
+    elif args.source == "video":
+        source = sources.VideoFileSource(args.input, loop=True)
+    elif args.source == "images":
+        source = sources.ImageSequenceSource.from_pattern(
+            args.input, fps=args.fps, loop=True, preload=True
+        )
+    else:
+        source = sources.SyntheticSource(width, height, fps=args.fps)
+
+    if args.grabber != "none":
+        source = sources.FrameGrabber(source, policy=args.grabber)
+        source.start()
+    return source
+
+
+def get_colortransform(args: argparse.Namespace) -> processors.ColorTransform:
+    """
+    Returns:
+        colour transform picklable for the worker processes.
+    """
+    if args.transform == "exposure":
+        return functools.partial(
+            processors.apply_exposure,
+            exposure=args.exposure,
+            exposure_mode=args.exposure_mode,
+        )
+
+    if args.transform == "lut":
+        if not args.lut:
+            raise ValueError("--transform lut requires --lut.")
+        from OCIOexperiments import lut
+
+        return lut.DenseLUT1D.from_spi1d(args.lut).apply
+
+    from OCIOexperiments.agxc import transforms
+
+    if args.transform == "agx-ocio":
+        return functools.partial(
+            transforms.transform_inout_look_1,
+            workers=args.workers or None,
+            precision=args.precision,
+        )
+    if args.transform == "agx-native":
+        return functools.partial(
+            transforms.transform_native_inout_look_1,
+            precision=args.precision,
+        )
+    raise ValueError(f"Transform <{args.transform}> has no colour transform.")
+
+
+def get_processor(
+    args: argparse.Namespace,
+    source: sources.FrameSource,
+    metrics: Optional[metrics_module.MetricsRecorder] = None,
+) -> Tuple[processors.FrameProcessor, Tuple[int, int]]:
+    """
+    Returns:
+        (processor, (width, height) of the frames it returns)
+    """
+    used = {
+        "--precision": args.precision != "float32",
+        "--workers": args.workers != 1,
+        "--processes": bool(args.processes),
+        "--incremental": args.incremental,
+    }
+    ignored = [flag for flag in UNSUPPORTED_OPTIONS[args.transform] if used[flag]]
+    if ignored:
+        raise ValueError(
+            f"--transform {args.transform} can't be combined with "
+            f"{', '.join(ignored)}."
+        )
+
+    reframe = None
+    if args.output_size or args.roi:
+        reframe = processors.Reframe(roi=args.roi, size=args.output_size)
+
+    size = (source.width, source.height)
+    if reframe:
+        size = reframe.get_output_size(*size)
+
+    if args.transform == "none":
+        processor = processors.passthrough
+        if reframe:
+            processor = processors.get_colortransform_processor(
+                lambda array: array, reframe=reframe
+            )
+        return processor, size
+
+    if args.transform == "adaptive":
+        from . import scheduler
+
+        modes = scheduler.get_agx_look_1_modes(reframe=reframe)
+        return scheduler.AdaptiveScheduler(modes, fps=source.fps or args.fps), size
+
+    if args.transform == "exposure" and not args.processes:
+        processor = processors.ExposureLUT(
+            args.exposure, args.exposure_mode, reframe=reframe
+        )
+        return processor, size
+
+    colortransform = get_colortransform(args)
+
+    if args.processes:
+        if reframe:
+            raise ValueError("--processes can't be combined with --output-size/--roi.")
+        if args.incremental:
+            # the workers only process full frames, not tiles
+            raise ValueError("--processes can't be combined with --incremental.")
+        from . import workers
+
+        processor = workers.SharedMemoryProcessor(
+            colortransform,
+            (source.height, source.width, 3),
+            workers=args.processes,
+            mode=args.processes_mode,
+        )
+    elif args.incremental:
+        from . import tiles
+
+        # the tile cache needs a processor keeping the frame size, it reframes itself
+        processor = tiles.TileCache(
+            processors.get_colortransform_processor(colortransform, metrics=metrics),
+            reframe=reframe,
+        )
+    else:
+        processor = processors.get_colortransform_processor(
+            colortransform,
+            metrics=metrics,
+            reframe=reframe,
+        )
+    return processor, size
+
+
+def get_sink(
+    args: argparse.Namespace,
+    width: int,
+    height: int,
+    fps: float,
+) -> sinks.FrameSink:
+
+    if args.sink == "vcam":
+        return sinks.VirtualCameraSink(width, height, fps)
+    if args.sink == "video":
+        return sinks.VideoFileSink(args.output, width, height, fps)
+    if args.sink == "record":
+        return sinks.RecorderSink(
+            args.output,
+            width,
+            height,
+            fps,
+            backend=args.recorder,
+            segment_duration=args.segment_duration,
+            max_segments=args.max_segments,
+        )
+    if args.sink == "images":
+        return sinks.ImageSequenceSink(args.output)
+    return sinks.NullSink()
+
+
+def run(args: argparse.Namespace) -> pipeline.PipelineRunner:
+    """
+    Build the pipeline from the parsed arguments and run it until the duration
+    elapsed, the source is exhausted or it's interrupted.
+    """
+    metrics = metrics_module.MetricsRecorder(
+        fps=args.fps,
+        interval=args.metrics_interval,
+        dump_path=args.metrics,
+    )
+
+    source = get_source(args)
+    processor = None
+    try:
+        processor, (width, height) = get_processor(args, source, metrics)
+        sink = get_sink(args, width, height, source.fps or args.fps)
+    except BaseException:
+        # invalid arguments must not leave the camera or the workers open
+        source.release()
+        if hasattr(processor, "close"):
+            processor.close()
+        raise
+    logger.info(f"[run] {source} -> {getattr(processor, '__name__', processor)}")
+
+    runner = pipeline.PipelineRunner(
+        source,
+        processor,
+        sink,
+        buffer_size=args.buffer_size,
+        policy=args.policy,
+        max_frames=args.max_frames,
+        metrics=metrics,
+    )
+    try:
+        with runner:
+            runner.wait(args.duration)
+    except KeyboardInterrupt:
+        logger.info("[run] Interrupted.")
+    finally:
+        sink.close()
+        source.release()
+        if hasattr(processor, "close"):
+            processor.close()
+        metrics.report()
+
+    logger.info(f"[run] {runner.report()}")
+    return runner
+
+
+def setup_logging(level: str):
+
+    handler = logging.StreamHandler(stream=sys.stdout)
+    handler.setFormatter(
+        logging.Formatter(
+            "%(asctime)s - [%(levelname)7s] %(name)30s // %(message)s",
+            datefmt="%H:%M:%S",
+        )
+    )
+    for logger_name in (c.ABR, "ocex"):
+        _logger = logging.getLogger(logger_name)
+        _logger.setLevel(level)
+        if not _logger.handlers:
+            _logger.addHandler(handler)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+
+    args = get_parser().parse_args(argv)
+    setup_logging(args.log_level)
+    _stime = time.time()
+    run(args)
+    logger.info(f"[main] Finished in {time.time() - _stime:.1f}s.")
+    return 0
@@ -0,0 +1,316 @@
+"""
+Per-frame instrumentation of the live path.
+
+A ``MetricsRecorder`` collects the duration of each stage of each frame (capture,
+convert, transform, send, ...), the end-to-end latency, the dropped and late frames
+and the depth of the queues. It keeps rolling percentiles over the last frames and
+periodically log them and/or dump them to a JSON or CSV file.
+
+A frame is late when it's output too long after the previous one, the output
+framerate stuttering: in a pipelined runner the latency of every frame is several
+stages long and is expected to exceed the frame budget.
+"""
+import collections
+import contextlib
+import csv
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Deque, Dict, Literal, Optional, Union
+
+import numpy
+
+from . import c
+
+__all__ = [
+    "RollingStats",
+    "MetricsRecorder",
+]
+
+logger = logging.getLogger(f"{c.ABR}.metrics")
+
+PERCENTILES = (50, 90, 99)
+
+LATE_TOLERANCE = 1.5
+"""
+A frame is late when sent more than this number of frame budgets after the previous
+one, so the jitter of a steady output isn't counted.
+"""
+
+DumpFormat = Literal["json", "csv"]
+
+
+class RollingStats:
+    """
+    Statistics on the durations of one stage, percentiles are computed on the last
+    ``window`` values only.
+    """
+
+    def __init__(self, name: str, window: int = 300):
+        self.name = name
+        self.count: int = 0
+        self.total: float = 0.0
+        self.maximum: float = 0.0
+        self.values: Deque[float] = collections.deque(maxlen=window)
+
+    def __str__(self) -> str:
+        summary = self.summary()
+        percentiles = " ".join(
+            f"p{percentile}={summary[f'p{percentile}'] * 1000:.2f}ms"
+            for percentile in PERCENTILES
+        )
+        return (
+            f"{self.name:>10}: n={self.count} mean={self.mean * 1000:.2f}ms "
+            f"{percentiles} max={self.maximum * 1000:.2f}ms"
+        )
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, duration: float):
+        self.count += 1
+        self.total += duration
+        self.maximum = max(self.maximum, duration)
+        self.values.append(duration)
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Args:
+            percentile: in [0-100]
+
+        Returns:
+            percentile of the durations in the window, in seconds
+        """
+        if not self.values:
+            return 0.0
+        return float(numpy.percentile(self.values, percentile))
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Returns:
+            count, mean, max and percentiles, durations in seconds
+        """
+        summary = {"count": self.count, "mean": self.mean, "max": self.maximum}
+        if self.values:
+            values = numpy.percentile(self.values, PERCENTILES)
+        else:
+            values = [0.0] * len(PERCENTILES)
+        for percentile, value in zip(PERCENTILES, values):
+            summary[f"p{percentile}"] = float(value)
+        return summary
+
+
+class MetricsRecorder:
+    """
+    Thread-safe collector of the per-frame metrics.
+
+    Example::
+
+        metrics = MetricsRecorder(fps=30, dump_path="metrics.csv", interval=5)
+        while True:
+            with metrics.measure("capture"):
+                ret, frame = camera.read()
+            ...
+            metrics.frame_done(latency=time.perf_counter() - captured)
+        metrics.dump()
+    """
+
+    def __init__(
+        self,
+        fps: Optional[float] = None,
+        window: int = 300,
+        interval: Optional[float] = 5.0,
+        dump_path: Optional[Union[str, Path]] = None,
+        dump_format: Optional[DumpFormat] = None,
+        log_level: int = logging.INFO,
+    ):
+        """
+        Args:
+            fps: target framerate, frames output more than ``LATE_TOLERANCE / fps``
+                after the previous one are late.
+            window: number of last values percentiles are computed on
+            interval: seconds between 2 reports (log and dump), None to only report
+                when ``report`` is called.
+            dump_path: file the metrics are written to on each report
+            dump_format: json overwrite the file with the last snapshot, csv append
+                one row per stage per report. Default from the file extension.
+            log_level: level of the report log message
+        """
+        self.budget: Optional[float] = 1.0 / fps if fps else None
+        self.window = window
+        self.interval = interval
+        self.dump_path = Path(dump_path) if dump_path else None
+        self.dump_format: Optional[DumpFormat] = dump_format
+        self.log_level = log_level
+
+        self.stages: Dict[str, RollingStats] = {}
+        self.latency = RollingStats("latency", window)
+        self.frames: int = 0
+        self.dropped: int = 0
+        self.late: int = 0
+        """
+        number of frames output too long after the previous one, see
+        ``LATE_TOLERANCE``
+        """
+        self.queues: Dict[str, int] = {}
+        """
+        last known depth of each queue
+        """
+
+        self._lock = threading.Lock()
+        self._start_time: float = time.perf_counter()
+        self._last_report: float = self._start_time
+        self._last_frame: Optional[float] = None
+
+    @property
+    def fps(self) -> float:
+        """
+        Frames done per second since the creation.
+        """
+        duration = time.perf_counter() - self._start_time
+        return self.frames / duration if duration else 0.0
+
+    def add(self, stage: str, duration: float):
+        """
+        Record the duration of a stage, in seconds.
+        """
+        with self._lock:
+            if stage not in self.stages:
+                self.stages[stage] = RollingStats(stage, self.window)
+            self.stages[stage].add(duration)
+
+    @contextlib.contextmanager
+    def measure(self, stage: str):
+        """
+        Context manager recording the duration of its body as the given stage.
+        """
+        _stime = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - _stime)
+
+    def add_dropped(self, count: int = 1):
+        with self._lock:
+            self.dropped += count
+
+    def set_queue_depth(self, name: str, depth: int):
+        with self._lock:
+            self.queues[name] = depth
+
+    def frame_done(
+        self,
+        latency: Optional[float] = None,
+        timestamp: Optional[float] = None,
+    ):
+        """
+        Record a frame reaching the output and report if the interval elapsed.
+
+        Args:
+            latency: time between the capture and the output of the frame, in seconds
+            timestamp: ``time.perf_counter()`` when the frame was output, default to
+                now.
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        with self._lock:
+            self.frames += 1
+            if latency is not None:
+                self.latency.add(latency)
+            if (
+                self.budget is not None
+                and self._last_frame is not None
+                and timestamp - self._last_frame > self.budget * LATE_TOLERANCE
+            ):
+                self.late += 1
+            self._last_frame = timestamp
+
+        if (
+            self.interval is not None
+            and time.perf_counter() - self._last_report >= self.interval
+        ):
+            self.report()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns:
+            every metric as a json-serializable dict, durations in seconds
+        """
+        with self._lock:
+            return {
+                "time": time.time(),
+                "frames": self.frames,
+                "fps": self.fps,
+                "dropped": self.dropped,
+                "late": self.late,
+                "queues": dict(self.queues),
+                "latency": self.latency.summary(),
+                "stages": {
+                    name: stats.summary() for name, stats in self.stages.items()
+                },
+            }
+
+    def format(self) -> str:
+        """
+        Returns:
+            human-readable summary of every metric
+        """
+        with self._lock:
+            lines = [
+                f"{self.frames} frames at {self.fps:.2f}fps, {self.dropped} dropped, "
+                f"{self.late} late, queues={self.queues}"
+            ]
+            lines += [f"    {stats}" for stats in self.stages.values()]
+            lines += [f"    {self.latency}"]
+        return "\n".join(lines)
+
+    def report(self):
+        """
+        Log the metrics and dump them to the dump_path if any.
+        """
+        self._last_report = time.perf_counter()
+        logger.log(self.log_level, f"[{self.__class__.__name__}] {self.format()}")
+        if self.dump_path:
+            self.dump()
+
+    def dump(self, path: Optional[Union[str, Path]] = None):
+        """
+        Write the current metrics to the given path, default to the dump_path.
+        """
+        path = Path(path) if path else self.dump_path
+        if path is None:
+            raise ValueError("No path to dump the metrics to.")
+
+        dump_format = self.dump_format or ("csv" if path.suffix == ".csv" else "json")
+        snapshot = self.snapshot()
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if dump_format == "json":
+            with path.open("w", encoding="utf-8") as file:
+                json.dump(snapshot, file, indent=4)
+            return
+
+        stats = dict(snapshot["stages"], latency=snapshot["latency"])
+        fieldnames = ["time", "frames", "fps", "dropped", "late", "stage"]
+        fieldnames += list(snapshot["latency"])
+        new_file = not path.exists()
+        with path.open("a", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            if new_file:
+                writer.writeheader()
+            for stage, summary in stats.items():
+                writer.writerow(
+                    {
+                        "time": snapshot["time"],
+                        "frames": snapshot["frames"],
+                        "fps": snapshot["fps"],
+                        "dropped": snapshot["dropped"],
+                        "late": snapshot["late"],
+                        "stage": stage,
+                        **summary,
+                    }
+                )
@@ -0,0 +1,435 @@
+"""
+Process several cameras in one process with a single pool of transform workers.
+
+One process per camera means each of them parse the OCIO config, build its own
+processors and allocate its own buffers. Here every stream only own its capture
+and output threads and a small ring buffer: the processor, its cached OCIO
+processors and the workers are shared, so the overhead grow with the number of
+frames in flight instead of the number of cameras.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from . import c
+from .metrics import MetricsRecorder
+from .pipeline import (
+    AsyncFrameProcessor,
+    DropPolicy,
+    Frame,
+    FrameReader,
+    FrameWriter,
+    RingBuffer,
+)
+from .processors import FrameProcessor
+
+__all__ = [
+    "Stream",
+    "ThreadPoolProcessor",
+    "MultiSourceRunner",
+]
+
+logger = logging.getLogger(f"{c.ABR}.multi")
+
+
+@dataclass
+class Stream:
+    """
+    One source and the sink its processed frames are sent to.
+    """
+
+    name: str
+    reader: FrameReader
+    writer: FrameWriter
+    metrics: Optional[MetricsRecorder] = None
+    """
+    per-stream metrics, created by the runner if None.
+    """
+
+    buffer: Optional[RingBuffer] = field(default=None, init=False, repr=False)
+    """
+    captured frames waiting for a worker, set by the runner.
+    """
+    frames_captured: int = field(default=0, init=False)
+    frames_sent: int = field(default=0, init=False)
+    in_flight: int = field(default=0, init=False)
+    """
+    number of frames submitted to the workers and not sent yet
+    """
+    _tickets: "queue.Queue[Any]" = field(
+        default_factory=queue.Queue, init=False, repr=False
+    )
+    """
+    (frame, ticket, submit time) in submission order, None once the stream ended.
+    """
+    _ended: bool = field(default=False, init=False, repr=False)
+
+
+class ThreadPoolProcessor:
+    """
+    ``AsyncFrameProcessor`` applying a processor in a pool of threads.
+
+    The OCIO and numpy operations release the GIL so threads process frames in
+    parallel, while sharing the same processor and OCIO config.
+    """
+
+    def __init__(self, processor: FrameProcessor, workers: int = 2):
+        self.processor = processor
+        self.workers = workers
+        self.slots = workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix=f"{c.ABR}.multi.worker",
+        )
+        processor_name = getattr(processor, "__name__", "processor")
+        self.__name__ = f"{self.__class__.__name__}[{processor_name}]"
+
+    def __enter__(self) -> "ThreadPoolProcessor":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __call__(self, frame):
+        return self.processor(frame)
+
+    def submit(self, frame) -> Future:
+        return self._executor.submit(self.processor, frame)
+
+    def collect(self, ticket: Future):
+        return ticket.result()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+class MultiSourceRunner:
+    """
+    Serve N streams with one shared processor::
+
+        stream.reader -> [stream.buffer] -+
+        stream.reader -> [stream.buffer] -+-> dispatcher -> workers -> stream.writer
+        stream.reader -> [stream.buffer] -+
+
+    Each stream has its own capture and output threads. The dispatcher picks the
+    streams round-robin, skipping the ones which already have their share of frames
+    in flight, so a fast camera can't starve the others.
+
+    Example::
+
+        streams = [Stream(f"camera{i}", Webcam(config), vcam) for ...]
+        with MultiSourceRunner(streams, processor, workers=4) as runner:
+            runner.wait()
+        print(runner.report())
+    """
+
+    def __init__(
+        self,
+        streams: Sequence[Stream],
+        processor: FrameProcessor,
+        workers: int = 2,
+        buffer_size: int = 1,
+        policy: DropPolicy = "drop-oldest",
+        max_frames: Optional[int] = None,
+        metrics_interval: Optional[float] = None,
+    ):
+        """
+        Args:
+            streams: with unique names
+            processor: function applied on the frames of every stream, see
+                ``processors``. An ``AsyncFrameProcessor`` like
+                ``workers.SharedMemoryProcessor`` is used as the pool directly,
+                else it's run in a ``ThreadPoolProcessor`` of ``workers`` threads.
+            workers: number of threads when the processor is a plain function
+            buffer_size: number of captured frames each stream can queue
+            policy: what to do when a stream buffer is full, see ``RingBuffer``
+            max_frames: stop capturing each stream after this number of frames
+            metrics_interval: seconds between 2 reports of the metrics created for
+                the streams without any.
+        """
+        names = [stream.name for stream in streams]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Stream names must be unique, got {names}.")
+        if not streams:
+            raise ValueError("At least one stream is required.")
+
+        self.streams: List[Stream] = list(streams)
+        self.max_frames = max_frames
+
+        self._own_pool = not (
+            hasattr(processor, "submit") and hasattr(processor, "collect")
+        )
+        if self._own_pool:
+            processor = ThreadPoolProcessor(processor, workers=workers)
+        self.processor: AsyncFrameProcessor = processor
+
+        self.slots: int = processor.slots
+        self.stream_slots: int = max(1, self.slots // len(self.streams))
+        """
+        maximum frames in flight per stream, their fair share of the workers
+        """
+
+        for stream in self.streams:
+            stream.buffer = RingBuffer(buffer_size, policy, name=stream.name)
+            if stream.metrics is None:
+                stream.metrics = MetricsRecorder(
+                    fps=getattr(stream.reader, "fps", None),
+                    interval=metrics_interval,
+                )
+
+        self._next_stream: int = 0
+        self._in_flight: int = 0
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._errors: List[BaseException] = []
+        self._start_time: Optional[float] = None
+        self._end_time: Optional[float] = None
+
+    def __enter__(self) -> "MultiSourceRunner":
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    @property
+    def frames_sent(self) -> int:
+        return sum(stream.frames_sent for stream in self.streams)
+
+    @property
+    def fps(self) -> float:
+        """
+        Frames sent per second since the start, all streams combined.
+        """
+        if self._start_time is None:
+            return 0.0
+        duration = (self._end_time or time.perf_counter()) - self._start_time
+        return self.frames_sent / duration if duration else 0.0
+
+    def _notify(self):
+        with self._condition:
+            self._condition.notify_all()
+
+    def _run_thread(self, function, *args):
+        try:
+            function(*args)
+        except BaseException as error:
+            logger.exception(f"[{self.__class__.__name__}] thread failed: {error}")
+            self._errors.append(error)
+            self._stop_event.set()
+            for stream in self.streams:
+                stream.buffer.close()
+            self._notify()
+
+    def _capture(self, stream: Stream):
+
+        try:
+            while not self._stop_event.is_set():
+                if (
+                    self.max_frames is not None
+                    and stream.frames_captured >= self.max_frames
+                ):
+                    break
+
+                _stime = time.perf_counter()
+                ret, image = stream.reader.read()
+                if not ret:
+                    logger.info(f"[{stream.name}][capture] end of stream.")
+                    break
+
+                captured = time.perf_counter()
+                frame = Frame(
+                    index=stream.frames_captured, image=image, captured=captured
+                )
+                stream.frames_captured += 1
+                stream.metrics.add("capture", captured - _stime)
+                if stream.buffer.put(frame) is not None:
+                    stream.metrics.add_dropped()
+                stream.metrics.set_queue_depth("capture", len(stream.buffer))
+                self._notify()
+        finally:
+            stream.buffer.close()
+            self._notify()
+
+    def _pick(self) -> Optional[Stream]:
+        """
+        Returns:
+            next stream in round-robin order with a frame waiting and a free slot.
+        """
+        if self._in_flight >= self.slots:
+            return None
+
+        count = len(self.streams)
+        for offset in range(count):
+            stream = self.streams[(self._next_stream + offset) % count]
+            if len(stream.buffer) and stream.in_flight < self.stream_slots:
+                self._next_stream = (self._next_stream + offset + 1) % count
+                return stream
+        return None
+
+    def _end_streams(self, force: bool = False):
+        """
+        Tell the output thread of the exhausted streams that no frame will come.
+        """
+        for stream in self.streams:
+            if stream._ended:
+                continue
+            if force or (stream.buffer.closed and not len(stream.buffer)):
+                stream._ended = True
+                stream._tickets.put(None)
+
+    def _dispatch(self):
+
+        try:
+            while not self._errors:
+                with self._condition:
+                    self._end_streams()
+                    if all(stream._ended for stream in self.streams):
+                        break
+                    stream = self._pick()
+                    if stream is None:
+                        self._condition.wait(0.1)
+                        continue
+
+                    frame: Optional[Frame] = stream.buffer.get(timeout=0)
+                    if frame is None:
+                        continue
+                    stream.in_flight += 1
+                    self._in_flight += 1
+
+                _stime = time.perf_counter()
+                ticket = self.processor.submit(frame.image)
+                stream._tickets.put((frame, ticket, _stime))
+        finally:
+            self._end_streams(force=True)
+
+    def _output(self, stream: Stream):
+
+        while True:
+            item = stream._tickets.get()
+            if item is None:
+                break
+
+            frame, ticket, _stime = item
+            try:
+                frame.image = self.processor.collect(ticket)
+                processed = time.perf_counter()
+                stream.metrics.add("process", processed - _stime)
+
+                stream.writer.send(frame.image)
+                sent = time.perf_counter()
+                stream.metrics.add("output", sent - processed)
+            finally:
+                with self._condition:
+                    stream.in_flight -= 1
+                    self._in_flight -= 1
+                    self._condition.notify_all()
+
+            stream.frames_sent += 1
+            stream.metrics.frame_done(latency=sent - frame.captured)
+
+    def start(self):
+
+        if self.running:
+            raise RuntimeError(f"{self.__class__.__name__} is already running.")
+
+        self._start_time = time.perf_counter()
+        self._threads = [
+            threading.Thread(
+                target=self._run_thread,
+                args=(self._dispatch,),
+                name=f"{c.ABR}.multi.dispatch",
+                daemon=True,
+            )
+        ]
+        for stream in self.streams:
+            for name, function in (
+                ("capture", self._capture),
+                ("output", self._output),
+            ):
+                self._threads.append(
+                    threading.Thread(
+                        target=self._run_thread,
+                        args=(function, stream),
+                        name=f"{c.ABR}.multi.{stream.name}.{name}",
+                        daemon=True,
+                    )
+                )
+        for thread in self._threads:
+            thread.start()
+
+        logger.info(
+            f"[{self.__class__.__name__}][start] {len(self.streams)} streams, "
+            f"{self.slots} slots ({self.stream_slots} per stream)."
+        )
+        return
+
+    def _raise_errors(self):
+        if self._errors:
+            error = self._errors[0]
+            self._errors.clear()
+            raise error
+
+    def wait(self, duration: Optional[float] = None):
+        """
+        Block until every source is exhausted or the given duration elapsed.
+
+        Raises the first exception that happened in a thread.
+        """
+        end_time = None if duration is None else time.perf_counter() + duration
+        for thread in self._threads:
+            timeout = None
+            if end_time is not None:
+                timeout = max(0.0, end_time - time.perf_counter())
+            thread.join(timeout)
+
+        self._raise_errors()
+        return
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop capturing, let the frames already captured go through and stop the
+        workers created by the runner.
+        """
+        self._stop_event.set()
+        self._notify()
+        for thread in self._threads:
+            thread.join(timeout)
+
+        if self._own_pool:
+            self.processor.close()
+
+        self._end_time = self._end_time or time.perf_counter()
+        logger.info(f"[{self.__class__.__name__}][stop] {self.report()}")
+
+        self._raise_errors()
+        return
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns:
+            ``MetricsRecorder.snapshot`` of each stream, by name.
+        """
+        return {stream.name: stream.metrics.snapshot() for stream in self.streams}
+
+    def report(self) -> str:
+        """
+        Returns:
+            human-readable metrics of each stream
+        """
+        lines = [
+            f"{self.frames_sent} frames sent at {self.fps:.2f}fps over "
+            f"{len(self.streams)} streams"
+        ]
+        for stream in self.streams:
+            lines.append(f"  {stream.name}: {stream.metrics.format()}")
+        return "\n".join(lines)
@@ -0,0 +1,512 @@
+"""
+Pipelined live processing: capture, processing and output each run on their own
+thread, connected by bounded ring buffers.
+
+Frame time is then the duration of the slowest stage instead of the sum of all.
+"""
+import collections
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Literal, Optional, Protocol, Tuple
+
+import numpy
+
+from . import c
+from .metrics import MetricsRecorder
+from .processors import FrameProcessor
+from .sources import FramePool
+
+__all__ = [
+    "FrameReader",
+    "FrameWriter",
+    "AsyncFrameProcessor",
+    "Frame",
+    "RingBuffer",
+    "StageStats",
+    "PipelineRunner",
+]
+
+logger = logging.getLogger(f"{c.ABR}.pipeline")
+
+DropPolicy = Literal["drop-oldest", "block"]
+
+
+class FrameReader(Protocol):
+    """
+    Anything frames can be read from, like ``cv2.VideoCapture``.
+    """
+
+    def read(self) -> Tuple[bool, Optional[numpy.ndarray]]:
+        ...
+
+
+class FrameWriter(Protocol):
+    """
+    Anything frames can be sent to, like ``pyvirtualcam.Camera``.
+    """
+
+    def send(self, frame: numpy.ndarray):
+        ...
+
+
+class AsyncFrameProcessor(Protocol):
+    """
+    Processor able to process several frames at the same time, like
+    ``workers.SharedMemoryProcessor``.
+    """
+
+    slots: int
+    """
+    maximum number of frames in flight
+    """
+
+    def submit(self, frame: numpy.ndarray) -> Any:
+        """
+        Returns:
+            ticket to pass to collect, with a ``done()`` method.
+        """
+        ...
+
+    def collect(self, ticket: Any) -> numpy.ndarray:
+        ...
+
+
+@dataclass
+class Frame:
+    index: int
+    image: numpy.ndarray
+    captured: float
+    """
+    ``time.perf_counter()`` value when the frame was captured
+    """
+    durations: Dict[str, float] = field(default_factory=dict)
+    """
+    time spent in each stage, in seconds
+    """
+    buffer: Optional[numpy.ndarray] = None
+    """
+    pool buffer the frame was captured in, until it is released
+    """
+
+
+class RingBuffer:
+    """
+    Thread-safe bounded FIFO.
+
+    When full, ``put`` either drop the oldest item (``drop-oldest`` policy) or block
+    until an item is consumed (``block`` policy).
+    Once closed, ``get`` return the remaining items then None.
+    """
+
+    def __init__(self, size: int, policy: DropPolicy = "drop-oldest", name: str = ""):
+        if size < 1:
+            raise ValueError(f"RingBuffer size must be at least 1, got {size}.")
+        if policy not in ("drop-oldest", "block"):
+            raise ValueError(f"Policy <{policy}> passed is not supported.")
+
+        self.name = name
+        self.size = size
+        self.policy = policy
+        self.dropped: int = 0
+
+        self._items: Deque[Any] = collections.deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {self.name} {len(self)}/{self.size} "
+            f"policy={self.policy} dropped={self.dropped}>"
+        )
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, item: Any) -> Optional[Any]:
+        """
+        Returns:
+            the item dropped to make room, if any. The given item itself if the
+            buffer is closed, the items already queued are kept.
+        """
+        dropped = None
+        with self._condition:
+            if self.policy == "block":
+                while len(self._items) >= self.size and not self._closed:
+                    self._condition.wait()
+
+            if self._closed:
+                return item
+
+            if len(self._items) >= self.size:
+                dropped = self._items.popleft()
+                self.dropped += 1
+
+            self._items.append(item)
+            self._condition.notify_all()
+        return dropped
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Args:
+            timeout: maximum time to wait for an item, in seconds.
+
+        Returns:
+            the oldest item, or None if the buffer is closed and empty or on timeout.
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._items or self._closed,
+                timeout=timeout,
+            ):
+                return None
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._condition.notify_all()
+            return item
+
+    def close(self):
+        """
+        Stop accepting items and wake up every waiting thread.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+@dataclass
+class StageStats:
+    name: str
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, duration: float):
+        self.count += 1
+        self.total += duration
+        self.maximum = max(self.maximum, duration)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name:>10}: n={self.count} mean={self.mean * 1000:.2f}ms "
+            f"max={self.maximum * 1000:.2f}ms"
+        )
+
+
+class PipelineRunner:
+    """
+    Run capture, processing and output on 3 threads::
+
+        reader.read() -> [buffer] -> processor() -> [buffer] -> writer.send()
+
+    Example::
+
+        with PipelineRunner(camera, processor, vcam) as runner:
+            runner.wait(duration=10)
+        print(runner.report())
+    """
+
+    stages = ("capture", "process", "output")
+
+    def __init__(
+        self,
+        reader: FrameReader,
+        processor: FrameProcessor,
+        writer: FrameWriter,
+        buffer_size: int = 2,
+        policy: DropPolicy = "drop-oldest",
+        max_frames: Optional[int] = None,
+        pool: Optional[FramePool] = None,
+        metrics: Optional[MetricsRecorder] = None,
+    ):
+        """
+        Args:
+            reader: source of the frames, read() returning False stop the pipeline.
+            processor: function applied on each frame, see ``processors``.
+                An ``AsyncFrameProcessor`` is given up to ``slots`` frames at the
+                same time, they are still output in capture order.
+            writer: destination of the processed frames
+            buffer_size: number of frames each buffer between stages can hold
+            policy: what to do when a buffer is full, see ``RingBuffer``
+            max_frames: stop capturing after this number of frames
+            pool: if given, frames are read in place into its buffers, the reader
+                must support ``read(image=buffer)``. See ``get_pool_size``.
+            metrics: if given, also record the stage durations, latency, dropped
+                frames and buffer depths to it.
+        """
+        self.reader = reader
+        self.processor = processor
+        self.writer = writer
+        self.max_frames = max_frames
+        self.pool = pool
+        self.metrics = metrics
+
+        self.capture_buffer = RingBuffer(buffer_size, policy, name="capture")
+        self.output_buffer = RingBuffer(buffer_size, policy, name="output")
+
+        self.stats: Dict[str, StageStats] = {
+            name: StageStats(name) for name in self.stages + ("latency",)
+        }
+        self.frames_sent: int = 0
+
+        self._stats_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._errors: List[BaseException] = []
+        self._start_time: Optional[float] = None
+        self._end_time: Optional[float] = None
+
+    @staticmethod
+    def get_pool_size(buffer_size: int = 2) -> int:
+        """
+        Returns:
+            minimum number of pool buffers for the capture to never wait for one:
+            both ring buffers full plus one frame in each stage.
+        """
+        return buffer_size * 2 + 3
+
+    def __enter__(self) -> "PipelineRunner":
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    @property
+    def dropped(self) -> int:
+        return self.capture_buffer.dropped + self.output_buffer.dropped
+
+    @property
+    def fps(self) -> float:
+        """
+        Frames sent per second since the start.
+        """
+        if self._start_time is None:
+            return 0.0
+        duration = (self._end_time or time.perf_counter()) - self._start_time
+        return self.frames_sent / duration if duration else 0.0
+
+    def _add_stat(self, frame: Frame, stage: str, duration: float):
+        frame.durations[stage] = duration
+        with self._stats_lock:
+            self.stats[stage].add(duration)
+        if self.metrics is not None:
+            self.metrics.add(stage, duration)
+
+    def _put(self, buffer: RingBuffer, frame: Frame):
+        """
+        Put the frame in the buffer and release the frame dropped for it, if any.
+        """
+        dropped = buffer.put(frame)
+        if self.metrics is not None:
+            if dropped is not None and dropped is not frame:
+                self.metrics.add_dropped()
+            self.metrics.set_queue_depth(buffer.name, len(buffer))
+        self._release(dropped)
+
+    def _raise_errors(self):
+        """
+        Raise the first exception that happened in a stage, only once.
+        """
+        if self._errors:
+            error = self._errors[0]
+            self._errors.clear()
+            raise error
+
+    def _run_stage(self, function):
+        try:
+            function()
+        except BaseException as error:
+            logger.exception(f"[{self.__class__.__name__}] stage failed: {error}")
+            self._errors.append(error)
+            self._stop_event.set()
+        finally:
+            # always unblock the next stages
+            self.capture_buffer.close()
+            if function != self._capture:
+                self.output_buffer.close()
+
+    def _release(self, frame: Optional[Frame]):
+        """
+        Give back the pool buffer of the frame, if it still holds one.
+        """
+        if frame is not None and frame.buffer is not None:
+            self.pool.release(frame.buffer)
+            frame.buffer = None
+
+    def _capture(self):
+
+        index = 0
+        while not self._stop_event.is_set():
+            if self.max_frames is not None and index >= self.max_frames:
+                break
+
+            _stime = time.perf_counter()
+            if self.pool is not None:
+                try:
+                    ret, image = self.pool.read(self.reader, timeout=0.5)
+                except TimeoutError:
+                    # every buffer is in use, check if the pipeline was stopped
+                    continue
+            else:
+                ret, image = self.reader.read()
+            if not ret:
+                logger.info(f"[{self.__class__.__name__}][capture] end of stream.")
+                break
+
+            captured = time.perf_counter()
+            frame = Frame(index=index, image=image, captured=captured)
+            if self.pool is not None:
+                frame.buffer = image
+            self._add_stat(frame, "capture", captured - _stime)
+            self._put(self.capture_buffer, frame)
+            index += 1
+
+    def _process(self):
+
+        while True:
+            frame: Frame = self.capture_buffer.get()
+            if frame is None:
+                break
+
+            _stime = time.perf_counter()
+            frame.image = self.processor(frame.image)
+            self._add_stat(frame, "process", time.perf_counter() - _stime)
+            # processors working in place keep the buffer until output
+            if frame.image is not frame.buffer:
+                self._release(frame)
+            self._put(self.output_buffer, frame)
+
+    def _process_async(self):
+
+        in_flight: Deque[Tuple[Frame, Any, float]] = collections.deque()
+        while True:
+            exhausted = self.capture_buffer.closed and not len(self.capture_buffer)
+            if in_flight and (
+                exhausted
+                or len(in_flight) >= self.processor.slots
+                or in_flight[0][1].done()
+            ):
+                # always collect the oldest frame first to keep the order
+                frame, ticket, _stime = in_flight.popleft()
+                frame.image = self.processor.collect(ticket)
+                self._add_stat(frame, "process", time.perf_counter() - _stime)
+                self._put(self.output_buffer, frame)
+                continue
+
+            if exhausted:
+                break
+
+            frame: Frame = self.capture_buffer.get(timeout=0.002 if in_flight else None)
+            if frame is None:
+                continue
+
+            _stime = time.perf_counter()
+            ticket = self.processor.submit(frame.image)
+            # the frame was copied by submit
+            self._release(frame)
+            in_flight.append((frame, ticket, _stime))
+
+    def _output(self):
+
+        while True:
+            frame: Frame = self.output_buffer.get()
+            if frame is None:
+                break
+
+            _stime = time.perf_counter()
+            self.writer.send(frame.image)
+            sent = time.perf_counter()
+            self._release(frame)
+            self._add_stat(frame, "output", sent - _stime)
+            with self._stats_lock:
+                self.stats["latency"].add(sent - frame.captured)
+                self.frames_sent += 1
+            if self.metrics is not None:
+                self.metrics.set_queue_depth(
+                    self.output_buffer.name, len(self.output_buffer)
+                )
+                self.metrics.frame_done(latency=sent - frame.captured)
+
+    def start(self):
+
+        if self.running:
+            raise RuntimeError(f"{self.__class__.__name__} is already running.")
+
+        process = self._process
+        if hasattr(self.processor, "submit") and hasattr(self.processor, "collect"):
+            process = self._process_async
+
+        self._start_time = time.perf_counter()
+        self._threads = [
+            threading.Thread(
+                target=self._run_stage,
+                args=(function,),
+                name=f"{c.ABR}.pipeline.{name}",
+                daemon=True,
+            )
+            for name, function in zip(
+                self.stages, (self._capture, process, self._output)
+            )
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        logger.info(f"[{self.__class__.__name__}][start] Started.")
+        return
+
+    def wait(self, duration: Optional[float] = None):
+        """
+        Block until the source is exhausted or the given duration elapsed.
+
+        Raises the first exception that happened in a stage.
+        """
+        end_time = None if duration is None else time.perf_counter() + duration
+        for thread in self._threads:
+            timeout = None
+            if end_time is not None:
+                timeout = max(0.0, end_time - time.perf_counter())
+            thread.join(timeout)
+
+        self._raise_errors()
+        return
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop capturing and let the frames already captured go through.
+        """
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+        self._end_time = self._end_time or time.perf_counter()
+        logger.info(f"[{self.__class__.__name__}][stop] {self.report()}")
+
+        self._raise_errors()
+        return
+
+    def report(self) -> str:
+        """
+        Returns:
+            human-readable per-stage latency summary
+        """
+        lines = [
+            f"{self.frames_sent} frames sent at {self.fps:.2f}fps, "
+            f"{self.dropped} dropped"
+        ]
+        lines += [f"    {stats}" for stats in self.stats.values()]
+        return "\n".join(lines)
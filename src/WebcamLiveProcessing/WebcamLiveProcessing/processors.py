@@ -0,0 +1,348 @@
+"""
+Frame processors: functions converting a captured frame to the frame to output.
+
+A processor receive the uint8 B-G-R frame as returned by ``cv2.VideoCapture.read()``
+and return an uint8 R-G-B frame ready to be sent to a virtual camera.
+"""
+import functools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Literal, Optional, Tuple
+
+import cv2
+import numpy
+
+from . import c
+from .metrics import MetricsRecorder
+from .raw import RawFrameDecoder
+
+__all__ = [
+    "FrameProcessor",
+    "Reframe",
+    "passthrough",
+    "apply_exposure",
+    "ToneLUT",
+    "ExposureLUT",
+    "get_colortransform_processor",
+    "get_raw_colortransform_processor",
+]
+
+logger = logging.getLogger(f"{c.ABR}.processors")
+
+FrameProcessor = Callable[[numpy.ndarray], numpy.ndarray]
+
+ColorTransform = Callable[[numpy.ndarray], numpy.ndarray]
+"""
+Function receiving a float32 R-G-B array in [0-1] and returning the processed array.
+"""
+
+ExposureMode = Literal["scene", "display"]
+
+
+@dataclass
+class Reframe:
+    """
+    Crop and/or resize the uint8 frame, before any float conversion, so the colour
+    transform cost scale with the output pixels instead of the sensor pixels.
+    """
+
+    roi: Optional[Tuple[int, int, int, int]] = None
+    """
+    (x, y, width, height) region of the frame to keep, clamped to the frame.
+    """
+    size: Optional[Tuple[int, int]] = None
+    """
+    (width, height) the region is resized to, keep the region size if None.
+    """
+    interpolation: int = cv2.INTER_AREA
+
+    def get_output_size(self, width: int, height: int) -> Tuple[int, int]:
+        """
+        Returns:
+            (width, height) of the frames returned for source frames of the given size
+        """
+        if self.size:
+            return self.size
+        if self.roi:
+            x, y, roi_width, roi_height = self._get_roi(width, height)
+            return roi_width, roi_height
+        return width, height
+
+    def _get_roi(self, width: int, height: int) -> Tuple[int, int, int, int]:
+        x, y, roi_width, roi_height = self.roi
+        x = min(max(x, 0), width)
+        y = min(max(y, 0), height)
+        roi_width = min(roi_width, width - x)
+        roi_height = min(roi_height, height - y)
+        if roi_width <= 0 or roi_height <= 0:
+            raise ValueError(f"ROI {self.roi} is outside of the {width}x{height} frame.")
+        return x, y, roi_width, roi_height
+
+    def __call__(self, frame: numpy.ndarray) -> numpy.ndarray:
+
+        if self.roi:
+            x, y, width, height = self._get_roi(frame.shape[1], frame.shape[0])
+            # a view, no copy
+            frame = frame[y : y + height, x : x + width]
+
+        if self.size and self.size != (frame.shape[1], frame.shape[0]):
+            frame = cv2.resize(frame, self.size, interpolation=self.interpolation)
+
+        return frame
+
+
+def passthrough(frame: numpy.ndarray) -> numpy.ndarray:
+    """
+    Only convert the B-G-R frame to R-G-B.
+    """
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def apply_exposure(
+    array: numpy.ndarray,
+    exposure: float,
+    exposure_mode: ExposureMode = "scene",
+) -> numpy.ndarray:
+    """
+    Colour transform applying an exposure gain in place.
+
+    Use ``functools.partial`` to get a picklable ``ColorTransform`` from it, or
+    ``ExposureLUT`` to apply it on uint8 frames for the cost of a lookup.
+
+    Args:
+        array: float32 R-G-B array in [0-1], display encoded.
+        exposure: gain applied
+        exposure_mode: apply exposure on scene (linearised with a 2.2 power) or
+            display referred data. display referred is much faster.
+    """
+    if exposure_mode not in ("scene", "display"):
+        raise ValueError(f"Exposure mode <{exposure_mode}> passed is not supported.")
+
+    if exposure_mode == "scene":
+        numpy.power(array, 2.2, out=array)
+    array *= exposure
+    numpy.clip(array, 0, 1, out=array)
+    if exposure_mode == "scene":
+        numpy.power(array, 1 / 2.2, out=array)
+    return array
+
+
+class ToneLUT:
+    """
+    ``FrameProcessor`` applying a per-channel colour transform through a 256-entry
+    table, straight on the uint8 frame.
+
+    For uint8 input, a transform where each output channel only depends on the same
+    input channel is fully described by its value for the 256 code values: the table
+    is built once by evaluating the transform on them, then each frame costs a
+    single ``cv2.LUT`` lookup instead of the float conversions and the transform.
+    Not valid for transforms mixing channels, like the AgX ones.
+
+    Example::
+
+        processor = ToneLUT(functools.partial(apply_exposure, exposure=2))
+    """
+
+    def __init__(
+        self,
+        colortransform: ColorTransform,
+        reframe: Optional[Reframe] = None,
+    ):
+        """
+        Args:
+            colortransform: per-channel transform, see class docstring.
+            reframe: if given, crop/resize the uint8 frame before the lookup.
+        """
+        self._colortransform = colortransform
+        self.reframe = reframe
+        self._table: Optional[numpy.ndarray] = None
+        self.__name__ = (
+            f"{self.__class__.__name__}"
+            f"[{getattr(colortransform, '__name__', 'callable')}]"
+        )
+
+    @property
+    def colortransform(self) -> ColorTransform:
+        return self._colortransform
+
+    @colortransform.setter
+    def colortransform(self, value: ColorTransform):
+        self._colortransform = value
+        self._table = None
+
+    @property
+    def table(self) -> numpy.ndarray:
+        """
+        uint8 array of shape (1, 256, 3): R-G-B output for each code value, built
+        on first access after the transform changed.
+        """
+        if self._table is None:
+            self._table = self.build()
+        return self._table
+
+    def build(self) -> numpy.ndarray:
+        """
+        Returns:
+            new table from the current colour transform
+        """
+        ramp = numpy.arange(256, dtype=numpy.float32) / 255
+        array = numpy.repeat(ramp[numpy.newaxis, :, numpy.newaxis], 3, axis=2)
+        array = self._colortransform(array)
+        # converted back to uint8 the same way as get_colortransform_processor
+        numpy.clip(array, 0, 1, out=array)
+        array *= 255
+        logger.debug(f"[{self.__class__.__name__}][build] {self.__name__}")
+        return array.astype(numpy.uint8)
+
+    def __call__(self, frame: numpy.ndarray) -> numpy.ndarray:
+        if self.reframe is not None:
+            frame = self.reframe(frame)
+        new_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return cv2.LUT(new_image, self.table, dst=new_image)
+
+
+class ExposureLUT(ToneLUT):
+    """
+    ``ToneLUT`` of ``apply_exposure``, the table is only rebuilt when the exposure
+    or the mode change so they can be adjusted live at no per-frame cost.
+    """
+
+    def __init__(
+        self,
+        exposure: float = 1.0,
+        exposure_mode: ExposureMode = "scene",
+        reframe: Optional[Reframe] = None,
+    ):
+        """
+        Args:
+            exposure: see ``apply_exposure``
+            exposure_mode: see ``apply_exposure``
+            reframe: see ``ToneLUT``
+        """
+        super().__init__(
+            self._get_colortransform(exposure, exposure_mode), reframe=reframe
+        )
+        self._exposure = exposure
+        self._exposure_mode: ExposureMode = exposure_mode
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} exposure={self.exposure} "
+            f"mode={self.exposure_mode}>"
+        )
+
+    @staticmethod
+    def _get_colortransform(
+        exposure: float,
+        exposure_mode: ExposureMode,
+    ) -> ColorTransform:
+        if exposure_mode not in ("scene", "display"):
+            raise ValueError(f"Exposure mode <{exposure_mode}> passed is not supported.")
+        return functools.partial(
+            apply_exposure,
+            exposure=exposure,
+            exposure_mode=exposure_mode,
+        )
+
+    @property
+    def exposure(self) -> float:
+        return self._exposure
+
+    @exposure.setter
+    def exposure(self, value: float):
+        if value != self._exposure:
+            self.colortransform = self._get_colortransform(value, self._exposure_mode)
+            self._exposure = value
+
+    @property
+    def exposure_mode(self) -> ExposureMode:
+        return self._exposure_mode
+
+    @exposure_mode.setter
+    def exposure_mode(self, value: ExposureMode):
+        if value != self._exposure_mode:
+            self.colortransform = self._get_colortransform(self._exposure, value)
+            self._exposure_mode = value
+
+
+def get_colortransform_processor(
+    colortransform: ColorTransform,
+    metrics: Optional[MetricsRecorder] = None,
+    reframe: Optional[Reframe] = None,
+) -> FrameProcessor:
+    """
+    Args:
+        colortransform: for example ``ocex.agxc.transforms.transform_inout_look_1``
+        metrics: if given, record the duration of the "convert" (to and from float)
+            and "transform" stages of each frame.
+        reframe: if given, crop/resize the uint8 frame before anything else.
+
+    Returns:
+        processor converting the frame to float, applying the colortransform and
+        converting back to uint8, clipped to [0-1] first.
+    """
+
+    def _process(frame: numpy.ndarray) -> numpy.ndarray:
+        _stime = time.perf_counter()
+        if reframe is not None:
+            frame = reframe(frame)
+        new_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        new_image = new_image.astype(numpy.float32)
+        new_image /= 255
+        _ttime = time.perf_counter()
+        new_image = colortransform(new_image)
+        _ctime = time.perf_counter()
+        # out of range values would wrap around in the uint8 conversion
+        numpy.clip(new_image, 0, 1, out=new_image)
+        new_image *= 255
+        new_image = new_image.astype(numpy.uint8)
+        if metrics is not None:
+            metrics.add("transform", _ctime - _ttime)
+            metrics.add("convert", time.perf_counter() - _ctime + _ttime - _stime)
+        return new_image
+
+    _process.__name__ = f"processor[{getattr(colortransform, '__name__', 'callable')}]"
+    return _process
+
+
+def get_raw_colortransform_processor(
+    colortransform: ColorTransform,
+    decoder: RawFrameDecoder,
+    metrics: Optional[MetricsRecorder] = None,
+    reframe: Optional[Reframe] = None,
+) -> FrameProcessor:
+    """
+    Same as ``get_colortransform_processor`` but for raw frames of a camera opened
+    with ``convert_rgb=0``: the frame is decoded straight to float R-G-B.
+
+    Args:
+        colortransform: must expect linear data if the decoder is linear.
+        decoder: see ``raw.RawFrameDecoder``
+        metrics: see ``get_colortransform_processor``
+        reframe: if given, crop/resize the decoded uint8 frame before the float
+            conversion.
+    """
+
+    def _process(frame: numpy.ndarray) -> numpy.ndarray:
+        _stime = time.perf_counter()
+        if reframe is None:
+            new_image = decoder.to_float(frame)
+        else:
+            new_image = decoder.normalize(reframe(decoder.to_rgb(frame)))
+        _ttime = time.perf_counter()
+        new_image = colortransform(new_image)
+        _ctime = time.perf_counter()
+        # out of range values would wrap around in the uint8 conversion
+        numpy.clip(new_image, 0, 1, out=new_image)
+        new_image *= 255
+        new_image = new_image.astype(numpy.uint8)
+        if metrics is not None:
+            metrics.add("transform", _ctime - _ttime)
+            metrics.add("convert", time.perf_counter() - _ctime + _ttime - _stime)
+        return new_image
+
+    _process.__name__ = (
+        f"raw_processor[{getattr(colortransform, '__name__', 'callable')}]"
+    )
+    return _process
@@ -0,0 +1,173 @@
+"""
+Decode the undecoded frames delivered by a camera opened with ``convert_rgb=0``.
+
+Instead of letting the driver convert to B-G-R, then converting to R-G-B, then to
+float, the raw YUV (or MJPEG) frame is converted straight to R-G-B and normalised
+(optionally linearised) to float in a single lookup pass.
+"""
+import logging
+from typing import Literal, Optional
+
+import cv2
+import numpy
+
+from . import c
+from .capabilities import fourcc_to_str
+
+__all__ = [
+    "RawFormat",
+    "RAW_FORMATS",
+    "RawFrameDecoder",
+]
+
+logger = logging.getLogger(f"{c.ABR}.raw")
+
+RawFormat = Literal["YUYV", "NV12", "MJPG"]
+
+RAW_FORMATS = ("YUYV", "NV12", "MJPG")
+
+_YUV_CONVERSIONS = {
+    "YUYV": cv2.COLOR_YUV2RGB_YUYV,
+    "NV12": cv2.COLOR_YUV2RGB_NV12,
+}
+"""
+OpenCV conversions assume BT.601 limited range, like most webcams.
+"""
+
+_IMREAD_COLOR_RGB: Optional[int] = getattr(cv2, "IMREAD_COLOR_RGB", None)
+"""
+only available since OpenCV 4.10
+"""
+
+
+class RawFrameDecoder:
+    """
+    Convert raw frames to R-G-B.
+
+    Example::
+
+        config = WebcamConfiguration(..., convert_rgb=0, fourcc="YUYV")
+        camera = Webcam(config)
+        decoder = RawFrameDecoder.from_webcam(camera)
+        ret, raw = camera.read()
+        array = decoder.to_float(raw)
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        fourcc: RawFormat,
+        linear: bool = False,
+        gamma: float = 2.2,
+    ):
+        """
+        Args:
+            width: of the decoded frame
+            height: of the decoded frame
+            fourcc: format of the raw frames
+            linear: if True ``to_float`` also decode the transfer function
+            gamma: power function used to linearise, matching the one used by the
+                ``OCIOexperiments.agxc`` transforms.
+        """
+        if fourcc not in RAW_FORMATS:
+            raise ValueError(
+                f"Raw format <{fourcc}> is not supported, choose from {RAW_FORMATS}."
+            )
+        self.width = width
+        self.height = height
+        self.fourcc = fourcc
+        self.linear = linear
+
+        table = numpy.arange(256, dtype=numpy.float32) / 255
+        if linear:
+            table **= gamma
+        self.table: numpy.ndarray = table
+        """
+        uint8 code value to float, normalisation and linearisation in one lookup
+        """
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {self.fourcc} ({self.width}x{self.height}) "
+            f"linear={self.linear}>"
+        )
+
+    @classmethod
+    def from_webcam(cls, webcam, **kwargs) -> "RawFrameDecoder":
+        """
+        Args:
+            webcam: opened ``sources.Webcam``
+            kwargs: passed to the class
+        """
+        return cls(
+            width=webcam.width,
+            height=webcam.height,
+            fourcc=fourcc_to_str(webcam.get(cv2.CAP_PROP_FOURCC)),
+            **kwargs,
+        )
+
+    @property
+    def raw_shape(self):
+        """
+        Shape the raw frame is reinterpreted as, None for variable size (MJPG).
+        """
+        if self.fourcc == "YUYV":
+            return self.height, self.width, 2
+        if self.fourcc == "NV12":
+            return self.height * 3 // 2, self.width
+        return None
+
+    def to_rgb(
+        self,
+        raw: numpy.ndarray,
+        out: Optional[numpy.ndarray] = None,
+    ) -> numpy.ndarray:
+        """
+        Args:
+            raw: frame as returned by ``read()`` with ``convert_rgb=0``, its shape
+                depend on the backend and is ignored.
+            out: optional uint8 buffer of shape (height, width, 3)
+
+        Returns:
+            uint8 R-G-B frame
+        """
+        if self.fourcc == "MJPG":
+            if _IMREAD_COLOR_RGB is not None:
+                return cv2.imdecode(raw.reshape(-1), _IMREAD_COLOR_RGB)
+            image = cv2.imdecode(raw.reshape(-1), cv2.IMREAD_COLOR)
+            return cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+
+        return cv2.cvtColor(
+            raw.reshape(self.raw_shape),
+            _YUV_CONVERSIONS[self.fourcc],
+            dst=out,
+        )
+
+    def to_float(
+        self,
+        raw: numpy.ndarray,
+        out: Optional[numpy.ndarray] = None,
+    ) -> numpy.ndarray:
+        """
+        Args:
+            raw: see ``to_rgb``
+            out: optional float32 buffer of shape (height, width, 3)
+
+        Returns:
+            float32 R-G-B array in [0-1], linear if the decoder is.
+        """
+        return self.normalize(self.to_rgb(raw), out=out)
+
+    def normalize(
+        self,
+        image: numpy.ndarray,
+        out: Optional[numpy.ndarray] = None,
+    ) -> numpy.ndarray:
+        """
+        Convert an uint8 image to float32 in [0-1], linear if the decoder is.
+        """
+        # cv2.LUT is much faster than numpy.take on uint8 indexes
+        return cv2.LUT(image, self.table, dst=out)
+
+    __call__ = to_float
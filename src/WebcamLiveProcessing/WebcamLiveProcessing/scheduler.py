@@ -0,0 +1,283 @@
+"""
+Keep a steady framerate under load by degrading the processing quality.
+
+The scheduler is itself a ``FrameProcessor``: it time every frame it processes
+against the frame budget (``1/fps``) and switch between quality modes, ordered from
+the best quality to the cheapest.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Literal, Optional
+
+import cv2
+import numpy
+
+from . import c
+from .processors import FrameProcessor, Reframe, get_colortransform_processor
+
+__all__ = [
+    "QualityMode",
+    "get_scaled_processor",
+    "AdaptiveScheduler",
+    "get_agx_look_1_modes",
+]
+
+logger = logging.getLogger(f"{c.ABR}.scheduler")
+
+
+@dataclass
+class QualityMode:
+    name: str
+    processor: FrameProcessor
+    """
+    processor used at full resolution, ``scale`` is applied on top of it
+    """
+    scale: float = 1.0
+    """
+    resolution factor the frame is processed at before being upscaled back
+    """
+    skip: int = 0
+    """
+    number of frames to skip after each processed one, skipped frames repeat the
+    last processed frame.
+    """
+    reframe: Optional[Reframe] = None
+    """
+    crop/resize applied on the frame first, ``scale`` is relative to its output.
+    """
+
+    def __post_init__(self):
+        if not 0.0 < self.scale <= 1.0:
+            raise ValueError(f"QualityMode scale must be in ]0-1], got {self.scale}.")
+        if self.skip < 0:
+            raise ValueError(f"QualityMode skip must be positive, got {self.skip}.")
+        if self.scale != 1.0:
+            self.processor = get_scaled_processor(self.processor, self.scale)
+        if self.reframe is not None:
+            self.processor = _get_reframed_processor(self.processor, self.reframe)
+
+
+def _get_reframed_processor(processor: FrameProcessor, reframe: Reframe):
+    def _process(frame: numpy.ndarray) -> numpy.ndarray:
+        return processor(reframe(frame))
+
+    _process.__name__ = getattr(processor, "__name__", "processor")
+    return _process
+
+
+def get_scaled_processor(processor: FrameProcessor, scale: float) -> FrameProcessor:
+    """
+    Wrap the processor so it processes a downscaled frame and upscale its result.
+
+    The downscale is done on the uint8 captured frame, before any conversion to float.
+    """
+
+    def _process(frame: numpy.ndarray) -> numpy.ndarray:
+        height, width = frame.shape[:2]
+        small = cv2.resize(
+            frame,
+            (max(1, round(width * scale)), max(1, round(height * scale))),
+            interpolation=cv2.INTER_AREA,
+        )
+        return cv2.resize(
+            processor(small),
+            (width, height),
+            interpolation=cv2.INTER_LINEAR,
+        )
+
+    _process.__name__ = f"{getattr(processor, '__name__', 'processor')}@{scale}"
+    return _process
+
+
+class AdaptiveScheduler:
+    """
+    Processor switching between quality modes to hold the frame budget.
+
+    - downgrade to the next mode once the smoothed cost of the current mode exceed
+      ``headroom`` of the budget for ``downgrade_after`` frames in a row.
+    - upgrade to the previous mode once the current mode stayed under
+      ``upgrade_margin`` of the budget for ``upgrade_after`` frames in a row, and the
+      last known cost of the previous mode fits in the budget.
+
+    The cost of a skipping mode is its processing time divided by ``skip + 1``.
+
+    Example::
+
+        scheduler = AdaptiveScheduler(get_agx_look_1_modes(), fps=30)
+        with PipelineRunner(camera, scheduler, sink) as runner:
+            ...
+        print(scheduler.mode.name)
+    """
+
+    def __init__(
+        self,
+        modes: List[QualityMode],
+        fps: float,
+        headroom: float = 0.9,
+        upgrade_margin: float = 0.6,
+        downgrade_after: int = 3,
+        upgrade_after: int = 30,
+        smoothing: float = 0.2,
+        on_change: Optional[Callable[[QualityMode, QualityMode], None]] = None,
+    ):
+        """
+        Args:
+            modes: ordered from the best quality to the cheapest
+            fps: target framerate, define the budget of one frame
+            headroom: fraction of the budget the processing can use
+            upgrade_margin: fraction of the budget under which upgrading is tried
+            downgrade_after: number of frames over budget before downgrading
+            upgrade_after: number of frames under margin before upgrading
+            smoothing: weight of the last frame in the moving average of the cost
+            on_change: called with (previous mode, new mode) on every switch
+        """
+        if not modes:
+            raise ValueError("AdaptiveScheduler needs at least one mode.")
+
+        self.modes = modes
+        self.budget: float = 1.0 / fps
+        self.headroom = headroom
+        self.upgrade_margin = upgrade_margin
+        self.downgrade_after = downgrade_after
+        self.upgrade_after = upgrade_after
+        self.smoothing = smoothing
+        self.on_change = on_change
+
+        self.index: int = 0
+        self.frames: int = 0
+        self.late: int = 0
+        """
+        number of processed frames which took longer than the budget
+        """
+        self.skipped: int = 0
+        self.switches: int = 0
+
+        self._costs: List[Optional[float]] = [None] * len(modes)
+        """
+        smoothed cost per frame of each mode, in seconds
+        """
+        self._streak: int = 0
+        self._to_skip: int = 0
+        self._last_image: Optional[numpy.ndarray] = None
+
+        self.__name__ = self.__class__.__name__
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} mode={self.mode.name} "
+            f"cost={(self.cost or 0.0) * 1000:.2f}ms budget={self.budget * 1000:.2f}ms>"
+        )
+
+    @property
+    def mode(self) -> QualityMode:
+        """
+        Quality mode currently active.
+        """
+        return self.modes[self.index]
+
+    @property
+    def cost(self) -> Optional[float]:
+        """
+        Smoothed cost per frame of the active mode, in seconds.
+        """
+        return self._costs[self.index]
+
+    def _switch(self, index: int):
+
+        previous = self.mode
+        self.index = index
+        self._streak = 0
+        self._to_skip = 0
+        self.switches += 1
+        logger.info(
+            f"[{self.__class__.__name__}] {previous.name} -> {self.mode.name} "
+            f"(budget={self.budget * 1000:.2f}ms)"
+        )
+        if self.on_change:
+            self.on_change(previous, self.mode)
+
+    def _update(self, duration: float):
+
+        if duration > self.budget:
+            self.late += 1
+
+        cost = duration / (self.mode.skip + 1)
+        previous_cost = self._costs[self.index]
+        if previous_cost is not None:
+            cost = previous_cost + self.smoothing * (cost - previous_cost)
+        self._costs[self.index] = cost
+
+        if cost > self.budget * self.headroom:
+            self._streak = max(self._streak, 0) + 1
+            if self._streak >= self.downgrade_after and self.index < len(self.modes) - 1:
+                self._switch(self.index + 1)
+
+        elif cost < self.budget * self.upgrade_margin and self.index > 0:
+            self._streak = min(self._streak, 0) - 1
+            better_cost = self._costs[self.index - 1]
+            fits = better_cost is None or better_cost < self.budget * self.headroom
+            if -self._streak >= self.upgrade_after and fits:
+                # forget the old cost so the mode is measured again
+                self._costs[self.index - 1] = None
+                self._switch(self.index - 1)
+
+        else:
+            self._streak = 0
+
+    def __call__(self, frame: numpy.ndarray) -> numpy.ndarray:
+
+        if self._to_skip and self._last_image is not None:
+            self._to_skip -= 1
+            self.skipped += 1
+            return self._last_image
+
+        _stime = time.perf_counter()
+        image = self.mode.processor(frame)
+        self._update(time.perf_counter() - _stime)
+
+        self.frames += 1
+        self._to_skip = self.mode.skip
+        self._last_image = image
+        return image
+
+
+def get_agx_look_1_modes(
+    reframe: Optional[Reframe] = None,
+    method: Literal["ocio", "native"] = "ocio",
+) -> List[QualityMode]:
+    """
+    Quality modes for the AgX Punchy look from ``OCIOexperiments.agxc``, all using
+    the same implementation so the colours don't change when switching mode (the
+    ocio and native ones are not equivalent):
+
+    - ``<method>``: full resolution
+    - ``<method>-half``: half resolution
+    - ``<method>-half-skip``: half resolution on every other frame
+    - ``<method>-quarter-skip``: quarter resolution on every other frame
+
+    Args:
+        reframe: see ``QualityMode.reframe``
+        method: ``transform_inout_look_1`` (ocio, exact) or
+            ``transform_native_inout_look_1`` (native, faster)
+    """
+    from OCIOexperiments.agxc import transforms
+
+    if method == "ocio":
+        colortransform = transforms.transform_inout_look_1
+    elif method == "native":
+        colortransform = transforms.transform_native_inout_look_1
+    else:
+        raise ValueError(f"Method <{method}> passed is not supported.")
+
+    processor = get_colortransform_processor(colortransform)
+    return [
+        QualityMode(method, processor, reframe=reframe),
+        QualityMode(f"{method}-half", processor, scale=0.5, reframe=reframe),
+        QualityMode(
+            f"{method}-half-skip", processor, scale=0.5, skip=1, reframe=reframe
+        ),
+        QualityMode(
+            f"{method}-quarter-skip", processor, scale=0.25, skip=1, reframe=reframe
+        ),
+    ]
@@ -0,0 +1,495 @@
+"""
+Destinations for processed frames.
+
+Every sink receive uint8 R-G-B frames of shape (height, width, 3) through ``send``,
+like ``pyvirtualcam.Camera``.
+"""
+import logging
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import IO, List, Literal, Optional, Sequence, Union
+
+import cv2
+import numpy
+
+from . import c
+from .pipeline import DropPolicy, RingBuffer
+
+__all__ = [
+    "FrameSink",
+    "VirtualCameraSink",
+    "ImageSequenceSink",
+    "VideoFileSink",
+    "FFmpegSink",
+    "RecorderSink",
+    "NullSink",
+]
+
+logger = logging.getLogger(f"{c.ABR}.sinks")
+
+FRAME_TOKEN = "$FRAME"
+"""
+Token in export paths replaced by the frame number.
+"""
+
+SEGMENT_TOKEN = "$SEGMENT"
+"""
+Token in recording paths replaced by the segment number.
+"""
+
+RecorderBackend = Literal["cv2", "ffmpeg"]
+
+
+class FrameSink:
+    """
+    Interface shared by every destination of frames.
+    """
+
+    def __init__(self):
+        self.frames: int = 0
+        """
+        number of frames sent so far
+        """
+        self._start_time: Optional[float] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def fps(self) -> float:
+        """
+        Frames received per second since the first one.
+        """
+        if self._start_time is None or self.frames < 2:
+            return 0.0
+        return (self.frames - 1) / (time.perf_counter() - self._start_time)
+
+    def send(self, frame: numpy.ndarray):
+        """
+        Args:
+            frame: uint8 R-G-B array
+        """
+        if self._start_time is None:
+            self._start_time = time.perf_counter()
+        self._send(frame)
+        self.frames += 1
+
+    def _send(self, frame: numpy.ndarray):
+        raise NotImplementedError()
+
+    def close(self):
+        """
+        Flush and free the resources used by the sink.
+        """
+        logger.debug(f"[{self.__class__.__name__}][close] {self.frames} frames sent.")
+
+
+class VirtualCameraSink(FrameSink):
+    """
+    Output to a virtual camera using pyvirtualcam.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        fps: float,
+        pace: bool = False,
+        print_fps: bool = False,
+        **kwargs,
+    ):
+        """
+        Args:
+            width:
+            height:
+            fps:
+            pace: if True sleep after each frame until it's time for the next one.
+                Not needed when the source is already paced (like a webcam).
+            print_fps: see ``pyvirtualcam.Camera``
+            kwargs: passed to ``pyvirtualcam.Camera``
+        """
+        super().__init__()
+        import pyvirtualcam
+
+        self.pace = pace
+        self.camera = pyvirtualcam.Camera(
+            width=width,
+            height=height,
+            fps=fps,
+            fmt=pyvirtualcam.PixelFormat.RGB,
+            print_fps=print_fps,
+            **kwargs,
+        )
+        logger.info(
+            f"[{self.__class__.__name__}] pyvirtualcam started: {self.camera.device} "
+            f"({self.camera.width}x{self.camera.height})@{self.camera.fps}fps)"
+        )
+
+    def _send(self, frame: numpy.ndarray):
+        self.camera.send(frame)
+        if self.pace:
+            self.camera.sleep_until_next_frame()
+
+    def close(self):
+        self.camera.close()
+        super().close()
+
+
+class ImageSequenceSink(FrameSink):
+    """
+    Write each frame to its own image file using ``OCIOexperiments.io``.
+    """
+
+    def __init__(
+        self,
+        export_path: Union[str, Path],
+        bitdepth: Union[numpy.float32, numpy.uint16, numpy.uint8] = numpy.uint8,
+        method: Literal["oiio", "cv2", "pillow"] = "pillow",
+        start: int = 0,
+    ):
+        """
+        Args:
+            export_path: path with a ``$FRAME`` token replaced by the frame number.
+            bitdepth: see ``OCIOexperiments.io.array_write``
+            method: see ``OCIOexperiments.io.array_write``
+            start: number of the first frame
+        """
+        super().__init__()
+        if FRAME_TOKEN not in str(export_path):
+            raise ValueError(f"export_path <{export_path}> has no {FRAME_TOKEN} token.")
+
+        self.export_path = str(export_path)
+        self.bitdepth = bitdepth
+        self.method = method
+        self.start = start
+        Path(self.export_path).parent.mkdir(parents=True, exist_ok=True)
+
+    def get_path(self, frame_number: int) -> Path:
+        return Path(self.export_path.replace(FRAME_TOKEN, str(frame_number)))
+
+    def _send(self, frame: numpy.ndarray):
+        from OCIOexperiments import io
+
+        array = frame.astype(numpy.float32)
+        array /= 255
+        io.array_write(
+            array,
+            self.get_path(self.start + self.frames),
+            self.bitdepth,
+            method=self.method,
+        )
+
+
+class VideoFileSink(FrameSink):
+    """
+    Encode frames to a video file with ``cv2.VideoWriter``.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        width: int,
+        height: int,
+        fps: float,
+        fourcc: str = "mp4v",
+    ):
+        """
+        Args:
+            path: output video file, the extension define the container.
+            width:
+            height:
+            fps:
+            fourcc: 4-character code of codec
+        """
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.writer = cv2.VideoWriter(
+            str(self.path),
+            cv2.VideoWriter_fourcc(*fourcc),
+            fps,
+            (width, height),
+        )
+        assert self.writer.isOpened(), f"Could not open video writer <{self.path}>"
+
+    def _send(self, frame: numpy.ndarray):
+        self.writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+
+    def close(self):
+        self.writer.release()
+        super().close()
+
+
+class FFmpegSink(FrameSink):
+    """
+    Pipe the raw frames to an ffmpeg subprocess over stdin, which encode them.
+
+    Unlike ``VideoFileSink`` any ffmpeg encoder and option can be used, like
+    libx264 with a constant quality.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        width: int,
+        height: int,
+        fps: float,
+        codec: str = "libx264",
+        pixel_format: str = "yuv420p",
+        options: Sequence[str] = ("-preset", "veryfast", "-crf", "18"),
+        ffmpeg: Optional[str] = None,
+        log_path: Optional[Union[str, Path]] = None,
+    ):
+        """
+        Args:
+            path: output video file, overwritten if it exists.
+            width:
+            height:
+            fps:
+            codec: ffmpeg encoder name
+            pixel_format: pixel format of the encoded video
+            options: additional ffmpeg output options
+            ffmpeg: path to the executable, default to ``c.FFMPEG``
+            log_path: file the ffmpeg output is appended to, discarded if None.
+        """
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.width = width
+        self.height = height
+
+        self.command: List[str] = [
+            ffmpeg or c.FFMPEG,
+            "-y",
+            "-loglevel",
+            "warning",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgb24",
+            "-s",
+            f"{width}x{height}",
+            "-r",
+            str(fps),
+            "-i",
+            "-",
+            "-an",
+            "-c:v",
+            codec,
+            "-pix_fmt",
+            pixel_format,
+            *options,
+            str(self.path),
+        ]
+        logger.debug(f"[{self.__class__.__name__}] {' '.join(self.command)}")
+
+        self._log: Optional[IO] = None
+        if log_path:
+            self._log = Path(log_path).open("ab")
+        self.process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=self._log or subprocess.DEVNULL,
+            stderr=subprocess.STDOUT if self._log else subprocess.DEVNULL,
+        )
+
+    def _send(self, frame: numpy.ndarray):
+        if frame.shape != (self.height, self.width, 3):
+            raise ValueError(
+                f"Frame of shape {frame.shape} doesn't match the video size "
+                f"{self.width}x{self.height}."
+            )
+        try:
+            self.process.stdin.write(numpy.ascontiguousarray(frame).data)
+        except BrokenPipeError:
+            raise RuntimeError(
+                f"ffmpeg exited with code {self.process.poll()} while writing "
+                f"<{self.path}>."
+            )
+
+    def close(self):
+        if self.process.stdin and not self.process.stdin.closed:
+            try:
+                self.process.stdin.close()
+            except BrokenPipeError:
+                pass
+        returncode = self.process.wait()
+        if self._log:
+            self._log.close()
+        if returncode != 0:
+            logger.error(
+                f"[{self.__class__.__name__}][close] ffmpeg exited with code "
+                f"{returncode} for <{self.path}>."
+            )
+        super().close()
+
+
+class RecorderSink(FrameSink):
+    """
+    Record the frames to video files, encoded on a background thread so slow disks
+    or encoders never stall the live output.
+
+    The recording can be split in segments of ``segment_duration`` seconds, only the
+    last ``max_segments`` files being kept, to record for hours.
+
+    Example::
+
+        recorder = RecorderSink("rec.$SEGMENT.mp4", 1280, 720, 30, segment_duration=600)
+        with PipelineRunner(camera, processor, recorder) as runner:
+            runner.wait()
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        width: int,
+        height: int,
+        fps: float,
+        backend: RecorderBackend = "cv2",
+        segment_duration: Optional[float] = None,
+        max_segments: Optional[int] = None,
+        queue_size: int = 60,
+        policy: DropPolicy = "drop-oldest",
+        **kwargs,
+    ):
+        """
+        Args:
+            path: output video file, with a ``$SEGMENT`` token replaced by the
+                segment number. Without one, the segment number is added before the
+                extension when segmenting.
+            width:
+            height:
+            fps:
+            backend: cv2: ``VideoFileSink``, ffmpeg: ``FFmpegSink``
+            segment_duration: start a new file every N seconds of video, None for a
+                single file.
+            max_segments: delete the oldest files to only keep this number of
+                segments, None to keep everything.
+            queue_size: number of frames waiting to be encoded
+            policy: what to do when the encoder can't keep up, see ``RingBuffer``.
+            kwargs: passed to the sink of the backend, like ``fourcc`` or ``codec``.
+        """
+        super().__init__()
+        if backend not in ("cv2", "ffmpeg"):
+            raise ValueError(f"Backend <{backend}> passed is not supported.")
+
+        path = str(path)
+        if segment_duration and SEGMENT_TOKEN not in path:
+            path = str(Path(path).with_suffix(f".{SEGMENT_TOKEN}{Path(path).suffix}"))
+
+        self.path = path
+        self.width = width
+        self.height = height
+        self.framerate = fps
+        self.backend: RecorderBackend = backend
+        self.segment_frames: Optional[int] = None
+        if segment_duration:
+            self.segment_frames = max(1, round(segment_duration * fps))
+        self.max_segments = max_segments
+        self.kwargs = kwargs
+
+        self.segments: List[Path] = []
+        """
+        files written so far, oldest first, without the deleted ones
+        """
+        self.dropped: int = 0
+
+        self._buffer = RingBuffer(queue_size, policy, name="recorder")
+        self._writer: Optional[FrameSink] = None
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"{c.ABR}.sinks.recorder",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {self.path} {self.backend} "
+            f"segments={len(self.segments)} dropped={self.dropped}>"
+        )
+
+    def get_path(self, segment: int) -> Path:
+        return Path(self.path.replace(SEGMENT_TOKEN, f"{segment:04}"))
+
+    def _open_segment(self, segment: int) -> FrameSink:
+
+        path = self.get_path(segment)
+        sink_class = FFmpegSink if self.backend == "ffmpeg" else VideoFileSink
+        writer = sink_class(
+            path, self.width, self.height, self.framerate, **self.kwargs
+        )
+        self.segments.append(path)
+
+        if self.max_segments and len(self.segments) > self.max_segments:
+            oldest = self.segments.pop(0)
+            oldest.unlink(missing_ok=True)
+            logger.debug(f"[{self.__class__.__name__}] removed <{oldest}>.")
+
+        logger.debug(f"[{self.__class__.__name__}] recording to <{path}>.")
+        return writer
+
+    def _run(self):
+
+        written = 0
+        try:
+            while True:
+                frame = self._buffer.get()
+                if frame is None:
+                    break
+
+                if self._writer is None or (
+                    self.segment_frames and written % self.segment_frames == 0
+                ):
+                    if self._writer is not None:
+                        self._writer.close()
+                    segment = written // (self.segment_frames or 1)
+                    self._writer = self._open_segment(segment)
+
+                self._writer.send(frame)
+                written += 1
+        except BaseException as error:
+            logger.exception(f"[{self.__class__.__name__}] recording failed: {error}")
+            self._error = error
+            self._buffer.close()
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+
+    def _send(self, frame: numpy.ndarray):
+        if self._error is not None:
+            raise RuntimeError(f"Recording to <{self.path}> failed.") from self._error
+        # the caller is free to reuse the frame once send returns
+        if self._buffer.put(frame.copy()) is not None:
+            self.dropped += 1
+
+    def close(self):
+        """
+        Encode the frames still queued and close the last file.
+        """
+        self._buffer.close()
+        self._thread.join()
+        logger.info(
+            f"[{self.__class__.__name__}][close] {self.frames - self.dropped} frames "
+            f"recorded in {len(self.segments)} files, {self.dropped} dropped."
+        )
+        super().close()
+
+
+class NullSink(FrameSink):
+    """
+    Discard frames, only count them. For benchmarking without any output device.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.bytes: int = 0
+
+    def _send(self, frame: numpy.ndarray):
+        self.bytes += frame.nbytes
@@ -1,24 +1,141 @@
 """
 
 """
-import argparse
+import collections
+import contextlib
 import logging
+import threading
 import time
 from dataclasses import dataclass
 from functools import cached_property
-from typing import Union
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Literal, Optional, Sequence, Tuple, Union
 
 import cv2
+import numpy
 
 from . import c
+from .capabilities import (
+    CapabilityCache,
+    fourcc_to_str,
+    get_accepted_properties,
+    get_device_key,
+)
 
 __all__ = [
+    "FrameSource",
+    "Pacer",
     "WebcamConfiguration",
     "Webcam",
+    "ImageSequenceSource",
+    "VideoFileSource",
+    "SyntheticSource",
+    "GrabbedFrame",
+    "FrameGrabber",
+    "FramePool",
 ]
 
 logger = logging.getLogger(f"{c.ABR}.sources")
 
+Pacing = Literal["realtime", "fast"]
+"""
+realtime: deliver frames at the source fps; fast: as fast as possible.
+"""
+
+GrabberPolicy = Literal["latest", "fifo"]
+"""
+latest: only keep the newest frame; fifo: keep every frame up to the queue size.
+"""
+
+
+class FrameSource:
+    """
+    Interface shared by every source of frames.
+
+    Frames are uint8 B-G-R arrays of shape (height, width, 3), like the ones
+    returned by ``cv2.VideoCapture.read()``.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    @property
+    def width(self) -> int:
+        raise NotImplementedError()
+
+    @property
+    def height(self) -> int:
+        raise NotImplementedError()
+
+    @property
+    def fps(self) -> float:
+        raise NotImplementedError()
+
+    def read(
+        self,
+        image: Optional[numpy.ndarray] = None,
+    ) -> Tuple[bool, Optional[numpy.ndarray]]:
+        """
+        Args:
+            image: if given, buffer to write the frame in, returned if it fits.
+
+        Returns:
+            (success, frame), success is False once the source is exhausted.
+        """
+        raise NotImplementedError()
+
+    def release(self):
+        """
+        Free the resources used by the source.
+        """
+        pass
+
+
+class Pacer:
+    """
+    Sleep between frames so they are delivered at a fixed rate.
+    """
+
+    def __init__(self, fps: float, pacing: Pacing = "realtime"):
+        if pacing not in ("realtime", "fast"):
+            raise ValueError(f"Pacing <{pacing}> passed is not supported.")
+        self.fps = fps
+        self.pacing = pacing
+        self._next_time: Optional[float] = None
+
+    def wait(self):
+        """
+        Block until it's time for the next frame.
+        """
+        if self.pacing == "fast" or not self.fps:
+            return
+
+        now = time.perf_counter()
+        if self._next_time is None or now - self._next_time > 1.0:
+            # first frame or way behind, restart the timeline instead of bursting
+            self._next_time = now
+        elif self._next_time > now:
+            time.sleep(self._next_time - now)
+
+        self._next_time += 1.0 / self.fps
+        return
+
+
+def _fit(
+    frame: numpy.ndarray,
+    image: Optional[numpy.ndarray],
+) -> numpy.ndarray:
+    """
+    Copy the frame in the given buffer if it fits, else return the frame.
+    """
+    if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+        numpy.copyto(image, frame)
+        return image
+    return frame
+
 
 @dataclass
 class WebcamConfiguration:
@@ -43,7 +160,8 @@ class WebcamConfiguration:
 
     fourcc: str = None
     """
-    4-character code of codec
+    4-character code of codec, like "MJPG". Converted to the integer code
+    ``cv2.CAP_PROP_FOURCC`` expects in ``properties``.
     """
 
     mode: str = None
@@ -56,6 +174,11 @@ class WebcamConfiguration:
     Set value -1 to fetch undecoded RAW video streams.
     """
 
+    backend: int = cv2.CAP_ANY
+    """
+    cv2.CAP_* api preference used to open the camera, like cv2.CAP_DSHOW.
+    """
+
     def __post_init__(self):
         # bug in OpenCV 4 where it needs an int
         if self.convert_rgb is not None:
@@ -70,7 +193,9 @@ class WebcamConfiguration:
             cv2.CAP_PROP_FRAME_HEIGHT: self.target_height,
             cv2.CAP_PROP_FPS: self.target_fps,
             cv2.CAP_PROP_CONVERT_RGB: self.convert_rgb,
-            cv2.CAP_PROP_FOURCC: self.fourcc,
+            cv2.CAP_PROP_FOURCC: (
+                cv2.VideoWriter_fourcc(*self.fourcc) if self.fourcc else None
+            ),
             cv2.CAP_PROP_MODE: self.mode,
             cv2.CAP_PROP_FORMAT: self.format,
         }
@@ -78,22 +203,71 @@ class WebcamConfiguration:
         return out
 
 
-class Webcam(cv2.VideoCapture):
-    def __init__(self, configuration: WebcamConfiguration):
+class Webcam(cv2.VideoCapture, FrameSource):
+    def __init__(
+        self,
+        configuration: WebcamConfiguration,
+        cache: Union[CapabilityCache, bool, None] = None,
+    ):
+        """
+        Args:
+            configuration:
+            cache: configurations known to be accepted by the device. When the
+                configuration was already accepted, the camera is opened with it in
+                one step which is much faster. Default to ``CapabilityCache()``,
+                pass False to disable.
+        """
 
         _stime = time.time()
 
         self.config = configuration
-
-        logger.info(
-            f"[{self.__class__.__name__}][__init__] Started, "
-            f"this can take half a minute ..."
+        self.cache: Optional[CapabilityCache] = (
+            CapabilityCache() if cache is None else cache or None
         )
-
-        super().__init__(configuration.camera)
-        assert self.isOpened(), f"Could not open video source <{configuration.name}>"
-
-        self.build()
+        self.device = get_device_key(configuration.camera, configuration.backend)
+
+        known = None
+        rejected = False
+        if self.cache:
+            known = self.cache.get_configuration(self.device, configuration.properties)
+
+        if known:
+            logger.info(
+                f"[{self.__class__.__name__}][__init__] Started with known "
+                f"configuration for <{self.device}>."
+            )
+            params = []
+            for key, value in known.items():
+                params += [int(key), int(round(value))]
+            super().__init__(configuration.camera, configuration.backend, params)
+            if not self.isOpened():
+                logger.warning(
+                    f"[{self.__class__.__name__}][__init__] known configuration "
+                    f"rejected by <{self.device}>, removing it from the cache."
+                )
+                self.cache.remove_configuration(self.device, configuration.properties)
+                known = None
+                rejected = True
+
+        if not known:
+            logger.info(
+                f"[{self.__class__.__name__}][__init__] Started, "
+                f"this can take half a minute ..."
+            )
+            if rejected:
+                # reopen without the rejected configuration
+                self.release()
+                self.open(configuration.camera, configuration.backend)
+            else:
+                super().__init__(configuration.camera, configuration.backend)
+            assert self.isOpened(), f"Could not open video source <{configuration.name}>"
+            self.build()
+
+        accepted = self.verify()
+        if self.cache and accepted != known:
+            self.cache.set_configuration(
+                self.device, configuration.properties, accepted
+            )
 
         logger.debug(
             f"[{self.__class__.__name__}][__init__] VideoCapture instance created in "
@@ -115,6 +289,29 @@ class Webcam(cv2.VideoCapture):
 
         return
 
+    def verify(self) -> Dict[int, float]:
+        """
+        Log the properties the driver didn't accept as requested.
+
+        Returns:
+            actual value of each property of the configuration
+        """
+        accepted = get_accepted_properties(self, self.config.properties)
+        for key, value in self.config.properties.items():
+            if key == cv2.CAP_PROP_FOURCC:
+                if int(accepted[key]) == value:
+                    continue
+                value, actual = fourcc_to_str(value), fourcc_to_str(accepted[key])
+            elif abs(accepted[key] - value) > 0.01:
+                actual = accepted[key]
+            else:
+                continue
+            logger.warning(
+                f"[{self.__class__.__name__}][verify] property {key} requested "
+                f"as {value} but is {actual}."
+            )
+        return accepted
+
     @property
     def width(self) -> int:
         return int(self.get(cv2.CAP_PROP_FRAME_WIDTH))
@@ -127,18 +324,587 @@ class Webcam(cv2.VideoCapture):
     def fps(self) -> float:
         return float(self.get(cv2.CAP_PROP_FPS))
 
+    def get_grabber(self, **kwargs) -> "FrameGrabber":
+        """
+        Returns:
+            started grabber reading this webcam on a background thread,
+            kwargs are passed to ``FrameGrabber``.
+        """
+        grabber = FrameGrabber(self, **kwargs)
+        grabber.start()
+        return grabber
+
+
+class ImageSequenceSource(FrameSource):
+    """
+    Frames read from image files, using ``OCIOexperiments.io``.
+    """
+
+    def __init__(
+        self,
+        paths: Sequence[Path],
+        fps: float = 30.0,
+        pacing: Pacing = "realtime",
+        loop: bool = False,
+        preload: bool = False,
+        method: Literal["oiio", "cv2", "pillow"] = "cv2",
+    ):
+        """
+        Args:
+            paths: image files in the order to deliver them
+            fps: rate at which frames are delivered in realtime pacing
+            pacing: see ``Pacer``
+            loop: restart from the first image once the last one was delivered
+            preload: decode every image at creation so reading cost nothing,
+                useful for benchmarking.
+            method: see ``OCIOexperiments.io.array_read``
+        """
+        if not paths:
+            raise ValueError("No image paths given.")
+
+        self.paths = [Path(path) for path in paths]
+        self.loop = loop
+        self.method = method
+        self.pacer = Pacer(fps, pacing)
+        self._index = 0
+        self._cache = {}
+
+        first = self._load(0)
+        self._shape = first.shape
+        if preload:
+            for index in range(len(self.paths)):
+                self._cache[index] = self._load(index)
+        return
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {len(self.paths)} images "
+            f"({self.width}x{self.height})@{self.fps}fps>"
+        )
+
+    @classmethod
+    def from_pattern(cls, pattern: Union[str, Path], **kwargs):
+        """
+        Args:
+            pattern: glob pattern like ``dir/webcam.*.tif``
+            kwargs: see ``__init__``
+        """
+        pattern = Path(pattern)
+        return cls(sorted(pattern.parent.glob(pattern.name)), **kwargs)
+
+    def _load(self, index: int) -> numpy.ndarray:
+
+        cached = self._cache.get(index)
+        if cached is not None:
+            return cached
+
+        from OCIOexperiments import io
+
+        array = io.array_read(self.paths[index], method=self.method)
+        if array.dtype != numpy.uint8:
+            array = numpy.clip(array * 255, 0, 255).astype(numpy.uint8)
+        return cv2.cvtColor(array, cv2.COLOR_RGB2BGR)
+
+    @property
+    def width(self) -> int:
+        return self._shape[1]
+
+    @property
+    def height(self) -> int:
+        return self._shape[0]
+
+    @property
+    def fps(self) -> float:
+        return self.pacer.fps
+
+    def read(
+        self,
+        image: Optional[numpy.ndarray] = None,
+    ) -> Tuple[bool, Optional[numpy.ndarray]]:
+
+        if self._index >= len(self.paths):
+            if not self.loop:
+                return False, None
+            self._index = 0
+
+        frame = self._load(self._index)
+        self._index += 1
+        self.pacer.wait()
+        return True, _fit(frame, image)
+
+    def release(self):
+        self._cache.clear()
+
+
+class VideoFileSource(FrameSource):
+    """
+    Frames decoded from a video file with ``cv2.VideoCapture``.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        pacing: Pacing = "realtime",
+        loop: bool = False,
+        fps: Optional[float] = None,
+    ):
+        """
+        Args:
+            path: video file path
+            pacing: see ``Pacer``
+            loop: restart from the beginning at the end of the video
+            fps: override the file frame rate for realtime pacing
+        """
+        self.path = Path(path)
+        self.loop = loop
+        self._capture = cv2.VideoCapture(str(self.path))
+        assert self._capture.isOpened(), f"Could not open video file <{self.path}>"
+
+        self.pacer = Pacer(fps or self._capture.get(cv2.CAP_PROP_FPS), pacing)
+        return
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {self.path.name} "
+            f"({self.width}x{self.height})@{self.fps}fps>"
+        )
+
+    @property
+    def width(self) -> int:
+        return int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+
+    @property
+    def height(self) -> int:
+        return int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    @property
+    def fps(self) -> float:
+        return self.pacer.fps
+
+    def read(
+        self,
+        image: Optional[numpy.ndarray] = None,
+    ) -> Tuple[bool, Optional[numpy.ndarray]]:
+
+        ret, frame = self._capture.read(image=image)
+        if not ret and self.loop:
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self._capture.read(image=image)
+
+        if ret:
+            self.pacer.wait()
+        return ret, frame
 
-def get_configuration_cli() -> argparse.Namespace:
+    def release(self):
+        self._capture.release()
+
+
+class SyntheticSource(FrameSource):
     """
-    TODO refactor this.
+    Deterministic generated frames: colour bars over a ramp scrolling horizontally
+    by <speed> pixels per frame. Frame n is always the same image.
     """
 
-    parser = argparse.ArgumentParser()
-    parser.add_argument(
-        "--camera", type=int, default=0, help="ID of webcam device (default: 0)"
-    )
-    parser.add_argument(
-        "--display_fps", action="store_true", help="output fps every second"
-    )
-    parser.add_argument("--filter", choices=["shake", "none"], default="shake")
-    return parser.parse_args()
+    def __init__(
+        self,
+        width: int = 1280,
+        height: int = 720,
+        fps: float = 30.0,
+        pacing: Pacing = "realtime",
+        frames: Optional[int] = None,
+        speed: int = 4,
+    ):
+        """
+        Args:
+            width:
+            height:
+            fps: rate at which frames are delivered in realtime pacing
+            pacing: see ``Pacer``
+            frames: number of frames before the source is exhausted, None for infinite
+            speed: horizontal scroll in pixels per frame
+        """
+        self._width = width
+        self._height = height
+        self.frames = frames
+        self.speed = speed
+        self.pacer = Pacer(fps, pacing)
+        self.index = 0
+
+        # pattern twice as wide so any scrolled window is a contiguous slice
+        ramp = numpy.linspace(0, 255, width, dtype=numpy.float32)
+        bars = numpy.asarray(
+            [
+                [255, 255, 255],
+                [0, 255, 255],
+                [255, 255, 0],
+                [0, 255, 0],
+                [255, 0, 255],
+                [0, 0, 255],
+                [255, 0, 0],
+                [0, 0, 0],
+            ],
+            dtype=numpy.float32,
+        )
+        pattern = numpy.empty((height, width, 3), dtype=numpy.float32)
+        bars_rows = height * 2 // 3
+        bar_index = numpy.arange(width) * len(bars) // width
+        pattern[:bars_rows] = bars[bar_index]
+        pattern[bars_rows:] = ramp[:, numpy.newaxis]
+        self._pattern = numpy.concatenate((pattern, pattern), axis=1).astype(
+            numpy.uint8
+        )
+        return
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} ({self.width}x{self.height})@{self.fps}fps "
+            f"frames={self.frames}>"
+        )
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    @property
+    def fps(self) -> float:
+        return self.pacer.fps
+
+    def get_frame(self, index: int) -> numpy.ndarray:
+        """
+        Returns:
+            read-only view on the frame at the given index.
+        """
+        offset = (index * self.speed) % self.width
+        return self._pattern[:, offset : offset + self.width]
+
+    def read(
+        self,
+        image: Optional[numpy.ndarray] = None,
+    ) -> Tuple[bool, Optional[numpy.ndarray]]:
+
+        if self.frames is not None and self.index >= self.frames:
+            return False, None
+
+        frame = self.get_frame(self.index)
+        if image is None or image.shape != frame.shape:
+            image = numpy.empty(frame.shape, dtype=numpy.uint8)
+        numpy.copyto(image, frame)
+
+        self.index += 1
+        self.pacer.wait()
+        return True, image
+
+
+@dataclass
+class GrabbedFrame:
+    image: numpy.ndarray
+    timestamp: float
+    """
+    ``time.perf_counter()`` value when the frame was grabbed
+    """
+    sequence: int
+    """
+    number of the frame since the grabber started, gaps are dropped frames
+    """
+
+
+class FrameGrabber(FrameSource):
+    """
+    Read a source continuously on a background thread, so the frames handed out are
+    never older than the queue.
+
+    With the ``latest`` policy ``read`` always return the newest frame, waiting for a
+    new one if it was already read: the latency stay of about one frame however slow
+    the consumer is. With the ``fifo`` policy every frame is kept, up to
+    ``queue_size`` (the oldest are dropped past it).
+
+    Sources with ``grab()``/``retrieve()`` (like ``cv2.VideoCapture``) are grabbed
+    as soon as the driver deliver a frame, others are read with ``read()``.
+
+    Example::
+
+        with camera.get_grabber(policy="latest") as grabber:
+            while True:
+                grabbed = grabber.read_frame()
+                ...
+    """
+
+    def __init__(
+        self,
+        source: Union[cv2.VideoCapture, FrameSource],
+        policy: GrabberPolicy = "latest",
+        queue_size: int = 8,
+        release_source: bool = True,
+    ):
+        """
+        Args:
+            source: capture to read from, must only be used by the grabber once
+                started.
+            policy: see class docstring
+            queue_size: number of frames kept with the fifo policy
+            release_source: if True, ``release`` also release the source.
+        """
+        if policy not in ("latest", "fifo"):
+            raise ValueError(f"Policy <{policy}> passed is not supported.")
+
+        self.source = source
+        self.policy = policy
+        self.release_source = release_source
+        self.grabbed: int = 0
+        self.dropped: int = 0
+        """
+        frames replaced by a newer one before being read
+        """
+
+        self._frames: Deque[GrabbedFrame] = collections.deque(
+            maxlen=1 if policy == "latest" else queue_size
+        )
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._exhausted = False
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        self._use_grab = hasattr(source, "grab") and hasattr(source, "retrieve")
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {self.policy} grabbed={self.grabbed} "
+            f"dropped={self.dropped} source={self.source!r}>"
+        )
+
+    def __enter__(self):
+        if self._thread is None:
+            self.start()
+        return self
+
+    @property
+    def width(self) -> int:
+        return self.source.width
+
+    @property
+    def height(self) -> int:
+        return self.source.height
+
+    @property
+    def fps(self) -> float:
+        return self.source.fps
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _grab(self) -> Tuple[bool, Optional[numpy.ndarray], float]:
+        if self._use_grab:
+            if not self.source.grab():
+                return False, None, 0.0
+            timestamp = time.perf_counter()
+            ret, image = self.source.retrieve()
+            return ret, image, timestamp
+
+        ret, image = self.source.read()
+        return ret, image, time.perf_counter()
+
+    def _run(self):
+        try:
+            while not self._stop_event.is_set():
+                ret, image, timestamp = self._grab()
+                if not ret:
+                    logger.info(f"[{self.__class__.__name__}] end of stream.")
+                    break
+
+                frame = GrabbedFrame(image, timestamp, self.grabbed)
+                with self._condition:
+                    if len(self._frames) == self._frames.maxlen:
+                        self.dropped += 1
+                    self._frames.append(frame)
+                    self.grabbed += 1
+                    self._condition.notify_all()
+        except BaseException as error:
+            logger.exception(f"[{self.__class__.__name__}] grab failed: {error}")
+            self._error = error
+        finally:
+            with self._condition:
+                self._exhausted = True
+                self._condition.notify_all()
+
+    def start(self):
+        """
+        Start grabbing frames on the background thread.
+        """
+        if self.running:
+            raise RuntimeError(f"{self.__class__.__name__} is already running.")
+        self._stop_event.clear()
+        self._exhausted = False
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"{c.ABR}.sources.grabber",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def read_frame(self, timeout: Optional[float] = None) -> Optional[GrabbedFrame]:
+        """
+        Args:
+            timeout: maximum time to wait for a frame, in seconds.
+
+        Returns:
+            next frame to process, None on timeout or once the source is exhausted.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._frames or self._exhausted,
+                timeout=timeout,
+            )
+            if self._error is not None:
+                error, self._error = self._error, None
+                raise error
+            if not self._frames:
+                return None
+            return self._frames.popleft()
+
+    def read(
+        self,
+        image: Optional[numpy.ndarray] = None,
+    ) -> Tuple[bool, Optional[numpy.ndarray]]:
+        frame = self.read_frame()
+        if frame is None:
+            return False, None
+        return True, _fit(frame.image, image)
+
+    def release(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.release_source:
+            self.source.release()
+
+
+class FramePool:
+    """
+    Fixed set of preallocated frame buffers.
+
+    Frames are read straight into a free buffer with ``read()``; stages borrow
+    buffers and give them back with ``release()`` once done, so in steady state no
+    frame array is allocated.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        shape: Tuple[int, ...],
+        dtype: numpy.dtype = numpy.uint8,
+    ):
+        """
+        Args:
+            size: number of buffers
+            shape: shape of each buffer, usually (height, width, 3)
+            dtype: type of each buffer
+        """
+        if size < 1:
+            raise ValueError(f"FramePool size must be at least 1, got {size}.")
+
+        self.shape = tuple(shape)
+        self.dtype = numpy.dtype(dtype)
+        self._buffers: List[numpy.ndarray] = [
+            numpy.empty(self.shape, dtype=self.dtype) for _ in range(size)
+        ]
+        self._ids = {id(buffer) for buffer in self._buffers}
+        self._free: List[numpy.ndarray] = list(self._buffers)
+        self._condition = threading.Condition()
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {self.available}/{self.size} "
+            f"{self.shape}|{self.dtype}>"
+        )
+
+    @classmethod
+    def from_source(cls, source: FrameSource, size: int) -> "FramePool":
+        """
+        Pool of uint8 B-G-R frames of the source current resolution.
+        """
+        return cls(size, (source.height, source.width, 3), dtype=numpy.uint8)
+
+    @property
+    def size(self) -> int:
+        return len(self._buffers)
+
+    @property
+    def available(self) -> int:
+        return len(self._free)
+
+    def acquire(self, timeout: Optional[float] = None) -> numpy.ndarray:
+        """
+        Borrow a free buffer, waiting for one to be released if needed.
+
+        Raises:
+            TimeoutError: if no buffer was released in time.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._free, timeout=timeout):
+                raise TimeoutError(f"No free buffer in {self} after {timeout}s.")
+            return self._free.pop()
+
+    def release(self, buffer: numpy.ndarray):
+        """
+        Give back a buffer obtained with ``acquire`` or ``read``.
+        """
+        if id(buffer) not in self._ids:
+            raise ValueError(f"Buffer {buffer.shape} does not belong to {self}.")
+        with self._condition:
+            self._free.append(buffer)
+            self._condition.notify()
+
+    def owns(self, buffer: Optional[numpy.ndarray]) -> bool:
+        return buffer is not None and id(buffer) in self._ids
+
+    @contextlib.contextmanager
+    def borrow(self, timeout: Optional[float] = None) -> Iterator[numpy.ndarray]:
+        """
+        Context manager acquiring a buffer and releasing it on exit.
+        """
+        buffer = self.acquire(timeout)
+        try:
+            yield buffer
+        finally:
+            self.release(buffer)
+
+    def read(
+        self,
+        reader: cv2.VideoCapture,
+        timeout: Optional[float] = None,
+    ) -> Tuple[bool, Optional[numpy.ndarray]]:
+        """
+        Read a frame in place into a free buffer.
+
+        Args:
+            reader: any object with a ``read(image=buffer)`` method, like a
+                ``FrameSource``.
+            timeout: see ``acquire``
+
+        Returns:
+            (success, buffer). The buffer must be released by the caller.
+        """
+        buffer = self.acquire(timeout)
+        try:
+            ret, image = reader.read(image=buffer)
+        except BaseException:
+            self.release(buffer)
+            raise
+
+        if not ret:
+            self.release(buffer)
+            return False, None
+
+        if image is not buffer:
+            # the reader had to allocate a new array
+            self.release(buffer)
+            raise ValueError(
+                f"Frame {image.shape}|{image.dtype} read from {reader} doesn't fit "
+                f"in {self}."
+            )
+        return True, buffer
@@ -0,0 +1,207 @@
+"""
+Incremental processing of mostly static scenes.
+
+The frame is split in tiles, only the tiles which changed since they were last
+processed go through the processor again, the others reuse the cached output.
+Only valid for processors working per-pixel (colour transforms), not for
+processors with spatial operations like blur or resize.
+"""
+import logging
+from typing import List, Literal, Optional, Tuple
+
+import cv2
+import numpy
+
+from . import c
+from .processors import FrameProcessor, Reframe
+
+__all__ = [
+    "TileCache",
+]
+
+logger = logging.getLogger(f"{c.ABR}.tiles")
+
+ChangeMetric = Literal["mean", "max"]
+
+
+class TileCache:
+    """
+    ``FrameProcessor`` reprocessing only the tiles that changed.
+
+    A tile is reprocessed when the ``metric`` of the absolute difference between
+    its uint8 pixels and the pixels it was last processed from exceed
+    ``threshold`` (in code values). Comparing against the last processed pixels,
+    instead of the previous frame, avoids slow changes from never being picked up.
+
+    The processor must return frames of the same size as its input: give the
+    ``Reframe`` to the cache instead of the processor, it's applied before the tiles.
+
+    Example::
+
+        processor = TileCache(
+            get_colortransform_processor(transform),
+            reframe=Reframe(size=(1280, 720)),
+        )
+        ...
+        print(processor.report())
+    """
+
+    def __init__(
+        self,
+        processor: FrameProcessor,
+        tile_size: int = 64,
+        threshold: float = 2.0,
+        metric: ChangeMetric = "mean",
+        refresh_interval: Optional[int] = 300,
+        full_frame_ratio: float = 0.6,
+        reframe: Optional[Reframe] = None,
+    ):
+        """
+        Args:
+            processor: per-pixel processor to cache, returning a frame of the same
+                width and height as its input.
+            tile_size: width and height of the tiles in pixels
+            threshold: minimum change for a tile to be reprocessed, in code values
+            metric: mean: average change of the tile, cheap noise rejection;
+                max: largest change of any pixel, never miss small details.
+            refresh_interval: reprocess the full frame every N frames so errors
+                below the threshold don't stay forever. None to disable.
+            full_frame_ratio: above this ratio of changed tiles, the full frame is
+                processed at once which is cheaper than many tiles.
+            reframe: if given, crop/resize the frame before it's split in tiles.
+        """
+        if metric not in ("mean", "max"):
+            raise ValueError(f"Metric <{metric}> passed is not supported.")
+
+        self.processor = processor
+        self.tile_size = tile_size
+        self.threshold = threshold
+        self.metric: ChangeMetric = metric
+        self.refresh_interval = refresh_interval
+        self.full_frame_ratio = full_frame_ratio
+        self.reframe = reframe
+
+        self.frames: int = 0
+        self.hits: int = 0
+        """
+        number of tiles reused from the cache
+        """
+        self.misses: int = 0
+        """
+        number of tiles processed
+        """
+
+        self._reference: Optional[numpy.ndarray] = None
+        """
+        input pixels each cached tile was processed from
+        """
+        self._output: Optional[numpy.ndarray] = None
+        self._rows: List[int] = []
+        self._columns: List[int] = []
+
+        processor_name = getattr(processor, "__name__", "processor")
+        self.__name__ = f"{self.__class__.__name__}[{processor_name}]"
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} tile={self.tile_size} "
+            f"threshold={self.threshold} hit_rate={self.hit_rate:.1%}>"
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Ratio of tiles reused from the cache since the start.
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self) -> str:
+        return (
+            f"{self.frames} frames, {self.hits}/{self.hits + self.misses} tiles "
+            f"reused (hit rate {self.hit_rate:.1%})"
+        )
+
+    def reset(self):
+        """
+        Forget the cache, next frame is fully processed.
+        """
+        self._reference = None
+        self._output = None
+
+    def _process_full(self, frame: numpy.ndarray) -> numpy.ndarray:
+
+        output = self.processor(frame)
+        if output.shape[:2] != frame.shape[:2]:
+            raise ValueError(
+                f"{self.__class__.__name__} processor must keep the frame size, got "
+                f"{frame.shape[:2]} -> {output.shape[:2]}. Pass the Reframe to the "
+                f"{self.__class__.__name__} instead of the processor."
+            )
+        self._reference = frame.copy()
+        self._output = output.copy()
+        self.misses += len(self._rows) * len(self._columns)
+        return output
+
+    def get_changed_tiles(self, frame: numpy.ndarray) -> numpy.ndarray:
+        """
+        Returns:
+            boolean array of shape (tile rows, tile columns), True for the tiles
+            that changed more than the threshold.
+        """
+        diff = cv2.absdiff(frame, self._reference)
+        if self.metric == "max":
+            reduced = numpy.maximum.reduceat(diff, self._rows, axis=0)
+            reduced = numpy.maximum.reduceat(reduced, self._columns, axis=1)
+            return reduced.max(axis=-1) > self.threshold
+
+        reduced = numpy.add.reduceat(diff, self._rows, axis=0, dtype=numpy.uint32)
+        reduced = numpy.add.reduceat(reduced, self._columns, axis=1)
+        heights = numpy.diff(self._rows + [frame.shape[0]])
+        widths = numpy.diff(self._columns + [frame.shape[1]])
+        area = heights[:, numpy.newaxis] * widths[numpy.newaxis, :] * frame.shape[2]
+        return reduced.sum(axis=-1) > self.threshold * area
+
+    def _get_runs(self, changed_row: numpy.ndarray) -> List[Tuple[int, int]]:
+        """
+        Returns:
+            (first, last + 1) column indexes of each run of consecutive changed tiles
+        """
+        padded = numpy.concatenate(([False], changed_row, [False]))
+        edges = numpy.flatnonzero(padded[1:] != padded[:-1])
+        return list(zip(edges[0::2], edges[1::2]))
+
+    def __call__(self, frame: numpy.ndarray) -> numpy.ndarray:
+
+        if self.reframe is not None:
+            frame = self.reframe(frame)
+        height, width = frame.shape[:2]
+        self.frames += 1
+
+        if self._reference is None or self._reference.shape != frame.shape:
+            self._rows = list(range(0, height, self.tile_size))
+            self._columns = list(range(0, width, self.tile_size))
+            return self._process_full(frame)
+
+        if self.refresh_interval and self.frames % self.refresh_interval == 0:
+            return self._process_full(frame)
+
+        changed = self.get_changed_tiles(frame)
+        changed_count = int(changed.sum())
+        if changed_count > self.full_frame_ratio * changed.size:
+            return self._process_full(frame)
+
+        for row_index, row_start in enumerate(self._rows):
+            row_end = row_start + self.tile_size
+            # consecutive tiles are processed at once
+            for first, last in self._get_runs(changed[row_index]):
+                column_start = self._columns[first]
+                column_end = column_start + self.tile_size * (last - first)
+                region = (slice(row_start, row_end), slice(column_start, column_end))
+                self._output[region] = self.processor(frame[region])
+                self._reference[region] = frame[region]
+
+        self.misses += changed_count
+        self.hits += changed.size - changed_count
+        # the cache is updated in place on the next frame
+        return self._output.copy()
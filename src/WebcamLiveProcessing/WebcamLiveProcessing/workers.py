@@ -0,0 +1,242 @@
+"""
+Distribute the colour transform of live frames over a pool of worker processes.
+
+Frames are exchanged through ``multiprocessing.shared_memory`` blocks created once:
+only the slot index and the rows to process are sent to the workers, pixel data is
+never pickled.
+"""
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Literal, Optional, Tuple, Union
+
+import numpy
+
+from . import c
+from .processors import ColorTransform, get_colortransform_processor
+
+__all__ = [
+    "SharedMemoryProcessor",
+]
+
+logger = logging.getLogger(f"{c.ABR}.workers")
+
+ParallelMode = Literal["frame", "stripe"]
+
+_WORKER_STATE: dict = {}
+"""
+Shared memory blocks, arrays and processor attached once per worker process by
+``_worker_initialize``.
+"""
+
+
+def _worker_initialize(
+    input_name: str,
+    output_name: str,
+    shape: Tuple[int, ...],
+    transform: Union[str, ColorTransform],
+):
+    """
+    Attach the shared memory blocks and build the processor once for this worker.
+    """
+    input_memory = SharedMemory(name=input_name)
+    output_memory = SharedMemory(name=output_name)
+
+    if isinstance(transform, str):
+        from OCIOexperiments import batch
+
+        transform = batch.get_transform(transform)
+
+    # processors are cached, calling the transform once build them.
+    transform(numpy.zeros((1, 1, 3), dtype=numpy.float32))
+
+    _WORKER_STATE.update(
+        input_memory=input_memory,
+        output_memory=output_memory,
+        input=numpy.ndarray(shape, dtype=numpy.uint8, buffer=input_memory.buf),
+        output=numpy.ndarray(shape, dtype=numpy.uint8, buffer=output_memory.buf),
+        processor=get_colortransform_processor(transform),
+    )
+    logger.debug(f"[_worker_initialize] pid={os.getpid()} ready.")
+    return
+
+
+def _worker_process(slot: int, start: int, end: int):
+    """
+    Process the rows [start:end] of the given slot from the input to the output block.
+    """
+    frame = _WORKER_STATE["input"][slot, start:end]
+    _WORKER_STATE["output"][slot, start:end] = _WORKER_STATE["processor"](frame)
+    return
+
+
+@dataclass
+class Ticket:
+    """
+    Frame submitted to the workers, to pass to ``collect``.
+    """
+
+    slot: int
+    futures: List[Future]
+
+    def done(self) -> bool:
+        return all(future.done() for future in self.futures)
+
+
+class SharedMemoryProcessor:
+    """
+    ``FrameProcessor`` running the colour transform in worker processes.
+
+    - ``frame`` mode: each frame is processed by a single worker, up to ``slots``
+      frames are processed at the same time. Best throughput, but it only helps when
+      several frames are in flight: use it with a ``PipelineRunner`` which keep
+      ``slots`` frames in flight and output them in order.
+    - ``stripe`` mode: each frame is split in horizontal stripes processed by all
+      the workers. Lower latency, also helps when called directly.
+
+    Example::
+
+        with SharedMemoryProcessor("agxc.native_look_1", (720, 1280, 3)) as processor:
+            with PipelineRunner(camera, processor, sink) as runner:
+                runner.wait()
+    """
+
+    def __init__(
+        self,
+        transform: Union[str, ColorTransform],
+        shape: Tuple[int, ...],
+        workers: Optional[int] = None,
+        mode: ParallelMode = "frame",
+        slots: Optional[int] = None,
+    ):
+        """
+        Args:
+            transform: name in ``OCIOexperiments.batch.TRANSFORMS`` or a picklable
+                (module-level) colour transform function, see ``processors``.
+            shape: (height, width, 3) of the uint8 frames to process
+            workers: number of processes, default to the number of cores
+            mode: see class docstring, can be changed at any time with ``mode``.
+            slots: number of frames that can be in flight at the same time,
+                default to the number of workers.
+        """
+        if mode not in ("frame", "stripe"):
+            raise ValueError(f"Mode <{mode}> passed is not supported.")
+
+        from OCIOexperiments import parallel
+
+        self.shape = tuple(shape)
+        self.workers = workers or parallel.get_default_workers()
+        self.mode: ParallelMode = mode
+        self.slots = slots or self.workers
+        self._stripes = parallel.get_stripes(self.shape[0], self.workers)
+
+        size = int(numpy.prod(self.shape)) * self.slots
+        self._input_memory = SharedMemory(create=True, size=size)
+        self._output_memory = SharedMemory(create=True, size=size)
+        self._input = numpy.ndarray(
+            (self.slots,) + self.shape, dtype=numpy.uint8, buffer=self._input_memory.buf
+        )
+        self._output = numpy.ndarray(
+            (self.slots,) + self.shape,
+            dtype=numpy.uint8,
+            buffer=self._output_memory.buf,
+        )
+
+        self._free_slots: "queue.Queue[int]" = queue.Queue()
+        for slot in range(self.slots):
+            self._free_slots.put(slot)
+
+        _stime = time.perf_counter()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_worker_initialize,
+            initargs=(
+                self._input_memory.name,
+                self._output_memory.name,
+                self._input.shape,
+                transform,
+            ),
+        )
+        # start every worker now instead of on the first frames
+        wait(
+            [self._executor.submit(time.sleep, 0.1) for _ in range(self.workers)]
+        )
+        logger.info(
+            f"[{self.__class__.__name__}] {self.workers} workers started in "
+            f"{time.perf_counter() - _stime:.2f}s ({self.slots} slots, {mode} mode)."
+        )
+
+        self.__name__ = f"{self.__class__.__name__}[{transform}]"
+
+    def __enter__(self) -> "SharedMemoryProcessor":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __call__(self, frame: numpy.ndarray) -> numpy.ndarray:
+        return self.collect(self.submit(frame))
+
+    def submit(self, frame: numpy.ndarray, timeout: Optional[float] = None) -> Ticket:
+        """
+        Copy the frame to a free slot and start processing it.
+
+        Block until a slot is free, ``collect`` free the slots.
+
+        Args:
+            frame: uint8 B-G-R frame of the shape given at init
+            timeout: maximum time to wait for a free slot, in seconds.
+        """
+        if frame.shape != self.shape:
+            raise ValueError(
+                f"Frame of shape {frame.shape} doesn't match the shape of the "
+                f"shared buffers {self.shape}."
+            )
+        try:
+            slot = self._free_slots.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No free slot after {timeout}s.")
+
+        numpy.copyto(self._input[slot], frame)
+        if self.mode == "stripe":
+            stripes = self._stripes
+        else:
+            stripes = [slice(0, self.shape[0])]
+        futures = [
+            self._executor.submit(_worker_process, slot, stripe.start, stripe.stop)
+            for stripe in stripes
+        ]
+        return Ticket(slot=slot, futures=futures)
+
+    def collect(self, ticket: Ticket) -> numpy.ndarray:
+        """
+        Wait for the submitted frame to be processed and free its slot.
+
+        Returns:
+            uint8 R-G-B processed frame
+        """
+        try:
+            for future in ticket.futures:
+                # raise the worker exception if any
+                future.result()
+            return self._output[ticket.slot].copy()
+        finally:
+            self._free_slots.put(ticket.slot)
+
+    def close(self):
+        """
+        Stop the workers and free the shared memory.
+        """
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        # arrays must not reference the blocks anymore for them to be closed
+        self._input = self._output = None
+        for memory in (self._input_memory, self._output_memory):
+            memory.close()
+            memory.unlink()
+        logger.debug(f"[{self.__class__.__name__}][close] closed.")
@@ -3,7 +3,7 @@
 """
 import logging
 import sys
-from typing import List, Literal
+from typing import List, Literal, Optional, Tuple
 
 import cv2
 import numpy
@@ -47,24 +47,64 @@ setup_logging(logging.DEBUG, loggers=[wlp.c.ABR, ocex.c.ABR])
 """
 
 
-def livefeed_agxc(camera: wlp.Webcam, method: Literal["ocio", "native"], debug=False):
+def livefeed_agxc(
+    camera: wlp.Webcam,
+    method: Literal["ocio", "native", "adaptive"],
+    debug=False,
+    output_size: Optional[Tuple[int, int]] = None,
+    roi: Optional[Tuple[int, int, int, int]] = None,
+    incremental: bool = False,
+):
     """
     VirtualCamera stream with AgX
 
     Args:
         camera:
-        method: ocio is faster than native
+        method: ocio is faster than native, adaptive switch between ocio and
+            cheaper variants of native to hold the camera framerate.
         debug: if true display per-frame info like fps
+        output_size: (width, height) of the virtual camera, the frame is resized
+            before the colour transform. Default to the camera size.
+        roi: (x, y, width, height) region of the camera frame to keep
+        incremental: only recompute the tiles of the frame that changed, for
+            static scenes. Not used with the adaptive method.
     """
 
+    reframe = None
+    if output_size or roi:
+        reframe = wlp.processors.Reframe(roi=roi, size=output_size)
+    width, height = camera.width, camera.height
+    if reframe:
+        width, height = reframe.get_output_size(width, height)
+
+    # the tile cache needs a processor keeping the frame size, it reframes itself
+    tiled = incremental and method != "adaptive"
+    processor_reframe = None if tiled else reframe
+
     if method == "ocio":
-        colortransform = ocex.agxc.transforms.transform_inout_look_1
+        processor = wlp.processors.get_colortransform_processor(
+            ocex.agxc.transforms.transform_inout_look_1,
+            reframe=processor_reframe,
+        )
     elif method == "native":
-        colortransform = ocex.agxc.transforms.transform_native_inout_look_1
+        processor = wlp.processors.get_colortransform_processor(
+            ocex.agxc.transforms.transform_native_inout_look_1,
+            reframe=processor_reframe,
+        )
+    elif method == "adaptive":
+        processor = wlp.scheduler.AdaptiveScheduler(
+            wlp.scheduler.get_agx_look_1_modes(reframe=reframe),
+            fps=camera.fps,
+        )
+    else:
+        raise ValueError(f"Method <{method}> passed is not supported.")
+
+    if tiled:
+        processor = wlp.tiles.TileCache(processor, reframe=reframe)
 
     with pyvirtualcam.Camera(
-        width=camera.width,
-        height=camera.height,
+        width=width,
+        height=height,
         fps=camera.fps,
         fmt=PixelFormat.RGB,
         print_fps=debug,
@@ -80,12 +120,9 @@ def livefeed_agxc(camera: wlp.Webcam, method: Literal["ocio", "native"], debug=F
             current_image: numpy.ndarray
             assert ret, "Error fetching current frame from videocapture."
 
-            new_image = cv2.cvtColor(current_image, cv2.COLOR_BGR2RGB)
-            new_image = new_image.astype(numpy.float32)
-            new_image /= 255
-            new_image = colortransform(new_image)
-            new_image *= 255
-            new_image = new_image.astype(numpy.uint8)
+            new_image = processor(current_image)
+            if debug and tiled and processor.frames % 300 == 0:
+                logger.debug(f"[livefeed_agxc] {processor.report()}")
 
             vcam.send(new_image)
 
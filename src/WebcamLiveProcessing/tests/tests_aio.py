@@ -0,0 +1,177 @@
+"""
+Run the asyncio API without camera nor virtual camera.
+"""
+import asyncio
+import logging
+import sys
+import time
+from typing import List
+
+import WebcamLiveProcessing as wlp
+
+logger = logging.getLogger(f"{wlp.c.ABR}.tests_aio")
+
+
+def setup_logging(level, loggers: List[str]):
+
+    handler = logging.StreamHandler(stream=sys.stdout)
+    handler.setLevel(logging.DEBUG)
+    formatter = logging.Formatter(
+        "%(asctime)s - [%(levelname)7s] %(name)30s // %(message)s",
+        datefmt="%H:%M:%S",
+    )
+    handler.setFormatter(formatter)
+
+    for logger_name in loggers:
+        logger = logging.getLogger(logger_name)
+        logger.setLevel(level)
+        if not logger.handlers:
+            logger.addHandler(handler)
+    return
+
+
+class ReleasedSource(wlp.sources.SyntheticSource):
+    released = False
+
+    def release(self):
+        self.released = True
+
+
+class ClosedSink(wlp.sinks.NullSink):
+    closed = False
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+
+"""
+---------------------------------------------------------------------------------------
+"""
+
+
+def test_async_source():
+    async def read_all():
+        source = ReleasedSource(320, 180, pacing="fast", frames=10)
+        async with wlp.aio.AsyncFrameSource(source) as async_source:
+            sequences = [frame.sequence async for frame in async_source]
+        return source, sequences
+
+    source, sequences = asyncio.run(read_all())
+    assert sequences == list(range(10)), sequences
+    assert source.released
+    return
+
+
+def test_async_runner_block():
+
+    sink = wlp.sinks.NullSink()
+    runner = wlp.aio.AsyncPipelineRunner(
+        wlp.sources.SyntheticSource(320, 180, pacing="fast", frames=50),
+        wlp.processors.passthrough,
+        sink,
+        policy="block",
+    )
+    asyncio.run(runner.run())
+
+    assert sink.frames == 50, sink.frames
+    assert runner.dropped == 0, runner.dropped
+    logger.info(f"[test_async_runner_block] {runner.report()}")
+    return
+
+
+def test_async_runners_shared_loop():
+    """
+    Several cameras and a control task share one event loop.
+    """
+    sinks = [wlp.sinks.NullSink() for _ in range(3)]
+    runners = [
+        wlp.aio.AsyncPipelineRunner(
+            wlp.sources.SyntheticSource(320, 180, fps=100, frames=20),
+            wlp.processors.passthrough,
+            sink,
+            policy="block",
+            name=f"camera{index}",
+        )
+        for index, sink in enumerate(sinks)
+    ]
+    ticks = []
+
+    async def control():
+        while any(runner.running for runner in runners) or not ticks:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(control(), *(runner.run() for runner in runners))
+
+    asyncio.run(main())
+    assert [sink.frames for sink in sinks] == [20, 20, 20], sinks
+    # the control task was never starved by the blocking calls
+    assert len(ticks) > 5, len(ticks)
+    return
+
+
+def test_async_runner_cancel():
+
+    source = ReleasedSource(320, 180, fps=100)
+    sink = ClosedSink()
+    runner = wlp.aio.AsyncPipelineRunner(source, wlp.processors.passthrough, sink)
+
+    async def main():
+        task = asyncio.ensure_future(runner.run())
+        await asyncio.sleep(0.3)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        else:
+            raise AssertionError("run was not cancelled")
+
+    asyncio.run(main())
+    assert source.released
+    assert sink.closed
+    assert not runner.running
+    assert sink.frames > 0, sink.frames
+    return
+
+
+def test_async_runner_duration_and_error():
+
+    sink = ClosedSink()
+    runner = wlp.aio.AsyncPipelineRunner(
+        wlp.sources.SyntheticSource(320, 180, fps=100),
+        wlp.processors.passthrough,
+        sink,
+    )
+    asyncio.run(runner.run(duration=0.3))
+    assert sink.closed
+    assert 10 < sink.frames < 60, sink.frames
+
+    def failing_processor(frame):
+        raise ValueError("expected failure")
+
+    runner = wlp.aio.AsyncPipelineRunner(
+        wlp.sources.SyntheticSource(320, 180, pacing="fast", frames=5),
+        failing_processor,
+        wlp.sinks.NullSink(),
+        policy="block",
+    )
+    try:
+        asyncio.run(runner.run())
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("error in processor was not raised")
+    return
+
+
+if __name__ == "__main__":
+
+    setup_logging(logging.INFO, loggers=[wlp.c.ABR])
+    test_async_source()
+    test_async_runner_block()
+    test_async_runners_shared_loop()
+    test_async_runner_cancel()
+    test_async_runner_duration_and_error()
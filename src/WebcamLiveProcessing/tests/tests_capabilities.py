@@ -0,0 +1,100 @@
+"""
+Check capability probing and its cache with a fake capture.
+"""
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy
+
+import WebcamLiveProcessing as wlp
+
+
+class FakeCapture:
+    """
+    Only accept 1280x720@30fps in MJPG, else fallback to 640x480@30fps in YUYV.
+    """
+
+    def __init__(self):
+        self.requested = {}
+
+    def set(self, key, value):
+        self.requested[key] = value
+        return True
+
+    def _accepted(self):
+        accepted = {
+            cv2.CAP_PROP_FOURCC: cv2.VideoWriter_fourcc(*"MJPG"),
+            cv2.CAP_PROP_FRAME_WIDTH: 1280,
+            cv2.CAP_PROP_FRAME_HEIGHT: 720,
+            cv2.CAP_PROP_FPS: 30,
+        }
+        if any(self.requested.get(key) != value for key, value in accepted.items()):
+            accepted = {
+                cv2.CAP_PROP_FOURCC: cv2.VideoWriter_fourcc(*"YUYV"),
+                cv2.CAP_PROP_FRAME_WIDTH: 640,
+                cv2.CAP_PROP_FRAME_HEIGHT: 480,
+                cv2.CAP_PROP_FPS: 30,
+            }
+        return accepted
+
+    def get(self, key):
+        return float(self._accepted()[key])
+
+    def read(self):
+        accepted = self._accepted()
+        shape = (
+            accepted[cv2.CAP_PROP_FRAME_HEIGHT],
+            accepted[cv2.CAP_PROP_FRAME_WIDTH],
+            3,
+        )
+        return True, numpy.zeros(shape, dtype=numpy.uint8)
+
+
+def test_probe_capture():
+
+    modes = wlp.capabilities.probe_capture(FakeCapture())
+    expected = [
+        wlp.capabilities.CaptureMode(1280, 720, 30, "MJPG"),
+        wlp.capabilities.CaptureMode(640, 480, 30, "YUYV"),
+    ]
+    assert modes == expected, modes
+    return
+
+
+def test_capability_cache():
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "capabilities.json"
+        device = wlp.capabilities.get_device_key(0)
+
+        cache = wlp.capabilities.CapabilityCache(path)
+        capabilities = wlp.capabilities.CameraCapabilities(
+            device=device,
+            modes=wlp.capabilities.probe_capture(FakeCapture()),
+        )
+        cache.set_capabilities(capabilities)
+
+        requested = {cv2.CAP_PROP_FRAME_WIDTH: 1920, cv2.CAP_PROP_FPS: 60}
+        accepted = {cv2.CAP_PROP_FRAME_WIDTH: 1280.0, cv2.CAP_PROP_FPS: 30.0}
+        cache.set_configuration(device, requested, accepted)
+
+        # new instance read from disk
+        cache = wlp.capabilities.CapabilityCache(path)
+        assert cache.get_capabilities(device) == capabilities
+        assert cache.get_capabilities(device).supports(1280, 720, fourcc="MJPG")
+        assert not cache.get_capabilities(device).supports(1920, 1080)
+        assert cache.get_configuration(device, requested) == accepted
+        assert cache.get_configuration("ANY:1", requested) is None
+
+        cache.remove_configuration(device, requested)
+        assert wlp.capabilities.CapabilityCache(path).get_configuration(
+            device, requested
+        ) is None
+    return
+
+
+if __name__ == "__main__":
+
+    test_probe_capture()
+    test_capability_cache()
@@ -0,0 +1,115 @@
+"""
+Check the command line interface on a headless pipeline.
+"""
+import json
+import tempfile
+from pathlib import Path
+
+import WebcamLiveProcessing as wlp
+
+
+def test_cli_exposure():
+
+    args = wlp.cli.get_parser().parse_args(
+        [
+            "--source=synthetic",
+            "--size=320x180",
+            "--fps=200",
+            "--transform=exposure",
+            "--exposure=2",
+            "--sink=null",
+            "--max-frames=10",
+            "--policy=block",
+        ]
+    )
+    runner = wlp.cli.run(args)
+    assert runner.frames_sent == 10, runner.report()
+    assert runner.writer.frames == 10
+    return
+
+
+def test_cli_agx_metrics():
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        metrics_path = Path(tmpdir) / "metrics.json"
+        exit_code = wlp.cli.main(
+            [
+                "--source=synthetic",
+                "--size=320x180",
+                "--fps=200",
+                "--transform=agx-native",
+                "--precision=float16",
+                "--output-size=160x90",
+                "--grabber=fifo",
+                "--sink=null",
+                "--max-frames=5",
+                "--policy=block",
+                f"--metrics={metrics_path}",
+                "--log-level=WARNING",
+            ]
+        )
+        assert exit_code == 0
+        metrics = json.loads(metrics_path.read_text())
+        assert metrics["frames"] == 5, metrics
+        assert metrics["stages"]["transform"]["count"] == 5, metrics
+    return
+
+
+def test_cli_incremental_reframe():
+
+    for reframe in ("--output-size=160x90", "--roi=0,0,160,90"):
+        args = wlp.cli.get_parser().parse_args(
+            [
+                "--source=synthetic",
+                "--size=320x180",
+                "--fps=200",
+                "--transform=agx-native",
+                "--incremental",
+                reframe,
+                "--sink=null",
+                "--max-frames=5",
+                "--policy=block",
+            ]
+        )
+        runner = wlp.cli.run(args)
+        assert runner.frames_sent == 5, runner.report()
+    return
+
+
+def test_cli_invalid_combinations():
+
+    parser = wlp.cli.get_parser()
+    source = wlp.sources.SyntheticSource(320, 180)
+    for argv in (
+        ["--transform=agx-native", "--processes=2", "--incremental"],
+        ["--transform=agx-native", "--processes=2", "--output-size=160x90"],
+        ["--transform=adaptive", "--precision=float16"],
+        ["--transform=adaptive", "--incremental"],
+        ["--transform=exposure", "--precision=float16"],
+        ["--transform=exposure", "--incremental"],
+        ["--transform=agx-native", "--workers=4"],
+        ["--transform=lut", "--lut=missing.spi1d", "--workers=0"],
+        ["--transform=none", "--processes=2"],
+    ):
+        try:
+            wlp.cli.get_processor(parser.parse_args(argv), source)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{argv} was accepted")
+
+    try:
+        parser.parse_args(["--fourcc=MJPEG"])
+    except SystemExit:
+        pass
+    else:
+        raise AssertionError("invalid fourcc was accepted")
+    return
+
+
+if __name__ == "__main__":
+
+    test_cli_exposure()
+    test_cli_agx_metrics()
+    test_cli_incremental_reframe()
+    test_cli_invalid_combinations()
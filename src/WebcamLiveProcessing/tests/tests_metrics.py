@@ -0,0 +1,79 @@
+"""
+Check the metrics recorded on a headless pipeline.
+"""
+import csv
+import json
+import tempfile
+from pathlib import Path
+
+import WebcamLiveProcessing as wlp
+
+
+def test_metrics_pipeline():
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        metrics = wlp.metrics.MetricsRecorder(
+            fps=200,
+            interval=None,
+            dump_path=Path(tmpdir) / "metrics.csv",
+        )
+        processor = wlp.processors.get_colortransform_processor(
+            lambda array: array**2.2,
+            metrics=metrics,
+        )
+        reader = wlp.sources.SyntheticSource(320, 180, fps=200, frames=30)
+        writer = wlp.sinks.NullSink()
+        runner = wlp.pipeline.PipelineRunner(
+            reader,
+            processor,
+            writer,
+            policy="block",
+            metrics=metrics,
+        )
+        with runner:
+            runner.wait()
+
+        snapshot = metrics.snapshot()
+        assert snapshot["frames"] == 30, snapshot
+        for stage in ("capture", "convert", "transform", "process", "output"):
+            assert snapshot["stages"][stage]["count"] == 30, stage
+        latency = snapshot["latency"]
+        assert latency["p50"] <= latency["p90"] <= latency["p99"] <= latency["max"]
+        assert set(snapshot["queues"]) == {"capture", "output"}
+
+        metrics.report()
+        metrics.report()
+        with metrics.dump_path.open() as file:
+            rows = list(csv.DictReader(file))
+        # 5 stages and the latency, twice
+        assert len(rows) == 12, len(rows)
+
+        json_path = Path(tmpdir) / "metrics.json"
+        metrics.dump(json_path)
+        assert json.loads(json_path.read_text())["frames"] == 30
+    return
+
+
+def test_metrics_late():
+
+    metrics = wlp.metrics.MetricsRecorder(fps=10, interval=None)
+    # a steady output with a latency over the budget, as in a pipelined runner
+    for timestamp in (0.0, 0.1, 0.21, 0.3):
+        metrics.frame_done(latency=0.25, timestamp=timestamp)
+    assert metrics.late == 0, metrics.late
+
+    # one frame slot missed
+    metrics.frame_done(latency=0.05, timestamp=0.5)
+    metrics.frame_done(latency=0.05, timestamp=0.6)
+    with metrics.measure("stage"):
+        pass
+
+    assert metrics.late == 1, metrics.late
+    assert metrics.stages["stage"].count == 1
+    return
+
+
+if __name__ == "__main__":
+
+    test_metrics_pipeline()
+    test_metrics_late()
@@ -3,7 +3,6 @@
 import logging
 import sys
 import time
-from pathlib import Path
 from typing import Literal, List, Union
 
 import cv2
@@ -60,7 +59,7 @@ def live_exposure(
 
     Args:
         exposure_mode: apply exposure on scene or display referred data.
-            display referred is much faster.
+            Both cost the same, see ``processors.ExposureLUT``.
         debug:
         exposure:
         camera:
@@ -80,28 +79,16 @@ def live_exposure(
             f"({vcam.width}x{vcam.height})@{vcam.fps}fps)"
         )
 
+        # the exposure is a per-channel function of the uint8 code values
+        processor = wlp.processors.ExposureLUT(exposure, exposure_mode)
+
         while True:
             ret, frame = camera.read()
             frame: numpy.ndarray
             if not ret:
                 raise RuntimeError("Error fetching frame")
 
-            new_image: numpy.ndarray = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            # convert to float
-            new_image = new_image.astype(numpy.float32)
-            new_image /= 255
-            # linearize
-            if exposure_mode == "scene":
-                new_image = new_image**2.2
-            # apply gain
-            new_image = new_image * exposure
-            new_image = new_image.clip(0, 1)
-            # apply back EOTF
-            if exposure_mode == "scene":
-                new_image = new_image ** (1 / 2.2)
-            # convert back to 8bit
-            new_image *= 255
-            new_image = new_image.astype(numpy.uint8)
+            new_image = processor(frame)
 
             vcam.send(new_image)
 
@@ -119,6 +106,11 @@ def sream2image1(camera: wlp.Webcam):
     t_end = time.time() + 3  # in seconds
     timeframe = 1
 
+    # camera opened with convert_rgb=0 deliver undecoded frames
+    decoder = None
+    if camera.config.convert_rgb == 0:
+        decoder = wlp.raw.RawFrameDecoder.from_webcam(camera)
+
     logger.info("[run2] Started.")
 
     while time.time() < t_end:
@@ -127,16 +119,10 @@ def sream2image1(camera: wlp.Webcam):
         current_image: numpy.ndarray
         assert ret, "Error fetching current frame from videocapture."
 
-        # current_image = current_image[:, :, ::-1]  # BGR to RGB
-        # reinterpret data as 16-bit pixels
-        # current_image: numpy.ndarray = current_image.view(dtype=numpy.int16)
-        # # # Shift away the bottom 2 bits
-        # current_image: numpy.ndarray = numpy.right_shift(current_image, 2)
-        # current_image: numpy.ndarray = (
-        #     current_image[0].reshape(3, 720, 1280).transpose(1, 2, 0)
-        # )
-
-        # current_image = cv2.imdecode(current_image, cv2.IMREAD_COLOR)
+        if decoder is not None:
+            current_image = cv2.cvtColor(
+                decoder.to_rgb(current_image), cv2.COLOR_RGB2BGR
+            )
 
         export_path = str(export_path).replace("$FRAME", str(timeframe))
         cv2.imwrite(export_path, current_image)
@@ -154,42 +140,42 @@ def sream2image1(camera: wlp.Webcam):
 def sream2image2(camera: wlp.Webcam, duration: int = 3):
     """
     Run the webcam during the given time and apply an OCIO processingon each frame that
-    are then written to disk.
+    are then recorded to a video file, encoded on a background thread.
 
     Args:
         camera:
         duration: time the webcam is activated in second
     """
 
-    export_path = wlp.c.OUTPUT_DIR / "run3" / "webcam.$FRAME.tif"
-    if not export_path.parent.exists():
-        export_path.parent.mkdir()
+    export_path = wlp.c.OUTPUT_DIR / "run3" / "webcam.$SEGMENT.mp4"
+    processor = wlp.processors.get_colortransform_processor(
+        ocex.agxc.transforms.transform_inout_look_1
+    )
+    recorder = wlp.sinks.RecorderSink(
+        export_path,
+        camera.width,
+        camera.height,
+        camera.fps,
+        segment_duration=60,
+    )
 
     t_end = time.time() + duration  # in seconds
-    timeframe = 0
 
     logger.info("[run3] Started.")
 
-    while time.time() < t_end:
-
-        ret, current_image = camera.read()
-        current_image: numpy.ndarray
-        assert ret, "Error fetching current frame from videocapture."
-
-        new_image = cv2.cvtColor(current_image, cv2.COLOR_BGR2RGB)
-        new_image = new_image.astype(numpy.float32)
-        new_image /= 255
-        new_image = ocex.agxc.transforms.transform_inout_look_1(new_image)
+    with recorder:
+        while time.time() < t_end:
 
-        _export_path = Path(str(export_path).replace("$FRAME", str(timeframe)))
-        ocex.io.array_write(new_image, _export_path, numpy.uint8, method="pillow")
+            ret, current_image = camera.read()
+            current_image: numpy.ndarray
+            assert ret, "Error fetching current frame from videocapture."
 
-        timeframe += 1
+            recorder.send(processor(current_image))
 
     camera.release()
     cv2.destroyAllWindows()
 
-    logger.info("[run3] Finished.")
+    logger.info(f"[run3] Finished: {recorder}")
     return
 
 
@@ -0,0 +1,186 @@
+"""
+Run several synthetic streams through one shared pool of workers.
+"""
+import logging
+import sys
+import time
+from typing import List
+
+import numpy
+
+import WebcamLiveProcessing as wlp
+
+logger = logging.getLogger(f"{wlp.c.ABR}.tests_multi")
+
+
+def setup_logging(level, loggers: List[str]):
+
+    handler = logging.StreamHandler(stream=sys.stdout)
+    handler.setLevel(logging.DEBUG)
+    formatter = logging.Formatter(
+        "%(asctime)s - [%(levelname)7s] %(name)30s // %(message)s",
+        datefmt="%H:%M:%S",
+    )
+    handler.setFormatter(formatter)
+
+    for logger_name in loggers:
+        logger = logging.getLogger(logger_name)
+        logger.setLevel(level)
+        if not logger.handlers:
+            logger.addHandler(handler)
+    return
+
+
+def _get_streams(count: int, **kwargs) -> List[wlp.multi.Stream]:
+    return [
+        wlp.multi.Stream(
+            name=f"camera{index}",
+            reader=wlp.sources.SyntheticSource(320, 180, **kwargs),
+            writer=wlp.sinks.NullSink(),
+        )
+        for index in range(count)
+    ]
+
+
+"""
+---------------------------------------------------------------------------------------
+"""
+
+
+def test_multi_block():
+
+    streams = _get_streams(3, pacing="fast", frames=20)
+    runner = wlp.multi.MultiSourceRunner(
+        streams,
+        wlp.processors.passthrough,
+        workers=2,
+        policy="block",
+    )
+    with runner:
+        runner.wait()
+
+    assert [stream.writer.frames for stream in streams] == [20, 20, 20], streams
+    assert all(stream.metrics.frames == 20 for stream in streams)
+    assert set(runner.snapshot()) == {"camera0", "camera1", "camera2"}
+    logger.info(f"[test_multi_block] {runner.report()}")
+    return
+
+
+def test_multi_fair():
+    """
+    Every stream must get the same share of a saturated pool.
+
+    The readers always have a frame ready well before their next turn so the
+    round-robin never has a reason to skip one: any difference is the dispatcher.
+    """
+
+    class Reader:
+        """
+        1000fps camera, much faster than the pool.
+        """
+
+        fps = 1000
+
+        def __init__(self):
+            self.image = numpy.zeros((180, 320, 3), numpy.uint8)
+
+        def read(self):
+            time.sleep(0.001)
+            return True, self.image.copy()
+
+    def slow_processor(frame):
+        time.sleep(0.01)
+        return wlp.processors.passthrough(frame)
+
+    streams = [
+        wlp.multi.Stream(f"camera{index}", Reader(), wlp.sinks.NullSink())
+        for index in range(3)
+    ]
+    runner = wlp.multi.MultiSourceRunner(streams, slow_processor, workers=2)
+    with runner:
+        runner.wait(1.0)
+
+    sent = [stream.writer.frames for stream in streams]
+    assert min(sent) > 10, sent
+    assert max(sent) - min(sent) <= 2, sent
+    assert all(stream.metrics.dropped > 0 for stream in streams)
+    logger.info(f"[test_multi_fair] {runner.report()}")
+    return
+
+
+def test_multi_order():
+
+    sent = {}
+
+    class OrderSink(wlp.sinks.FrameSink):
+        def __init__(self, name):
+            super().__init__()
+            self.name = name
+            sent[name] = []
+
+        def _send(self, frame):
+            sent[self.name].append(int(frame[0, 0, 0]))
+
+    def variable_processor(frame):
+        # frames finish out of order in the pool
+        time.sleep(0.002 * (frame[0, 0, 0] % 3))
+        return frame
+
+    def get_reader(index):
+        frames = iter(range(30))
+
+        class Reader:
+            fps = 0
+
+            def read(self):
+                value = next(frames, None)
+                if value is None:
+                    return False, None
+                return True, numpy.full((8, 8, 3), value, numpy.uint8)
+
+        return Reader()
+
+    streams = [
+        wlp.multi.Stream(
+            f"camera{index}", get_reader(index), OrderSink(f"camera{index}")
+        )
+        for index in range(2)
+    ]
+    runner = wlp.multi.MultiSourceRunner(
+        streams, variable_processor, workers=4, policy="block"
+    )
+    with runner:
+        runner.wait()
+
+    for name, values in sent.items():
+        assert values == list(range(30)), (name, values)
+    return
+
+
+def test_multi_error():
+    def failing_processor(frame):
+        raise ValueError("expected failure")
+
+    runner = wlp.multi.MultiSourceRunner(
+        _get_streams(2, pacing="fast", frames=5), failing_processor
+    )
+    runner.start()
+    try:
+        runner.wait(5.0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("error in processor was not raised")
+    finally:
+        runner.stop()
+    assert not runner.running
+    return
+
+
+if __name__ == "__main__":
+
+    setup_logging(logging.INFO, loggers=[wlp.c.ABR])
+    test_multi_block()
+    test_multi_fair()
+    test_multi_order()
+    test_multi_error()
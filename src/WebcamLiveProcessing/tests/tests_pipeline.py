@@ -0,0 +1,164 @@
+"""
+Run the pipelined runner without camera nor virtual camera.
+"""
+import logging
+import sys
+import time
+from typing import List
+
+import numpy
+
+import WebcamLiveProcessing as wlp
+
+logger = logging.getLogger(f"{wlp.c.ABR}.tests_pipeline")
+
+
+def setup_logging(level, loggers: List[str]):
+
+    handler = logging.StreamHandler(stream=sys.stdout)
+    handler.setLevel(logging.DEBUG)
+    # create a logging format
+    formatter = logging.Formatter(
+        "%(asctime)s - [%(levelname)7s] %(name)30s // %(message)s",
+        datefmt="%H:%M:%S",
+    )
+    handler.setFormatter(formatter)
+
+    for logger_name in loggers:
+
+        logger = logging.getLogger(logger_name)
+        logger.setLevel(level)
+
+        # add the file handler to the logger
+        if not logger.handlers:
+            logger.addHandler(handler)
+
+    return
+
+
+"""
+---------------------------------------------------------------------------------------
+"""
+
+
+def test_ring_buffer_closed():
+    """
+    Once closed, a put must hand back the new item and keep the queued ones.
+    """
+
+    buffer = wlp.pipeline.RingBuffer(1, policy="drop-oldest")
+    assert buffer.put("a") is None
+    assert buffer.put("b") == "a"
+    assert buffer.dropped == 1
+
+    buffer.close()
+    assert buffer.put("c") == "c"
+    assert buffer.dropped == 1
+    assert buffer.get(timeout=0) == "b"
+    assert buffer.get(timeout=0) is None
+    return
+
+
+def test_pipeline_block():
+
+    writer = wlp.sinks.NullSink()
+    runner = wlp.pipeline.PipelineRunner(
+        wlp.sources.SyntheticSource(320, 180, pacing="fast", frames=50),
+        wlp.processors.passthrough,
+        writer,
+        policy="block",
+    )
+    with runner:
+        runner.wait()
+
+    assert writer.frames == 50, writer.frames
+    assert runner.dropped == 0, runner.dropped
+    logger.info(f"[test_pipeline_block] {runner.report()}")
+    return
+
+
+def test_pipeline_drop_oldest():
+    """
+    Processing slower than capture must drop frames instead of falling behind.
+    """
+
+    def slow_processor(frame):
+        time.sleep(0.02)
+        return wlp.processors.passthrough(frame)
+
+    writer = wlp.sinks.NullSink()
+    runner = wlp.pipeline.PipelineRunner(
+        wlp.sources.SyntheticSource(320, 180, fps=200, frames=50),
+        slow_processor,
+        writer,
+        buffer_size=1,
+        policy="drop-oldest",
+    )
+    with runner:
+        runner.wait()
+
+    assert runner.dropped > 0, runner.dropped
+    assert writer.frames + runner.dropped == 50, runner.report()
+    logger.info(f"[test_pipeline_drop_oldest] {runner.report()}")
+    return
+
+
+def test_pipeline_pool():
+
+    reader = wlp.sources.SyntheticSource(320, 180, fps=200, frames=50)
+    pool = wlp.sources.FramePool.from_source(
+        reader,
+        wlp.pipeline.PipelineRunner.get_pool_size(buffer_size=1),
+    )
+
+    def processor(frame):
+        # frames must be read in place, never allocated
+        assert pool.owns(frame), "frame is not a pool buffer"
+        time.sleep(0.01)
+        return wlp.processors.passthrough(frame)
+
+    writer = wlp.sinks.NullSink()
+    runner = wlp.pipeline.PipelineRunner(
+        reader,
+        processor,
+        writer,
+        buffer_size=1,
+        pool=pool,
+    )
+    with runner:
+        runner.wait()
+
+    assert pool.available == pool.size, pool
+    assert writer.frames + runner.dropped == 50, runner.report()
+    logger.info(f"[test_pipeline_pool] {runner.report()}")
+    return
+
+
+def test_pipeline_error():
+
+    def failing_processor(frame):
+        raise ValueError("expected failure")
+
+    runner = wlp.pipeline.PipelineRunner(
+        wlp.sources.SyntheticSource(320, 180, pacing="fast", frames=5),
+        failing_processor,
+        wlp.sinks.NullSink(),
+    )
+    runner.start()
+    try:
+        runner.wait()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("error in processor was not raised")
+    return
+
+
+if __name__ == "__main__":
+
+    setup_logging(logging.INFO, loggers=[wlp.c.ABR])
+    test_ring_buffer_closed()
+    test_pipeline_block()
+    test_pipeline_drop_oldest()
+    test_pipeline_pool()
+    test_pipeline_error()
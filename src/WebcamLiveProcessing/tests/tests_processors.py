@@ -0,0 +1,103 @@
+"""
+Check the frame processors.
+"""
+import functools
+
+import numpy
+
+import WebcamLiveProcessing as wlp
+
+
+def test_reframe():
+
+    frame = wlp.sources.SyntheticSource(320, 180, pacing="fast").read()[1]
+
+    reframe = wlp.processors.Reframe(roi=(300, 100, 64, 64))
+    cropped = reframe(frame)
+    # clamped to the frame, and a view on it
+    assert cropped.shape == (64, 20, 3), cropped.shape
+    assert numpy.shares_memory(cropped, frame)
+    assert reframe.get_output_size(320, 180) == (20, 64)
+
+    reframe = wlp.processors.Reframe(roi=(0, 0, 160, 90), size=(64, 36))
+    assert reframe(frame).shape == (36, 64, 3)
+    assert reframe.get_output_size(320, 180) == (64, 36)
+
+    processed = []
+    processor = wlp.processors.get_colortransform_processor(
+        lambda array: processed.append(array.shape) or array,
+        reframe=reframe,
+    )
+    assert processor(frame).shape == (36, 64, 3)
+    # the transform only saw the output pixels
+    assert processed == [(36, 64, 3)], processed
+    return
+
+
+def test_exposure_lut():
+
+    source = wlp.sources.SyntheticSource(640, 360, pacing="fast")
+    frame = source.read()[1]
+    # every code value in every channel
+    frame[:1, :256] = numpy.arange(256, dtype=numpy.uint8)[:, numpy.newaxis]
+
+    processor = wlp.processors.ExposureLUT(exposure=2.0)
+    for exposure, exposure_mode in ((2.0, "scene"), (0.5, "scene"), (1.5, "display")):
+        processor.exposure = exposure
+        processor.exposure_mode = exposure_mode
+        expected = wlp.processors.get_colortransform_processor(
+            functools.partial(
+                wlp.processors.apply_exposure,
+                exposure=exposure,
+                exposure_mode=exposure_mode,
+            )
+        )(frame)
+        result = processor(frame)
+        assert result.dtype == numpy.uint8
+        difference = numpy.abs(result.astype(int) - expected).max()
+        assert difference <= 1, (exposure, exposure_mode, difference)
+
+    # the table is only rebuilt when the exposure change
+    table = processor.table
+    processor.exposure = 1.5
+    assert processor.table is table
+    processor.exposure = 1.0
+    assert processor.table is not table
+    assert numpy.array_equal(processor(frame), frame[..., ::-1])
+
+    try:
+        processor.exposure_mode = "log"
+    except ValueError:
+        assert processor.exposure_mode == "display"
+    else:
+        raise AssertionError("unsupported exposure mode was accepted")
+
+    return
+
+
+def test_tone_lut_out_of_range():
+    """
+    The table and the float processor must agree where the transform leaves [0-1].
+    """
+
+    def colortransform(array):
+        array *= 2.0
+        array -= 0.5
+        return array
+
+    frame = numpy.zeros((3, 256, 3), dtype=numpy.uint8)
+    frame[:] = numpy.arange(256, dtype=numpy.uint8)[:, numpy.newaxis]
+
+    expected = wlp.processors.get_colortransform_processor(colortransform)(frame)
+    result = wlp.processors.ToneLUT(colortransform)(frame)
+    assert expected[0, 0, 0] == 0 and expected[0, -1, 0] == 255, expected[0]
+    difference = numpy.abs(result.astype(int) - expected).max()
+    assert difference <= 1, difference
+    return
+
+
+if __name__ == "__main__":
+
+    test_reframe()
+    test_exposure_lut()
+    test_tone_lut_out_of_range()
@@ -0,0 +1,70 @@
+"""
+Check raw frames are decoded like the driver would.
+"""
+import cv2
+import numpy
+
+import WebcamLiveProcessing as wlp
+
+WIDTH = 64
+HEIGHT = 32
+
+
+def _get_nv12(image: numpy.ndarray) -> numpy.ndarray:
+    """
+    Encode the B-G-R image to NV12 from OpenCV I420 (same planes, interleaved UV).
+    """
+    i420 = cv2.cvtColor(image, cv2.COLOR_BGR2YUV_I420)
+    chroma_size = HEIGHT * WIDTH // 4
+    u = i420[HEIGHT:].reshape(-1)[:chroma_size]
+    v = i420[HEIGHT:].reshape(-1)[chroma_size:]
+
+    nv12 = numpy.empty((HEIGHT * 3 // 2, WIDTH), dtype=numpy.uint8)
+    nv12[:HEIGHT] = i420[:HEIGHT]
+    nv12[HEIGHT:].reshape(-1)[0::2] = u
+    nv12[HEIGHT:].reshape(-1)[1::2] = v
+    return nv12
+
+
+def test_raw_yuv():
+
+    image = wlp.sources.SyntheticSource(WIDTH, HEIGHT, pacing="fast").read()[1]
+    nv12 = _get_nv12(image)
+    expected = cv2.cvtColor(cv2.cvtColor(nv12, cv2.COLOR_YUV2BGR_NV12), cv2.COLOR_BGR2RGB)
+
+    decoder = wlp.raw.RawFrameDecoder(WIDTH, HEIGHT, "NV12")
+    # backends can deliver the raw data as a single row
+    rgb = decoder.to_rgb(nv12.reshape(1, -1))
+    assert numpy.array_equal(rgb, expected)
+
+    array = decoder.to_float(nv12)
+    assert array.dtype == numpy.float32
+    assert numpy.allclose(array, expected / 255)
+
+    decoder = wlp.raw.RawFrameDecoder(WIDTH, HEIGHT, "NV12", linear=True)
+    assert numpy.allclose(decoder(nv12), (expected / 255) ** 2.2, atol=1e-6)
+    return
+
+
+def test_raw_mjpg_processor():
+
+    image = wlp.sources.SyntheticSource(WIDTH, HEIGHT, pacing="fast").read()[1]
+    jpeg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 100])[1]
+
+    decoder = wlp.raw.RawFrameDecoder(WIDTH, HEIGHT, "MJPG")
+    processor = wlp.processors.get_raw_colortransform_processor(
+        lambda array: array,
+        decoder,
+    )
+    frame = processor(jpeg)
+    expected = cv2.cvtColor(cv2.imdecode(jpeg, cv2.IMREAD_COLOR), cv2.COLOR_BGR2RGB)
+    assert frame.shape == (HEIGHT, WIDTH, 3) and frame.dtype == numpy.uint8
+    # float round trip can truncate 1 code value
+    assert numpy.abs(frame.astype(int) - expected).max() <= 1
+    return
+
+
+if __name__ == "__main__":
+
+    test_raw_yuv()
+    test_raw_mjpg_processor()
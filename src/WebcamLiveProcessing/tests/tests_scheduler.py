@@ -0,0 +1,112 @@
+"""
+Check the adaptive scheduler using processors of known duration.
+"""
+import time
+
+import numpy
+
+import WebcamLiveProcessing as wlp
+
+
+def _get_sleeping_processor(duration: float, value: int):
+    def _process(frame: numpy.ndarray) -> numpy.ndarray:
+        time.sleep(duration)
+        return numpy.full_like(frame, value)
+
+    return _process
+
+
+def test_scheduler_downgrade():
+
+    modes = [
+        wlp.scheduler.QualityMode("slow", _get_sleeping_processor(0.03, 1)),
+        wlp.scheduler.QualityMode("fast", _get_sleeping_processor(0.001, 2)),
+    ]
+    changes = []
+    scheduler = wlp.scheduler.AdaptiveScheduler(
+        modes,
+        fps=50,
+        on_change=lambda previous, new: changes.append(new.name),
+    )
+    frame = numpy.zeros((18, 32, 3), dtype=numpy.uint8)
+
+    for _ in range(10):
+        result = scheduler(frame)
+
+    assert scheduler.mode.name == "fast", scheduler
+    assert changes == ["fast"], changes
+    assert result[0, 0, 0] == 2
+    # the slow mode is still over budget, it must not be tried again
+    assert scheduler.switches == 1, scheduler.switches
+    return
+
+
+def test_scheduler_upgrade():
+
+    modes = [
+        wlp.scheduler.QualityMode("best", _get_sleeping_processor(0.0, 1)),
+        wlp.scheduler.QualityMode("half", _get_sleeping_processor(0.0, 2), scale=0.5),
+    ]
+    scheduler = wlp.scheduler.AdaptiveScheduler(modes, fps=30, upgrade_after=5)
+    scheduler._switch(1)
+    frame = numpy.zeros((18, 32, 3), dtype=numpy.uint8)
+
+    result = scheduler(frame)
+    assert result.shape == frame.shape, "half resolution must be upscaled back"
+    for _ in range(5):
+        scheduler(frame)
+    assert scheduler.mode.name == "best", scheduler
+    return
+
+
+def test_scheduler_skip():
+
+    modes = [wlp.scheduler.QualityMode("skip", _get_sleeping_processor(0.0, 1), skip=2)]
+    scheduler = wlp.scheduler.AdaptiveScheduler(modes, fps=30)
+    frame = numpy.zeros((18, 32, 3), dtype=numpy.uint8)
+
+    results = [scheduler(frame) for _ in range(6)]
+    assert scheduler.frames == 2, scheduler.frames
+    assert scheduler.skipped == 4, scheduler.skipped
+    assert results[1] is results[0] and results[2] is results[0]
+    return
+
+
+def test_scheduler_reframe():
+
+    reframe = wlp.processors.Reframe(size=(16, 8))
+    mode = wlp.scheduler.QualityMode(
+        "half",
+        _get_sleeping_processor(0.0, 1),
+        scale=0.5,
+        reframe=reframe,
+    )
+    frame = numpy.zeros((18, 32, 3), dtype=numpy.uint8)
+    # upscaled back to the reframed size, not the source size
+    assert mode.processor(frame).shape == (8, 16, 3)
+    return
+
+
+def test_agx_look_1_modes():
+    """
+    Switching mode must not change the colours, only the resolution.
+    """
+
+    for method in ("ocio", "native"):
+        modes = wlp.scheduler.get_agx_look_1_modes(method=method)
+        for color in ((40, 90, 200), (128, 128, 128), (250, 30, 10)):
+            frame = numpy.full((36, 64, 3), color, dtype=numpy.uint8)
+            expected = modes[0].processor(frame).astype(int)
+            for mode in modes[1:]:
+                difference = numpy.abs(mode.processor(frame) - expected).max()
+                assert difference <= 1, (mode.name, color, difference)
+    return
+
+
+if __name__ == "__main__":
+
+    test_scheduler_downgrade()
+    test_scheduler_upgrade()
+    test_scheduler_skip()
+    test_scheduler_reframe()
+    test_agx_look_1_modes()
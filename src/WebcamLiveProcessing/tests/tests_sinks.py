@@ -0,0 +1,117 @@
+"""
+Check the frame sinks that don't need any hardware.
+"""
+import shutil
+import tempfile
+from pathlib import Path
+
+import cv2
+
+import WebcamLiveProcessing as wlp
+
+
+def _get_frames(count: int):
+    source = wlp.sources.SyntheticSource(320, 180, pacing="fast", frames=count)
+    while True:
+        ret, frame = source.read()
+        if not ret:
+            break
+        yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def test_null_sink():
+
+    with wlp.sinks.NullSink() as sink:
+        for frame in _get_frames(5):
+            sink.send(frame)
+
+    assert sink.frames == 5, sink.frames
+    assert sink.bytes == 5 * 320 * 180 * 3, sink.bytes
+    return
+
+
+def test_image_sequence_sink():
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        export_path = Path(tmpdir) / "frame.$FRAME.png"
+        with wlp.sinks.ImageSequenceSink(export_path, start=1) as sink:
+            for frame in _get_frames(3):
+                sink.send(frame)
+
+        exported = sorted(path.name for path in Path(tmpdir).iterdir())
+        assert exported == ["frame.1.png", "frame.2.png", "frame.3.png"], exported
+    return
+
+
+def test_video_file_sink():
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "video.avi"
+        with wlp.sinks.VideoFileSink(path, 320, 180, 30, fourcc="MJPG") as sink:
+            for frame in _get_frames(10):
+                sink.send(frame)
+
+        capture = cv2.VideoCapture(str(path))
+        assert int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) == 10
+        capture.release()
+    return
+
+
+def _get_frame_count(path: Path) -> int:
+    capture = cv2.VideoCapture(str(path))
+    count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    capture.release()
+    return count
+
+
+def test_recorder_sink_segments():
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "record.$SEGMENT.avi"
+        sink = wlp.sinks.RecorderSink(
+            path,
+            320,
+            180,
+            fps=10,
+            segment_duration=1,
+            max_segments=2,
+            policy="block",
+            fourcc="MJPG",
+        )
+        with sink:
+            for frame in _get_frames(25):
+                sink.send(frame)
+
+        recorded = sorted(path.name for path in Path(tmpdir).iterdir())
+        assert recorded == ["record.0001.avi", "record.0002.avi"], recorded
+        assert sink.dropped == 0, sink.dropped
+        assert _get_frame_count(sink.get_path(1)) == 10
+        assert _get_frame_count(sink.get_path(2)) == 5
+    return
+
+
+def test_ffmpeg_sink():
+
+    if shutil.which(wlp.c.FFMPEG) is None:
+        print(f"[test_ffmpeg_sink] skipped: <{wlp.c.FFMPEG}> not found.")
+        return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "video.mp4"
+        sink = wlp.sinks.RecorderSink(path, 320, 180, fps=30, backend="ffmpeg")
+        with sink:
+            for frame in _get_frames(10):
+                sink.send(frame)
+
+        assert sink.segments == [path], sink.segments
+        assert _get_frame_count(path) == 10
+    return
+
+
+if __name__ == "__main__":
+
+    test_null_sink()
+    test_image_sequence_sink()
+    test_video_file_sink()
+    test_recorder_sink_segments()
+    test_ffmpeg_sink()
@@ -0,0 +1,160 @@
+"""
+Check the frame sources that don't need any hardware.
+"""
+import logging
+import time
+
+import cv2
+import numpy
+
+import WebcamLiveProcessing as wlp
+import OCIOexperiments as ocex
+
+
+def test_synthetic_source():
+
+    source_a = wlp.sources.SyntheticSource(320, 180, pacing="fast", frames=3)
+    source_b = wlp.sources.SyntheticSource(320, 180, pacing="fast", frames=3)
+
+    frames = []
+    while True:
+        ret, frame = source_a.read()
+        if not ret:
+            break
+        frames.append(frame)
+        # deterministic
+        assert numpy.array_equal(frame, source_b.read()[1])
+
+    assert len(frames) == 3, len(frames)
+    assert frames[0].shape == (180, 320, 3), frames[0].shape
+    assert not numpy.array_equal(frames[0], frames[1]), "frames should move"
+    return
+
+
+def test_synthetic_source_realtime():
+
+    source = wlp.sources.SyntheticSource(64, 64, fps=50, frames=11)
+
+    _stime = time.perf_counter()
+    while source.read()[0]:
+        pass
+    duration = time.perf_counter() - _stime
+    # 10 intervals of 20ms between the 11 frames
+    assert 0.18 < duration < 0.4, duration
+    return
+
+
+def test_image_sequence_source():
+
+    source = wlp.sources.ImageSequenceSource.from_pattern(
+        ocex.c.DATA_DIR / "webcam" / "webcam-c922-A.*.tif",
+        pacing="fast",
+        preload=True,
+    )
+    buffer = numpy.empty((source.height, source.width, 3), dtype=numpy.uint8)
+
+    ret, frame = source.read(image=buffer)
+    assert ret and frame is buffer
+    assert not source.read()[0], "source should be exhausted"
+    return
+
+
+def test_grabber_latest():
+
+    source = wlp.sources.SyntheticSource(64, 64, fps=100, frames=30)
+    sequences = []
+    with wlp.sources.FrameGrabber(source, policy="latest") as grabber:
+        while True:
+            grabbed = grabber.read_frame()
+            if grabbed is None:
+                break
+            # frames handed out are fresh even if the consumer is slow
+            assert time.perf_counter() - grabbed.timestamp < 0.03
+            sequences.append(grabbed.sequence)
+            time.sleep(0.05)
+
+    assert sequences == sorted(sequences), sequences
+    assert len(sequences) < 30, "slow consumer should skip frames"
+    assert grabber.dropped == 30 - len(sequences), grabber
+    return
+
+
+def test_grabber_fifo():
+
+    source = wlp.sources.SyntheticSource(64, 64, fps=100, frames=30)
+    with wlp.sources.FrameGrabber(source, policy="fifo", queue_size=30) as grabber:
+        sequences = []
+        while True:
+            grabbed = grabber.read_frame()
+            if grabbed is None:
+                break
+            sequences.append(grabbed.sequence)
+            time.sleep(0.005)
+
+    assert sequences == list(range(30)), sequences
+    return
+
+
+def test_webcam_configuration_fourcc():
+
+    config = wlp.sources.WebcamConfiguration(
+        "camera0", 0, convert_rgb=0, fourcc="YUYV"
+    )
+    fourcc = config.properties[cv2.CAP_PROP_FOURCC]
+    assert isinstance(fourcc, int), fourcc
+    assert fourcc == cv2.VideoWriter_fourcc(*"YUYV")
+    assert wlp.capabilities.fourcc_to_str(fourcc) == "YUYV"
+
+    config = wlp.sources.WebcamConfiguration("camera0", 0, convert_rgb=0)
+    assert cv2.CAP_PROP_FOURCC not in config.properties
+    return
+
+
+class FakeVerifiedWebcam:
+    """
+    Only the attributes ``Webcam.verify`` needs, the driver falling back to YUYV.
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+    def get(self, key):
+        return {
+            cv2.CAP_PROP_FOURCC: float(cv2.VideoWriter_fourcc(*"YUYV")),
+            cv2.CAP_PROP_FRAME_WIDTH: 640.0,
+            cv2.CAP_PROP_CONVERT_RGB: 0.0,
+        }[key]
+
+
+def test_webcam_verify_fourcc():
+
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger(f"{wlp.c.ABR}.sources")
+    logger.addHandler(handler)
+    try:
+        for fourcc, warnings in (("YUYV", 0), ("MJPG", 1)):
+            records.clear()
+            config = wlp.sources.WebcamConfiguration(
+                "camera0", 0, target_width=640, convert_rgb=0, fourcc=fourcc
+            )
+            accepted = wlp.sources.Webcam.verify(FakeVerifiedWebcam(config))
+            assert set(accepted) == set(config.properties), accepted
+            assert len(records) == warnings, [r.getMessage() for r in records]
+    finally:
+        logger.removeHandler(handler)
+
+    assert "requested as MJPG but is YUYV" in records[0].getMessage()
+    return
+
+
+if __name__ == "__main__":
+
+    test_synthetic_source()
+    test_synthetic_source_realtime()
+    test_image_sequence_source()
+    test_grabber_latest()
+    test_grabber_fifo()
+    test_webcam_configuration_fourcc()
+    test_webcam_verify_fourcc()
@@ -0,0 +1,87 @@
+"""
+Check the tile cache give the same result as processing the full frame.
+"""
+import logging
+
+import numpy
+
+import WebcamLiveProcessing as wlp
+import OCIOexperiments as ocex
+
+logger = logging.getLogger(f"{wlp.c.ABR}.tests_tiles")
+
+
+def test_tile_cache():
+
+    processor = wlp.processors.get_colortransform_processor(
+        ocex.agxc.transforms.transform_native_inout_look_1
+    )
+    cached = wlp.tiles.TileCache(processor, tile_size=32, threshold=0, metric="max")
+
+    frame = wlp.sources.SyntheticSource(200, 100, pacing="fast").read()[1]
+    first = cached(frame)
+    assert numpy.array_equal(first, processor(frame))
+
+    # change 2 pixels in 2 different tiles, 1 on the partial edge tiles
+    frame = frame.copy()
+    frame[10, 40] = (0, 0, 0)
+    frame[99, 199] = (0, 0, 0)
+    second = cached(frame)
+    assert numpy.array_equal(second, processor(frame))
+
+    # 7x4 tiles, 2 processed on the second frame
+    assert cached.misses == 28 + 2, cached.misses
+    assert cached.hits == 26, cached.hits
+    logger.info(f"[test_tile_cache] {cached.report()}")
+    return
+
+
+def test_tile_cache_threshold():
+
+    cached = wlp.tiles.TileCache(
+        lambda frame: frame.copy(),
+        tile_size=16,
+        threshold=2,
+        refresh_interval=3,
+    )
+    frame = numpy.full((32, 32, 3), 100, dtype=numpy.uint8)
+    cached(frame)
+
+    # noise under the threshold is ignored
+    assert numpy.array_equal(cached(frame + 1), frame)
+    # refresh interval reached
+    assert numpy.array_equal(cached(frame + 1), frame + 1)
+    return
+
+
+def test_tile_cache_reframe():
+
+    frame = wlp.sources.SyntheticSource(320, 180, pacing="fast").read()[1]
+    reframe = wlp.processors.Reframe(roi=(10, 20, 200, 100), size=(100, 50))
+    expected = wlp.processors.get_colortransform_processor(
+        lambda array: array, reframe=reframe
+    )(frame)
+
+    cached = wlp.tiles.TileCache(
+        wlp.processors.passthrough, tile_size=32, reframe=reframe
+    )
+    assert numpy.array_equal(cached(frame), expected)
+    assert numpy.array_equal(cached(frame), expected)
+    assert cached.hits == 8, cached.hits
+
+    # processors changing the frame size are rejected with a clear error
+    cached = wlp.tiles.TileCache(reframe)
+    try:
+        cached(frame)
+    except ValueError as error:
+        assert "Reframe" in str(error), error
+    else:
+        raise AssertionError("processor changing the frame size was accepted")
+    return
+
+
+if __name__ == "__main__":
+
+    test_tile_cache()
+    test_tile_cache_threshold()
+    test_tile_cache_reframe()
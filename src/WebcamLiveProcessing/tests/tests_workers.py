@@ -0,0 +1,80 @@
+"""
+Check the shared memory worker processes give the same result as in-process.
+"""
+import logging
+
+import numpy
+
+import WebcamLiveProcessing as wlp
+import OCIOexperiments as ocex
+
+logger = logging.getLogger(f"{wlp.c.ABR}.tests_workers")
+
+
+def _get_frames(count: int):
+    source = wlp.sources.SyntheticSource(320, 180, pacing="fast", frames=count)
+    return [source.read()[1] for _ in range(count)]
+
+
+def test_workers_modes():
+
+    frames = _get_frames(4)
+    reference = wlp.processors.get_colortransform_processor(
+        ocex.agxc.transforms.transform_native_inout_look_1
+    )
+    expected = [reference(frame) for frame in frames]
+
+    with wlp.workers.SharedMemoryProcessor(
+        "agxc.native_look_1",
+        frames[0].shape,
+        workers=2,
+    ) as processor:
+
+        tickets = [processor.submit(frame) for frame in frames[:2]]
+        results = [processor.collect(ticket) for ticket in tickets]
+
+        processor.mode = "stripe"
+        results += [processor(frame) for frame in frames[2:]]
+
+    for result, expected_result in zip(results, expected):
+        assert numpy.array_equal(result, expected_result)
+    return
+
+
+def test_workers_pipeline():
+
+    frames = _get_frames(20)
+    reference = wlp.processors.get_colortransform_processor(
+        ocex.agxc.transforms.transform_native_inout_look_1
+    )
+
+    class _Writer:
+        def __init__(self):
+            self.frames = []
+
+        def send(self, frame):
+            self.frames.append(frame)
+
+    reader = wlp.sources.SyntheticSource(320, 180, pacing="fast", frames=20)
+    writer = _Writer()
+    with wlp.workers.SharedMemoryProcessor(
+        "agxc.native_look_1",
+        (180, 320, 3),
+        workers=2,
+    ) as processor:
+        runner = wlp.pipeline.PipelineRunner(reader, processor, writer, policy="block")
+        with runner:
+            runner.wait()
+
+    assert len(writer.frames) == 20, runner.report()
+    # frames must be output in capture order
+    for frame, result in zip(frames, writer.frames):
+        assert numpy.array_equal(reference(frame), result)
+    logger.info(f"[test_workers_pipeline] {runner.report()}")
+    return
+
+
+if __name__ == "__main__":
+
+    test_workers_modes()
+    test_workers_pipeline()